@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import AuditCategory, ChecklistItem, Audit, AuditResponse
+from .models import AuditCategory, ChecklistItem, ChecklistPack, Audit, AuditResponse, AuditArchive
 
 
 @admin.register(AuditCategory)
@@ -18,10 +18,16 @@ class ChecklistItemAdmin(admin.ModelAdmin):
     ordering = ('category', 'order', 'code')
 
 
+@admin.register(ChecklistPack)
+class ChecklistPackAdmin(admin.ModelAdmin):
+    list_display = ('name', 'version', 'fingerprint', 'applied_at')
+    readonly_fields = ('name', 'version', 'fingerprint', 'applied_at')
+
+
 @admin.register(Audit)
 class AuditAdmin(admin.ModelAdmin):
-    list_display = ('title', 'application', 'auditor', 'status', 'scheduled_date', 'created_at')
-    list_filter = ('status', 'scheduled_date', 'created_at')
+    list_display = ('title', 'application', 'organization', 'auditor', 'status', 'scheduled_date', 'created_at')
+    list_filter = ('organization', 'status', 'scheduled_date', 'created_at')
     search_fields = ('title', 'application__name', 'auditor__username')
     date_hierarchy = 'created_at'
     raw_id_fields = ('application', 'auditor')
@@ -33,3 +39,12 @@ class AuditResponseAdmin(admin.ModelAdmin):
     list_filter = ('status', 'reviewed_at')
     search_fields = ('audit__title', 'checklist_item__code', 'findings')
     raw_id_fields = ('audit', 'checklist_item', 'reviewed_by')
+
+
+@admin.register(AuditArchive)
+class AuditArchiveAdmin(admin.ModelAdmin):
+    list_display = ('audit', 'response_count', 'compliant_count', 'non_compliant_count', 'archived_at')
+    list_filter = ('archived_at',)
+    search_fields = ('audit__title', 'audit__application__name')
+    raw_id_fields = ('audit',)
+    exclude = ('payload',)
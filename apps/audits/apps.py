@@ -5,3 +5,6 @@ class AuditsConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.audits'
     verbose_name = 'Compliance Audits'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,438 @@
+"""
+Portable audit bundles.
+
+A bundle is a gzip-compressed tar archive holding one audit with
+everything attached to it::
+
+    manifest.json         format version, audit and application snapshot
+    checklist.json        the checklist items the responses refer to
+    responses.jsonl       one response per line
+    remediations.jsonl    one remediation per line
+    evidence.jsonl        evidence metadata, pointing at the blobs below
+    scores.jsonl          compliance scores calculated from the audit
+    evidence/<id>/<name>  evidence file contents
+
+``iter_bundle`` produces the archive as a stream of compressed chunks and
+``import_bundle`` reads one back from a file object without seeking, so
+neither side holds evidence blobs in memory. Rows are linked by their ids
+in the source database and remapped on import; users and checklist items
+are matched by username and code.
+"""
+import json
+import os
+import tarfile
+import tempfile
+import time
+import zlib
+from decimal import Decimal
+
+from django.contrib.auth import get_user_model
+from django.core.files.base import File
+from django.core.files.storage import default_storage
+from django.core.serializers.json import DjangoJSONEncoder
+from django.db import transaction
+from django.utils.dateparse import parse_date, parse_datetime
+
+FORMAT_VERSION = 1
+BATCH_SIZE = 500
+CHUNK_SIZE = 64 * 1024
+# JSONL members are spooled to disk beyond this size while being sized.
+SPOOL_SIZE = 1024 * 1024
+
+# Row timestamps are set by auto_now(_add) fields, so imported rows are
+# stamped with the time of the import.
+RESPONSE_FIELDS = [
+    'status', 'findings', 'evidence_notes', 'recommendations', 'reviewed_at',
+]
+REMEDIATION_FIELDS = [
+    'title', 'description', 'status', 'priority', 'due_date', 'resolved_at',
+    'resolution_notes',
+]
+EVIDENCE_FIELDS = ['title', 'evidence_type', 'description']
+SCORE_FIELDS = ['overall_score', 'critical_score', 'major_score']
+CHECKLIST_FIELDS = ['code', 'title', 'description', 'severity', 'order']
+AUDIT_FIELDS = [
+    'title', 'description', 'status', 'scheduled_date', 'started_at',
+    'completed_at', 'notes', 'created_at',
+]
+APPLICATION_FIELDS = [
+    'name', 'application_type', 'environment', 'department', 'version',
+]
+
+DATETIME_FIELDS = {'reviewed_at', 'resolved_at', 'started_at', 'completed_at', 'created_at'}
+DATE_FIELDS = {'due_date', 'scheduled_date'}
+DECIMAL_FIELDS = set(SCORE_FIELDS)
+
+
+class BundleError(ValueError):
+    """Raised when a bundle cannot be imported."""
+
+
+def _dump(values):
+    return json.dumps(values, cls=DjangoJSONEncoder)
+
+
+def _row(obj, fields, **extra):
+    row = {field: getattr(obj, field) for field in fields}
+    row.update(extra)
+    return row
+
+
+def _load(row):
+    for field, value in row.items():
+        if value is None:
+            continue
+        if field in DATETIME_FIELDS:
+            row[field] = parse_datetime(value)
+        elif field in DATE_FIELDS:
+            row[field] = parse_date(value)
+        elif field in DECIMAL_FIELDS:
+            row[field] = Decimal(value)
+    return row
+
+
+# ---------------------------------------------------------------------------
+# Export
+# ---------------------------------------------------------------------------
+
+class _TarStream:
+    """Incrementally writes a gzip-compressed tar archive, yielding chunks."""
+
+    def __init__(self):
+        self._compressor = zlib.compressobj(6, zlib.DEFLATED, 31)
+
+    def _compress(self, data):
+        return self._compressor.compress(data)
+
+    def member(self, name, size, chunks):
+        info = tarfile.TarInfo(name)
+        info.size = size
+        info.mtime = int(time.time())
+        info.mode = 0o644
+        yield self._compress(info.tobuf(format=tarfile.PAX_FORMAT))
+        written = 0
+        for chunk in chunks:
+            written += len(chunk)
+            yield self._compress(chunk)
+        if written != size:
+            raise IOError(f'{name} changed while being exported')
+        remainder = size % tarfile.BLOCKSIZE
+        if remainder:
+            yield self._compress(tarfile.NUL * (tarfile.BLOCKSIZE - remainder))
+
+    def json_member(self, name, value):
+        data = _dump(value).encode('utf-8')
+        yield from self.member(name, len(data), [data])
+
+    def jsonl_member(self, name, rows):
+        with tempfile.SpooledTemporaryFile(max_size=SPOOL_SIZE) as spool:
+            for row in rows:
+                spool.write(_dump(row).encode('utf-8'))
+                spool.write(b'\n')
+            size = spool.tell()
+            spool.seek(0)
+            yield from self.member(name, size, iter(lambda: spool.read(CHUNK_SIZE), b''))
+
+    def close(self):
+        yield self._compress(tarfile.NUL * tarfile.BLOCKSIZE * 2)
+        yield self._compressor.flush()
+
+
+def _evidence_path(evidence):
+    return f'evidence/{evidence.pk}/{os.path.basename(evidence.file.name)}'
+
+
+def iter_bundle(audit):
+    """Yield the compressed bundle of ``audit`` chunk by chunk."""
+    from apps.compliance.models import Evidence, Remediation
+    from .models import ChecklistItem
+
+    stream = _TarStream()
+    application = audit.application
+    responses = list(audit.get_responses())
+    response_ids = [response.pk for response in responses]
+    items = ChecklistItem.objects.in_bulk(
+        [response.checklist_item_id for response in responses]
+    )
+    reviewers = dict(get_user_model().objects.filter(
+        pk__in={response.reviewed_by_id for response in responses}
+    ).values_list('pk', 'username'))
+
+    yield from stream.json_member('manifest.json', {
+        'format': FORMAT_VERSION,
+        'audit': _row(
+            audit, AUDIT_FIELDS,
+            id=audit.pk,
+            auditor=audit.auditor.username if audit.auditor else None,
+        ),
+        'application': _row(application, APPLICATION_FIELDS, id=application.pk),
+    })
+    yield from stream.json_member('checklist.json', [
+        _row(item, CHECKLIST_FIELDS, id=item.pk) for item in items.values()
+    ])
+    yield from stream.jsonl_member('responses.jsonl', (
+        _row(
+            response, RESPONSE_FIELDS,
+            id=response.pk,
+            checklist_item=response.checklist_item_id,
+            reviewed_by=reviewers.get(response.reviewed_by_id),
+        )
+        for response in responses
+    ))
+
+    remediations = Remediation.objects.filter(
+        audit_response__in=response_ids
+    ).select_related('assigned_to').order_by('pk')
+    yield from stream.jsonl_member('remediations.jsonl', (
+        _row(
+            remediation, REMEDIATION_FIELDS,
+            id=remediation.pk,
+            audit_response=remediation.audit_response_id,
+            assigned_to=remediation.assigned_to.username if remediation.assigned_to else None,
+        )
+        for remediation in remediations.iterator(chunk_size=BATCH_SIZE)
+    ))
+
+    evidence = Evidence.objects.filter(
+        audit_response__in=response_ids
+    ).select_related('uploaded_by').order_by('pk')
+    present = []
+    rows = []
+    for item in evidence.iterator(chunk_size=BATCH_SIZE):
+        exists = bool(item.file) and item.file.storage.exists(item.file.name)
+        if exists:
+            present.append(item)
+        rows.append(_row(
+            item, EVIDENCE_FIELDS,
+            id=item.pk,
+            audit_response=item.audit_response_id,
+            uploaded_by=item.uploaded_by.username if item.uploaded_by else None,
+            path=_evidence_path(item) if exists else None,
+        ))
+    yield from stream.jsonl_member('evidence.jsonl', rows)
+
+    yield from stream.jsonl_member('scores.jsonl', (
+        _row(score, SCORE_FIELDS, id=score.pk)
+        for score in audit.scores.order_by('pk')
+    ))
+
+    for item in present:
+        with item.file.open('rb') as fh:
+            yield from stream.member(
+                _evidence_path(item), item.file.size, fh.chunks(CHUNK_SIZE)
+            )
+
+    yield from stream.close()
+
+
+def write_bundle(audit, fh):
+    """Write the bundle of ``audit`` to a binary file object."""
+    size = 0
+    for chunk in iter_bundle(audit):
+        if chunk:
+            fh.write(chunk)
+            size += len(chunk)
+    return size
+
+
+# ---------------------------------------------------------------------------
+# Import
+# ---------------------------------------------------------------------------
+
+class _Importer:
+    def __init__(self, application, user):
+        self.application = application
+        self.user = user
+        self.audit = None
+        self.items = {}
+        self.responses = {}
+        self.evidence = {}
+        self.pending_evidence = []
+        self.saved_files = []
+        self.users = {}
+        self.counts = {
+            'responses': 0, 'remediations': 0, 'evidence': 0, 'scores': 0,
+        }
+
+    def lookup_user(self, username):
+        if not username:
+            return None
+        if username not in self.users:
+            User = get_user_model()
+            self.users[username] = User.objects.filter(
+                username=username
+            ).values_list('pk', flat=True).first()
+        return self.users[username]
+
+    def require_audit(self, name):
+        if self.audit is None:
+            raise BundleError(f'{name} appears before manifest.json')
+
+    def manifest(self, data):
+        from .models import Audit
+        if data.get('format') != FORMAT_VERSION:
+            raise BundleError(f'Unsupported bundle format {data.get("format")!r}')
+        fields = _load({field: data['audit'].get(field) for field in AUDIT_FIELDS})
+        created_at = fields.pop('created_at')
+        auditor = self.lookup_user(data['audit'].get('auditor'))
+        self.audit = Audit.objects.create(
+            application=self.application,
+            auditor_id=auditor or (self.user.pk if self.user else None),
+            **fields,
+        )
+        if created_at:
+            Audit.objects.filter(pk=self.audit.pk).update(created_at=created_at)
+
+    def checklist(self, rows):
+        from .models import ChecklistItem
+        local = dict(ChecklistItem.objects.filter(
+            code__in=[row['code'] for row in rows]
+        ).values_list('code', 'pk'))
+        missing = sorted(row['code'] for row in rows if row['code'] not in local)
+        if missing:
+            raise BundleError(f'Checklist items missing here: {", ".join(missing)}')
+        self.items = {row['id']: local[row['code']] for row in rows}
+
+    def responses_batch(self, rows):
+        from .models import AuditResponse
+        AuditResponse.objects.bulk_create([
+            AuditResponse(
+                audit=self.audit,
+                checklist_item_id=self.items[row['checklist_item']],
+                reviewed_by_id=self.lookup_user(row['reviewed_by']),
+                **{field: row[field] for field in RESPONSE_FIELDS},
+            )
+            for row in rows
+        ])
+        # Ids are not returned by every backend, so map them back through
+        # the (audit, checklist item) unique key.
+        by_item = dict(AuditResponse.objects.filter(
+            audit=self.audit,
+            checklist_item__in=[self.items[row['checklist_item']] for row in rows],
+        ).values_list('checklist_item_id', 'pk'))
+        for row in rows:
+            self.responses[row['id']] = by_item[self.items[row['checklist_item']]]
+        self.counts['responses'] += len(rows)
+
+    def remediations_batch(self, rows):
+        from apps.compliance.models import Remediation
+        Remediation.objects.bulk_create([
+            Remediation(
+                audit_response_id=self.responses[row['audit_response']],
+                assigned_to_id=self.lookup_user(row['assigned_to']),
+                **{field: row[field] for field in REMEDIATION_FIELDS},
+            )
+            for row in rows
+        ])
+        self.counts['remediations'] += len(rows)
+
+    def evidence_batch(self, rows):
+        for row in rows:
+            if row['path']:
+                self.evidence[row['path']] = row
+
+    def scores_batch(self, rows):
+        from apps.compliance.models import ComplianceScore
+        ComplianceScore.objects.bulk_create([
+            ComplianceScore(
+                application=self.application,
+                audit=self.audit,
+                calculated_by=self.user,
+                **{field: row[field] for field in SCORE_FIELDS},
+            )
+            for row in rows
+        ])
+        self.counts['scores'] += len(rows)
+
+    def blob(self, name, fh):
+        from apps.compliance.models import Evidence
+        row = self.evidence.pop(name, None)
+        if row is None:
+            raise BundleError(f'{name} is not listed in evidence.jsonl')
+        field = Evidence._meta.get_field('file')
+        evidence = Evidence(
+            audit_response_id=self.responses[row['audit_response']],
+            uploaded_by_id=self.lookup_user(row['uploaded_by']),
+            **{field_name: row[field_name] for field_name in EVIDENCE_FIELDS},
+        )
+        stored = default_storage.save(
+            field.generate_filename(evidence, os.path.basename(name)), File(fh)
+        )
+        self.saved_files.append(stored)
+        evidence.file.name = stored
+        self.pending_evidence.append(evidence)
+        if len(self.pending_evidence) >= BATCH_SIZE:
+            self.flush_evidence()
+
+    def flush_evidence(self):
+        from apps.compliance.models import Evidence
+        Evidence.objects.bulk_create(self.pending_evidence)
+        self.counts['evidence'] += len(self.pending_evidence)
+        self.pending_evidence = []
+
+    def finish(self):
+        from apps.compliance import rollups
+        from .models import AuditStatusVector
+        self.flush_evidence()
+        if self.evidence:
+            raise BundleError(f'{len(self.evidence)} evidence file(s) missing from the bundle')
+        AuditStatusVector.rebuild(self.audit)
+        rollups.refresh_group(*rollups.group_key(self.application))
+
+
+def _iter_jsonl(fh):
+    batch = []
+    for line in fh:
+        if line.strip():
+            batch.append(_load(json.loads(line.decode('utf-8'))))
+        if len(batch) >= BATCH_SIZE:
+            yield batch
+            batch = []
+    if batch:
+        yield batch
+
+
+JSONL_HANDLERS = {
+    'responses.jsonl': 'responses_batch',
+    'remediations.jsonl': 'remediations_batch',
+    'evidence.jsonl': 'evidence_batch',
+    'scores.jsonl': 'scores_batch',
+}
+
+
+def import_bundle(fh, application, user=None):
+    """
+    Import the bundle read from binary file object ``fh`` as a new audit of
+    ``application``. Returns ``(audit, counts)``. The archive is read as a
+    stream, evidence blobs are copied straight into storage, and database
+    rows are bulk-inserted in batches inside a single transaction; on
+    failure the stored blobs are removed again.
+    """
+    importer = _Importer(application, user)
+    try:
+        with transaction.atomic(), tarfile.open(fileobj=fh, mode='r|gz') as archive:
+            for member in archive:
+                if not member.isfile():
+                    continue
+                data = archive.extractfile(member)
+                if member.name == 'manifest.json':
+                    importer.manifest(json.load(data))
+                elif member.name == 'checklist.json':
+                    importer.require_audit(member.name)
+                    importer.checklist(json.load(data))
+                elif member.name in JSONL_HANDLERS:
+                    importer.require_audit(member.name)
+                    handler = getattr(importer, JSONL_HANDLERS[member.name])
+                    for batch in _iter_jsonl(data):
+                        handler(batch)
+                elif member.name.startswith('evidence/'):
+                    importer.require_audit(member.name)
+                    importer.blob(member.name, data)
+            if importer.audit is None:
+                raise BundleError('The archive has no manifest.json')
+            importer.finish()
+    except Exception:
+        for name in importer.saved_files:
+            default_storage.delete(name)
+        raise
+    return importer.audit, importer.counts
@@ -0,0 +1,278 @@
+"""
+TF-IDF similarity index over historical audit findings.
+
+The index is built offline by the ``build_findings_index`` command into a
+single binary file and memory-mapped at runtime. Suggestions are always
+for one checklist item, so the index is partitioned by item: a lookup
+only reads the posting lists of the query's terms within that item's
+partition, and its cost does not grow with the rest of the corpus.
+Layout::
+
+    MAGIC | header length (uint32) | header JSON | directory | postings | documents
+
+The header holds the vocabulary (term -> idf, term id), the offsets of the
+binary regions and, per checklist item, the slice of the directory and the
+range of document numbers belonging to it. A directory entry is ``(term
+id, posting offset, posting count)``; each item's entries are sorted by
+term id so a term is found by binary search. A posting is a ``(document
+number, weight)`` pair of uint32/float32; weights are L2-normalised
+TF-IDF, so the dot product with a normalised query is the cosine
+similarity. Documents are numbered in checklist item order; a document
+entry is ``(checklist item id, uses, text offset, text length)`` pointing
+at a UTF-8 JSON ``[findings, recommendations]`` pair stored after the
+entry table.
+
+Each organization gets its own index file (see ``index_path``) so that
+suggestions never surface another tenant's findings.
+"""
+import heapq
+import json
+import logging
+import math
+import mmap
+import os
+import re
+import struct
+import threading
+from collections import Counter, defaultdict
+
+from django.conf import settings
+
+logger = logging.getLogger(__name__)
+
+MAGIC = b'DPFI0002'
+HEADER_LENGTH = struct.Struct('<I')
+DIRECTORY = struct.Struct('<IQI')
+POSTING = struct.Struct('<If')
+DOCUMENT = struct.Struct('<IIQI')
+
+TOKEN_RE = re.compile(r'[a-z0-9]{2,}')
+STOPWORDS = frozenset(
+    'an and are as at be by for from has have in is it its not of on or '
+    'that the this to was were which with'.split()
+)
+
+
+def tokenize(text):
+    return [token for token in TOKEN_RE.findall(text.lower()) if token not in STOPWORDS]
+
+
+def _normalise(text):
+    return ' '.join(text.split())
+
+
+def build(rows, path):
+    """
+    Write an index for ``rows`` of ``(checklist_item_id, findings,
+    recommendations)`` to ``path``. Identical findings for the same item are
+    stored once with a use count. Returns the number of distinct documents.
+    """
+    uses = Counter()
+    recommendations = {}
+    for item_id, findings, recommendation in rows:
+        findings = _normalise(findings)
+        if not tokenize(findings):
+            continue
+        key = (item_id, findings)
+        uses[key] += 1
+        # Keep the most complete recommendation seen for a finding.
+        recommendation = _normalise(recommendation or '')
+        if len(recommendation) >= len(recommendations.get(key, '')):
+            recommendations[key] = recommendation
+
+    # Number the documents in item order so each item owns a contiguous range.
+    documents = sorted(uses)
+    term_counts = [Counter(tokenize(findings)) for _, findings in documents]
+    document_frequency = Counter()
+    for counts in term_counts:
+        document_frequency.update(counts.keys())
+
+    total = len(documents)
+    term_ids = {term: number for number, term in enumerate(sorted(document_frequency))}
+    vocabulary = {
+        term: [math.log((1 + total) / (1 + df)) + 1, term_ids[term]]
+        for term, df in document_frequency.items()
+    }
+
+    # postings[item][term id] -> [(document number, weight)]
+    postings = defaultdict(lambda: defaultdict(list))
+    for number, ((item_id, _), counts) in enumerate(zip(documents, term_counts)):
+        weights = {term: (1 + math.log(tf)) * vocabulary[term][0] for term, tf in counts.items()}
+        norm = math.sqrt(sum(w * w for w in weights.values())) or 1.0
+        for term, weight in weights.items():
+            postings[item_id][term_ids[term]].append((number, weight / norm))
+
+    items = {}
+    directory = bytearray()
+    posting_blob = bytearray()
+    entries = 0
+    for number, (item_id, _) in enumerate(documents):
+        if item_id not in items:
+            items[item_id] = [entries, len(postings[item_id]), number, 0]
+            for term_id in sorted(postings[item_id]):
+                item_postings = postings[item_id][term_id]
+                directory += DIRECTORY.pack(term_id, len(posting_blob), len(item_postings))
+                for posting in item_postings:
+                    posting_blob += POSTING.pack(*posting)
+            entries += len(postings[item_id])
+        items[item_id][3] += 1
+
+    texts = bytearray()
+    table = bytearray()
+    for key in documents:
+        item_id, findings = key
+        text = json.dumps([findings, recommendations[key]]).encode('utf-8')
+        table += DOCUMENT.pack(item_id, uses[key], len(texts), len(text))
+        texts += text
+
+    header = json.dumps({
+        'documents': total,
+        'vocabulary': vocabulary,
+        'items': items,
+        'directory_size': len(directory),
+        'postings_size': len(posting_blob),
+        'table_size': len(table),
+    }).encode('utf-8')
+
+    os.makedirs(os.path.dirname(path) or '.', exist_ok=True)
+    tmp_path = f'{path}.tmp'
+    with open(tmp_path, 'wb') as fh:
+        fh.write(MAGIC)
+        fh.write(HEADER_LENGTH.pack(len(header)))
+        fh.write(header)
+        fh.write(directory)
+        fh.write(posting_blob)
+        fh.write(table)
+        fh.write(texts)
+    os.replace(tmp_path, path)
+    return total
+
+
+class FindingsIndex:
+    """A read-only, memory-mapped view of an index file."""
+
+    def __init__(self, path):
+        self.path = path
+        self.mtime = os.stat(path).st_mtime
+        with open(path, 'rb') as fh:
+            self._map = mmap.mmap(fh.fileno(), 0, access=mmap.ACCESS_READ)
+        if self._map[:len(MAGIC)] != MAGIC:
+            raise ValueError(f'{path} is not a findings index of this version')
+        offset = len(MAGIC)
+        (header_size,) = HEADER_LENGTH.unpack_from(self._map, offset)
+        offset += HEADER_LENGTH.size
+        header = json.loads(self._map[offset:offset + header_size])
+        self.documents = header['documents']
+        self.vocabulary = header['vocabulary']
+        self.items = {int(item_id): entry for item_id, entry in header['items'].items()}
+        self._directory = offset + header_size
+        self._postings = self._directory + header['directory_size']
+        self._table = self._postings + header['postings_size']
+        self._texts = self._table + header['table_size']
+
+    def close(self):
+        self._map.close()
+
+    def _document(self, number):
+        return DOCUMENT.unpack_from(self._map, self._table + number * DOCUMENT.size)
+
+    def _postings_of(self, first, count, term_id):
+        """Binary-search an item's directory slice for ``term_id``."""
+        low, high = first, first + count
+        while low < high:
+            middle = (low + high) // 2
+            entry_term, offset, length = DIRECTORY.unpack_from(
+                self._map, self._directory + middle * DIRECTORY.size
+            )
+            if entry_term == term_id:
+                return offset, length
+            if entry_term < term_id:
+                low = middle + 1
+            else:
+                high = middle
+        return None
+
+    def search(self, checklist_item_id, text, limit=5):
+        """
+        Return up to ``limit`` past findings for ``checklist_item_id`` most
+        similar to ``text``, as dicts with findings, recommendations, score
+        and uses.
+        """
+        item = self.items.get(checklist_item_id)
+        if item is None:
+            return []
+        first_entry, entry_count, _, _ = item
+
+        counts = Counter(term for term in tokenize(text) if term in self.vocabulary)
+        if not counts:
+            return []
+
+        query = {
+            term: (1 + math.log(tf)) * self.vocabulary[term][0]
+            for term, tf in counts.items()
+        }
+        norm = math.sqrt(sum(w * w for w in query.values()))
+
+        scores = defaultdict(float)
+        for term, weight in query.items():
+            found = self._postings_of(first_entry, entry_count, self.vocabulary[term][1])
+            if found is None:
+                continue
+            offset, length = found
+            start = self._postings + offset
+            for index in range(length):
+                number, doc_weight = POSTING.unpack_from(self._map, start + index * POSTING.size)
+                scores[number] += weight / norm * doc_weight
+
+        results = []
+        for number, score in heapq.nlargest(limit, scores.items(), key=lambda pair: pair[1]):
+            _, uses, offset, length = self._document(number)
+            start = self._texts + offset
+            findings, recommendations = json.loads(self._map[start:start + length])
+            results.append({
+                'findings': findings,
+                'recommendations': recommendations,
+                'score': round(score, 3),
+                'uses': uses,
+            })
+        return results
+
+
+_indexes = {}
+_lock = threading.Lock()
+
+
+def index_path(organization_id=None, base=None):
+    """
+    Return the index file of an organization: ``FINDINGS_INDEX_PATH`` with
+    the organization id before the extension, or unchanged for ``None``.
+    """
+    base = str(base or settings.FINDINGS_INDEX_PATH)
+    if organization_id is None:
+        return base
+    root, ext = os.path.splitext(base)
+    return f'{root}.{organization_id}{ext}'
+
+
+def get_index(organization_id=None):
+    """
+    Return the process-wide index of an organization, reopening it when the
+    file on disk has been rebuilt. Returns ``None`` if no index has been
+    built yet.
+    """
+    path = index_path(organization_id)
+    try:
+        mtime = os.stat(path).st_mtime
+    except FileNotFoundError:
+        return None
+    with _lock:
+        index = _indexes.get(path)
+        if index is None or index.mtime != mtime:
+            # The previous map is left to the garbage collector, as other
+            # threads may still be reading from it.
+            try:
+                index = _indexes[path] = FindingsIndex(path)
+            except ValueError as exc:
+                logger.warning('%s; run build_findings_index', exc)
+                return None
+        return index
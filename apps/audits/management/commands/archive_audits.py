@@ -0,0 +1,70 @@
+"""
+Management command to move responses of old completed audits to cold storage.
+Run with: python manage.py archive_audits [--days N] [--limit N] [--dry-run]
+"""
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from django.db import transaction
+from django.db.models import Q
+from django.utils import timezone
+from apps.audits.models import Audit, AuditArchive
+
+
+class Command(BaseCommand):
+    help = 'Archive responses of completed audits older than the configured age'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--days',
+            type=int,
+            default=settings.AUDIT_ARCHIVE_AFTER_DAYS,
+            help='Archive audits completed more than this many days ago',
+        )
+        parser.add_argument(
+            '--limit',
+            type=int,
+            default=None,
+            help='Maximum number of audits to archive in this run',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report which audits would be archived',
+        )
+
+    def handle(self, *args, **options):
+        cutoff = timezone.now() - timedelta(days=options['days'])
+        
+        # Remediations and evidence cascade from responses, so audits that
+        # have any stay hot.
+        audits = Audit.objects.filter(
+            status='completed',
+            completed_at__lt=cutoff,
+            archive__isnull=True,
+        ).exclude(
+            Q(responses__remediations__isnull=False) |
+            Q(responses__evidence_files__isnull=False)
+        ).distinct().order_by('completed_at')
+        
+        audit_ids = list(audits.values_list('pk', flat=True)[:options['limit']])
+        self.stdout.write(
+            f'{len(audit_ids)} audit(s) completed before {cutoff:%Y-%m-%d} eligible for archival'
+        )
+        
+        if options['dry_run']:
+            return
+        
+        archived = 0
+        for audit_id in audit_ids:
+            with transaction.atomic():
+                audit = Audit.objects.select_for_update().get(pk=audit_id)
+                archive = AuditArchive.archive(audit)
+            archived += 1
+            self.stdout.write(
+                f'  Archived audit {audit_id} ({archive.response_count} responses, '
+                f'{len(archive.payload)} bytes)'
+            )
+        
+        self.stdout.write(self.style.SUCCESS(f'Archived {archived} audit(s)'))
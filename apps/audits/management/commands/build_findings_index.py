@@ -0,0 +1,48 @@
+"""
+Management command to build the findings similarity indexes.
+Run with: python manage.py build_findings_index
+"""
+import time
+
+from django.conf import settings
+from django.core.management.base import BaseCommand
+from apps.audits import findings_index
+from apps.audits.models import Audit, AuditArchive, AuditResponse
+
+
+class Command(BaseCommand):
+    help = 'Build the per-organization TF-IDF indexes of past findings used for autosuggest'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default=settings.FINDINGS_INDEX_PATH,
+            help='Base path of the index files to write',
+        )
+
+    def rows(self, organization_id):
+        responses = AuditResponse.objects.filter(
+            audit__organization=organization_id
+        ).exclude(findings='').values_list(
+            'checklist_item_id', 'findings', 'recommendations'
+        )
+        yield from responses.iterator(chunk_size=2000)
+        
+        archives = AuditArchive.objects.filter(audit__organization=organization_id)
+        for archive in archives.iterator(chunk_size=100):
+            for row in archive.unpack():
+                if row['findings']:
+                    yield row['checklist_item_id'], row['findings'], row['recommendations']
+
+    def handle(self, *args, **options):
+        organization_ids = Audit.objects.order_by().values_list(
+            'organization', flat=True
+        ).distinct()
+        for organization_id in organization_ids:
+            started = time.monotonic()
+            path = findings_index.index_path(organization_id, options['output'])
+            count = findings_index.build(self.rows(organization_id), path)
+            self.stdout.write(self.style.SUCCESS(
+                f'Indexed {count} distinct finding(s) into {path} '
+                f'in {time.monotonic() - started:.1f}s'
+            ))
@@ -0,0 +1,39 @@
+"""
+Management command to export an audit as a portable bundle.
+Run with: python manage.py export_audit_bundle <audit_id> [--output PATH]
+"""
+import sys
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.audits import bundle
+from apps.audits.models import Audit
+
+
+class Command(BaseCommand):
+    help = 'Export an audit with its responses, remediations, evidence and scores'
+
+    def add_arguments(self, parser):
+        parser.add_argument('audit_id', type=int, help='Audit to export')
+        parser.add_argument(
+            '--output',
+            default=None,
+            help='File to write (default: audit-<id>.tar.gz; "-" for stdout)',
+        )
+
+    def handle(self, *args, **options):
+        audit = Audit.objects.select_related('application', 'auditor').filter(
+            pk=options['audit_id']
+        ).first()
+        if audit is None:
+            raise CommandError(f'Audit {options["audit_id"]} does not exist')
+        
+        output = options['output'] or f'audit-{audit.pk}.tar.gz'
+        if output == '-':
+            bundle.write_bundle(audit, sys.stdout.buffer)
+            return
+        
+        with open(output, 'wb') as fh:
+            size = bundle.write_bundle(audit, fh)
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported audit {audit.pk} to {output} ({size} bytes)'
+        ))
@@ -0,0 +1,54 @@
+"""
+Management command to import a portable audit bundle.
+Run with: python manage.py import_audit_bundle <path> --application <id>
+"""
+import sys
+import tarfile
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.audits import bundle
+from apps.compliance.models import Application
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Import an audit bundle as a new audit of an existing application'
+
+    def add_arguments(self, parser):
+        parser.add_argument('path', help='Bundle file to read ("-" for stdin)')
+        parser.add_argument(
+            '--application',
+            type=int,
+            required=True,
+            help='Application the imported audit belongs to',
+        )
+        parser.add_argument(
+            '--user',
+            default=None,
+            help='Username recorded as auditor when the original is unknown here',
+        )
+
+    def handle(self, *args, **options):
+        application = Application.objects.filter(pk=options['application']).first()
+        if application is None:
+            raise CommandError(f'Application {options["application"]} does not exist')
+        
+        user = None
+        if options['user']:
+            user = User.objects.filter(username=options['user']).first()
+            if user is None:
+                raise CommandError(f'User {options["user"]} does not exist')
+        
+        try:
+            if options['path'] == '-':
+                audit, counts = bundle.import_bundle(sys.stdin.buffer, application, user)
+            else:
+                with open(options['path'], 'rb') as fh:
+                    audit, counts = bundle.import_bundle(fh, application, user)
+        except (bundle.BundleError, tarfile.TarError) as exc:
+            raise CommandError(str(exc))
+        
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(
+            f'Imported audit {audit.pk} into {application.name}: {summary}'
+        ))
@@ -23,7 +23,7 @@ class Command(BaseCommand):
                 'first_name': 'System',
                 'last_name': 'Administrator',
                 'role': 'admin',
-                'organization': 'DP-COMPASS',
+                'department': 'DP-COMPASS',
                 'is_verified': True,
                 'is_staff': True,
                 'is_superuser': True,
@@ -37,7 +37,7 @@ class Command(BaseCommand):
             admin.role = 'admin'
             admin.first_name = 'System'
             admin.last_name = 'Administrator'
-            admin.organization = 'DP-COMPASS'
+            admin.department = 'DP-COMPASS'
             admin.is_verified = True
             admin.save()
             self.stdout.write('  Updated admin user')
@@ -50,7 +50,7 @@ class Command(BaseCommand):
                 'first_name': 'Priya',
                 'last_name': 'Sharma',
                 'role': 'auditor',
-                'organization': 'Compliance Team',
+                'department': 'Compliance Team',
                 'designation': 'Senior Compliance Auditor',
                 'is_verified': True,
             }
@@ -68,7 +68,7 @@ class Command(BaseCommand):
                 'first_name': 'Rahul',
                 'last_name': 'Kumar',
                 'role': 'developer',
-                'organization': 'Engineering Team',
+                'department': 'Engineering Team',
                 'designation': 'Tech Lead',
                 'is_verified': True,
             }
@@ -0,0 +1,29 @@
+"""
+Management command to (re)build packed audit status vectors.
+Run with: python manage.py rebuild_status_vectors [--missing-only]
+"""
+from django.core.management.base import BaseCommand
+from apps.audits.models import Audit, AuditStatusVector
+
+
+class Command(BaseCommand):
+    help = 'Rebuild the packed status vector of every audit'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--missing-only',
+            action='store_true',
+            help='Only build vectors for audits that do not have one yet',
+        )
+
+    def handle(self, *args, **options):
+        audits = Audit.objects.select_related('archive')
+        if options['missing_only']:
+            audits = audits.filter(status_vector__isnull=True)
+        
+        count = 0
+        for audit in audits.iterator():
+            AuditStatusVector.rebuild(audit)
+            count += 1
+        
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt {count} status vector(s)'))
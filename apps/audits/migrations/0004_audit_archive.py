@@ -0,0 +1,35 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:00
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0003_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='AuditArchive',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('payload', models.BinaryField(help_text='zlib-compressed JSON list of the archived responses')),
+                ('response_count', models.PositiveIntegerField(default=0)),
+                ('pending_count', models.PositiveIntegerField(default=0)),
+                ('compliant_count', models.PositiveIntegerField(default=0)),
+                ('non_compliant_count', models.PositiveIntegerField(default=0)),
+                ('partially_compliant_count', models.PositiveIntegerField(default=0)),
+                ('not_applicable_count', models.PositiveIntegerField(default=0)),
+                ('archived_at', models.DateTimeField(auto_now_add=True)),
+                ('audit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='archive', to='audits.audit')),
+            ],
+            options={
+                'verbose_name': 'Audit Archive',
+                'verbose_name_plural': 'Audit Archives',
+                'db_table': 'audit_archives',
+                'ordering': ['-archived_at'],
+            },
+        ),
+    ]
@@ -0,0 +1,41 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:02
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def assign_ordinals(apps, schema_editor):
+    ChecklistItem = apps.get_model('audits', 'ChecklistItem')
+    for ordinal, item in enumerate(ChecklistItem.objects.order_by('pk')):
+        item.ordinal = ordinal
+        item.save(update_fields=['ordinal'])
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0004_audit_archive'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='checklistitem',
+            name='ordinal',
+            field=models.PositiveIntegerField(editable=False, help_text='Stable position of the item in packed audit status vectors', null=True, unique=True),
+        ),
+        migrations.RunPython(assign_ordinals, migrations.RunPython.noop),
+        migrations.CreateModel(
+            name='AuditStatusVector',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('vector', models.BinaryField(default=b'')),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('audit', models.OneToOneField(on_delete=django.db.models.deletion.CASCADE, related_name='status_vector', to='audits.audit')),
+            ],
+            options={
+                'verbose_name': 'Audit Status Vector',
+                'verbose_name_plural': 'Audit Status Vectors',
+                'db_table': 'audit_status_vectors',
+            },
+        ),
+    ]
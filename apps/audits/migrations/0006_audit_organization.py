@@ -0,0 +1,47 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def copy_organizations(apps, schema_editor):
+    Audit = apps.get_model('audits', 'Audit')
+    Application = apps.get_model('compliance', 'Application')
+    Audit.objects.update(
+        organization=Subquery(
+            Application.objects.filter(pk=OuterRef('application')).values('organization')[:1]
+        )
+    )
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0005_status_vectors'),
+        ('compliance', '0005_application_organization'),
+        ('users', '0003_organizations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='audit',
+            name='organization',
+            field=models.ForeignKey(blank=True, editable=False, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='audits', to='users.organization'),
+        ),
+        migrations.RunPython(copy_organizations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['organization', '-created_at'], name='audit_org_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['organization', 'status'], name='audit_org_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['organization', 'auditor'], name='audit_org_auditor_idx'),
+        ),
+    ]
@@ -0,0 +1,29 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:24
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0006_audit_organization'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ChecklistPack',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('version', models.CharField(max_length=50)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('applied_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Checklist Pack',
+                'verbose_name_plural': 'Checklist Packs',
+                'db_table': 'checklist_packs',
+                'ordering': ['name'],
+            },
+        ),
+    ]
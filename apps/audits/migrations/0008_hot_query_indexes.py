@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0007_checklist_packs'),
+        ('compliance', '0005_application_organization'),
+        ('core', '0002_boot_steps'),
+        ('users', '0003_organizations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['auditor', 'status'], name='audit_auditor_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='audit',
+            index=models.Index(fields=['application', '-created_at'], name='audit_app_created_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditcategory',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['order', 'name'], name='category_active_order_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='auditresponse',
+            index=models.Index(fields=['audit', 'status'], name='response_audit_status_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='checklistitem',
+            index=models.Index(condition=models.Q(('is_active', True)), fields=['category', 'order', 'code'], name='checklist_item_active_idx'),
+        ),
+    ]
@@ -1,10 +1,23 @@
 """
 Audit models for DPDP compliance assessment.
-Includes checklist categories, items, and audit responses.
+Includes checklist categories, items, audit responses and archives.
 """
-from django.db import models
+import json
+import zlib
+
+from django.db import models, transaction
 from django.conf import settings
-from apps.core.models import TimeStampedModel, DPDPSection
+from django.utils.dateparse import parse_datetime
+from apps.core.models import LoadedFieldsMixin, TimeStampedModel, DPDPSection
+from apps.core.tenancy import TenantManager
+from . import status_vector
+
+# Response counts behind ``Audit.progress_percentage``; list views annotate
+# them so that rendering the progress of each row costs no queries.
+PROGRESS_COUNTS = {
+    'response_total': models.Count('responses'),
+    'answered_total': models.Count('responses', filter=~models.Q(responses__status='pending')),
+}
 
 
 class AuditCategory(TimeStampedModel):
@@ -27,6 +40,13 @@ class AuditCategory(TimeStampedModel):
         ordering = ['order', 'name']
         verbose_name = 'Audit Category'
         verbose_name_plural = 'Audit Categories'
+        indexes = [
+            models.Index(
+                fields=['order', 'name'],
+                condition=models.Q(is_active=True),
+                name='category_active_order_idx',
+            ),
+        ]
 
     def __str__(self):
         return self.name
@@ -72,6 +92,12 @@ class ChecklistItem(TimeStampedModel):
         default='major'
     )
     order = models.PositiveIntegerField(default=0)
+    ordinal = models.PositiveIntegerField(
+        unique=True,
+        null=True,
+        editable=False,
+        help_text='Stable position of the item in packed audit status vectors'
+    )
     is_active = models.BooleanField(default=True)
 
     class Meta:
@@ -79,12 +105,51 @@ class ChecklistItem(TimeStampedModel):
         ordering = ['category', 'order', 'code']
         verbose_name = 'Checklist Item'
         verbose_name_plural = 'Checklist Items'
+        indexes = [
+            models.Index(
+                fields=['category', 'order', 'code'],
+                condition=models.Q(is_active=True),
+                name='checklist_item_active_idx',
+            ),
+        ]
 
     def __str__(self):
         return f"{self.code}: {self.title}"
+    
+    def save(self, *args, **kwargs):
+        if self.ordinal is None:
+            self.ordinal = self.next_ordinal()
+        super().save(*args, **kwargs)
+    
+    @classmethod
+    def next_ordinal(cls):
+        last = cls.objects.aggregate(last=models.Max('ordinal'))['last']
+        return 0 if last is None else last + 1
+
 
+class ChecklistPack(models.Model):
+    """
+    A versioned checklist data pack that has been applied to the database.
+    See ``apps.audits.packs``; the fingerprint lets an unchanged pack be
+    skipped without reading the checklist tables.
+    """
 
-class Audit(TimeStampedModel):
+    name = models.CharField(max_length=100, unique=True)
+    version = models.CharField(max_length=50)
+    fingerprint = models.CharField(max_length=64)
+    applied_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'checklist_packs'
+        ordering = ['name']
+        verbose_name = 'Checklist Pack'
+        verbose_name_plural = 'Checklist Packs'
+
+    def __str__(self):
+        return f"{self.name} {self.version}"
+
+
+class Audit(LoadedFieldsMixin, TimeStampedModel):
     """Audit session for an application/system."""
     
     STATUS_CHOICES = [
@@ -99,6 +164,15 @@ class Audit(TimeStampedModel):
         on_delete=models.CASCADE,
         related_name='audits'
     )
+    # Copied from the application so tenant-scoped lists avoid a join.
+    organization = models.ForeignKey(
+        'users.Organization',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        editable=False,
+        related_name='audits'
+    )
     auditor = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -117,26 +191,77 @@ class Audit(TimeStampedModel):
     completed_at = models.DateTimeField(null=True, blank=True)
     notes = models.TextField(blank=True)
 
+    # Compared on save by the inbox signal handlers.
+    loaded_fields = ['status', 'auditor']
+    objects = TenantManager()
+
     class Meta:
         db_table = 'audits'
         ordering = ['-created_at']
         verbose_name = 'Audit'
         verbose_name_plural = 'Audits'
+        indexes = [
+            models.Index(fields=['organization', '-created_at'], name='audit_org_created_idx'),
+            models.Index(fields=['organization', 'status'], name='audit_org_status_idx'),
+            models.Index(fields=['organization', 'auditor'], name='audit_org_auditor_idx'),
+            models.Index(fields=['auditor', 'status'], name='audit_auditor_status_idx'),
+            models.Index(fields=['application', '-created_at'], name='audit_app_created_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.application.name}"
     
+    def save(self, *args, **kwargs):
+        if self.organization_id is None and self.application_id is not None:
+            self.organization_id = self.application.organization_id
+        super().save(*args, **kwargs)
+    
+    @property
+    def is_archived(self):
+        return hasattr(self, 'archive')
+    
+    def get_responses(self):
+        """
+        Return the audit's responses, reading them back from the archive
+        when the audit has been moved to cold storage.
+        """
+        if self.is_archived:
+            return self.archive.load_responses()
+        return self.responses.select_related(
+            'checklist_item', 'checklist_item__category'
+        )
+    
+    def responses_last_modified(self):
+        """Return the most recent modification time of any response."""
+        if self.is_archived:
+            return max(
+                (row['updated_at'] for row in self.archive.unpack() if row['updated_at']),
+                default=None,
+            )
+        return self.responses.aggregate(last=models.Max('updated_at'))['last']
+    
     @property
     def progress_percentage(self):
-        total = self.responses.count()
+        if self.is_archived:
+            total = self.archive.response_count
+            completed = total - self.archive.pending_count
+        elif 'response_total' in self.__dict__:
+            total, completed = self.response_total, self.answered_total
+        else:
+            total = self.responses.count()
+            if total == 0:
+                return 0
+            completed = self.responses.exclude(status='pending').count()
         if total == 0:
             return 0
-        completed = self.responses.exclude(status='pending').count()
         return int((completed / total) * 100)
     
     @property
     def compliance_score(self):
         """Calculate compliance score based on responses."""
+        if self.is_archived:
+            return self.archive.compliance_score
+        
         responses = self.responses.exclude(status='pending')
         if not responses.exists():
             return None
@@ -146,7 +271,7 @@ class Audit(TimeStampedModel):
         return round((compliant / total) * 100, 2)
 
 
-class AuditResponse(TimeStampedModel):
+class AuditResponse(LoadedFieldsMixin, TimeStampedModel):
     """Responses to checklist items during an audit."""
     
     STATUS_CHOICES = [
@@ -193,12 +318,218 @@ class AuditResponse(TimeStampedModel):
     )
     reviewed_at = models.DateTimeField(null=True, blank=True)
 
+    # Compared on save by the inbox and status-vector signal handlers.
+    loaded_fields = ['status']
+
     class Meta:
         db_table = 'audit_responses'
         ordering = ['checklist_item__category', 'checklist_item__order']
         unique_together = ['audit', 'checklist_item']
         verbose_name = 'Audit Response'
         verbose_name_plural = 'Audit Responses'
+        indexes = [
+            models.Index(fields=['audit', 'status'], name='response_audit_status_idx'),
+        ]
 
     def __str__(self):
         return f"{self.audit.title} - {self.checklist_item.code}: {self.get_status_display()}"
+
+
+class AuditArchive(models.Model):
+    """
+    Cold storage for the responses of a completed audit.
+    
+    The response rows are serialized into a single zlib-compressed JSON
+    payload and removed from ``audit_responses``; only the per-status
+    counts stay queryable.
+    """
+    
+    ARCHIVED_FIELDS = [
+        'id', 'checklist_item_id', 'status', 'findings', 'evidence_notes',
+        'recommendations', 'reviewed_by_id', 'reviewed_at', 'created_at',
+        'updated_at',
+    ]
+    DATETIME_FIELDS = ['reviewed_at', 'created_at', 'updated_at']
+    
+    audit = models.OneToOneField(
+        Audit,
+        on_delete=models.CASCADE,
+        related_name='archive'
+    )
+    payload = models.BinaryField(
+        help_text='zlib-compressed JSON list of the archived responses'
+    )
+    response_count = models.PositiveIntegerField(default=0)
+    pending_count = models.PositiveIntegerField(default=0)
+    compliant_count = models.PositiveIntegerField(default=0)
+    non_compliant_count = models.PositiveIntegerField(default=0)
+    partially_compliant_count = models.PositiveIntegerField(default=0)
+    not_applicable_count = models.PositiveIntegerField(default=0)
+    archived_at = models.DateTimeField(auto_now_add=True)
+
+    class Meta:
+        db_table = 'audit_archives'
+        ordering = ['-archived_at']
+        verbose_name = 'Audit Archive'
+        verbose_name_plural = 'Audit Archives'
+
+    def __str__(self):
+        return f"Archive of {self.audit.title}"
+    
+    @property
+    def compliance_score(self):
+        reviewed = self.response_count - self.pending_count
+        if reviewed == 0:
+            return None
+        return round((self.compliant_count / reviewed) * 100, 2)
+    
+    @classmethod
+    def archive(cls, audit):
+        """
+        Move an audit's responses into a new archive record.
+        
+        Must be called inside a transaction; the response rows are deleted
+        once the archive has been written. Audits with remediations or
+        evidence attached to their responses cannot be archived, as those
+        rows would cascade away with the responses.
+        """
+        if audit.responses.filter(
+            models.Q(remediations__isnull=False) | models.Q(evidence_files__isnull=False)
+        ).exists():
+            raise ValueError(
+                f'Audit {audit.pk} has remediations or evidence and cannot be archived.'
+            )
+        
+        responses = list(audit.responses.order_by('pk'))
+        rows, payload = cls.pack(responses)
+        counts = {status: 0 for status, _ in AuditResponse.STATUS_CHOICES}
+        for row in rows:
+            counts[row['status']] = counts.get(row['status'], 0) + 1
+        archive = cls.objects.create(
+            audit=audit,
+            payload=payload,
+            response_count=len(rows),
+            pending_count=counts['pending'],
+            compliant_count=counts['compliant'],
+            non_compliant_count=counts['non_compliant'],
+            partially_compliant_count=counts['partially_compliant'],
+            not_applicable_count=counts['not_applicable'],
+        )
+        audit.responses.all().delete()
+        return archive
+    
+    @classmethod
+    def pack(cls, responses):
+        """Serialize and compress an iterable of ``AuditResponse`` rows."""
+        rows = []
+        for response in responses:
+            row = {}
+            for field in cls.ARCHIVED_FIELDS:
+                value = getattr(response, field)
+                if field in cls.DATETIME_FIELDS and value is not None:
+                    value = value.isoformat()
+                row[field] = value
+            rows.append(row)
+        return rows, zlib.compress(json.dumps(rows).encode('utf-8'))
+    
+    def unpack(self):
+        """Return the archived responses as a list of plain dicts."""
+        rows = json.loads(zlib.decompress(bytes(self.payload)).decode('utf-8'))
+        for row in rows:
+            for field in self.DATETIME_FIELDS:
+                if row.get(field):
+                    row[field] = parse_datetime(row[field])
+        return rows
+    
+    def load_responses(self):
+        """
+        Rebuild unsaved ``AuditResponse`` instances from the payload, with
+        checklist items and categories attached, in checklist order.
+        """
+        rows = self.unpack()
+        items = ChecklistItem.objects.select_related('category').in_bulk(
+            [row['checklist_item_id'] for row in rows]
+        )
+        responses = []
+        for row in rows:
+            item = items.get(row['checklist_item_id'])
+            if item is None:
+                continue
+            response = AuditResponse(audit=self.audit, **row)
+            response.checklist_item = item
+            responses.append(response)
+        responses.sort(key=lambda r: (
+            r.checklist_item.category.order,
+            r.checklist_item.category.name,
+            r.checklist_item.order,
+            r.checklist_item.code,
+        ))
+        return responses
+
+
+class AuditStatusVector(models.Model):
+    """
+    Packed response statuses of one audit, indexed by checklist item
+    ordinal. See ``apps.audits.status_vector`` for the encoding.
+    """
+    
+    audit = models.OneToOneField(
+        Audit,
+        on_delete=models.CASCADE,
+        related_name='status_vector'
+    )
+    vector = models.BinaryField(default=b'')
+    updated_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'audit_status_vectors'
+        verbose_name = 'Audit Status Vector'
+        verbose_name_plural = 'Audit Status Vectors'
+
+    def __str__(self):
+        return f"Status vector of audit {self.audit_id}"
+    
+    def statuses(self):
+        """Return the packed statuses as a ``{ordinal: status}`` dict."""
+        return status_vector.decode(bytes(self.vector))
+    
+    @classmethod
+    def rebuild(cls, audit):
+        """Recompute an audit's vector from its (possibly archived) responses."""
+        if audit.is_archived:
+            rows = audit.archive.unpack()
+            ordinals = dict(ChecklistItem.objects.filter(
+                pk__in=[row['checklist_item_id'] for row in rows]
+            ).values_list('pk', 'ordinal'))
+            pairs = [
+                (ordinals[row['checklist_item_id']], row['status'])
+                for row in rows if ordinals.get(row['checklist_item_id']) is not None
+            ]
+        else:
+            pairs = audit.responses.filter(
+                checklist_item__ordinal__isnull=False
+            ).values_list('checklist_item__ordinal', 'status')
+        obj = cls(audit=audit, vector=status_vector.encode(pairs))
+        cls.objects.bulk_create(
+            [obj], update_conflicts=True,
+            unique_fields=['audit'], update_fields=['vector', 'updated_at'],
+        )
+        return obj
+    
+    @classmethod
+    def set_status(cls, audit_id, ordinal, status):
+        """
+        Update a single item's status in place; ``None`` clears it.
+        
+        Returns the updated vector, or ``None`` if the audit has no vector
+        yet and needs a full ``rebuild``.
+        """
+        with transaction.atomic():
+            obj = cls.objects.select_for_update().filter(audit_id=audit_id).first()
+            if obj is None:
+                return None
+            obj.vector = status_vector.set_code(
+                bytes(obj.vector), ordinal, status_vector.STATUS_CODES.get(status, 0)
+            )
+            obj.save(update_fields=['vector', 'updated_at'])
+        return obj
@@ -0,0 +1,180 @@
+"""
+Versioned checklist data packs.
+
+A pack is a JSON (or, with PyYAML installed, YAML) document holding the
+DPDP sections, audit categories and checklist items of one checklist::
+
+    {"name": "dpdp", "version": "1.0.0",
+     "sections": [{"number": "6", "title": ..., "description": ...}],
+     "categories": [{"name": ..., "description": ..., "section": "6", "order": 1}],
+     "items": [{"code": "DC-001", "category": ..., "order": 1, "severity": ..., ...}]}
+
+``apply_pack`` records the pack's content fingerprint in ``ChecklistPack``.
+Applying a pack whose fingerprint is already recorded costs a single query;
+otherwise the existing rows are read once and only new or modified rows
+are written, with one bulk insert and one bulk update per table. Rows are
+matched by section number, category name and item code. Items dropped
+from a pack are left in place, since responses refer to them; retire
+them with ``"is_active": false`` instead.
+"""
+import hashlib
+import json
+from collections import namedtuple
+from pathlib import Path
+
+from django.db import transaction
+from django.utils import timezone
+
+PACK_DIR = Path(__file__).resolve().parent / 'checklist_packs'
+PACK_SUFFIXES = ('.json', '.yaml', '.yml')
+
+SECTION_FIELDS = {'number': 'section_number', 'title': 'title', 'description': 'description',
+                  'is_active': 'is_active'}
+CATEGORY_FIELDS = {'name': 'name', 'description': 'description', 'order': 'order',
+                   'is_active': 'is_active'}
+ITEM_FIELDS = {'code': 'code', 'title': 'title', 'description': 'description',
+               'guidance': 'guidance', 'evidence_required': 'evidence_required',
+               'severity': 'severity', 'order': 'order', 'is_active': 'is_active'}
+
+PackResult = namedtuple('PackResult', 'name version fingerprint changed created updated')
+
+
+class PackError(ValueError):
+    """The pack file is malformed or refers to rows it does not define."""
+
+
+def pack_paths(directory=PACK_DIR):
+    """Return the pack files shipped in ``directory``, sorted by name."""
+    return sorted(p for p in Path(directory).iterdir() if p.suffix in PACK_SUFFIXES)
+
+
+def read_pack(path):
+    """Parse a pack file and add its ``fingerprint``."""
+    path = Path(path)
+    with open(path, encoding='utf-8') as fh:
+        if path.suffix in ('.yaml', '.yml'):
+            try:
+                import yaml
+            except ImportError:
+                raise PackError(f'{path.name}: YAML packs require PyYAML: pip install pyyaml')
+            data = yaml.safe_load(fh)
+        else:
+            data = json.load(fh)
+    if not isinstance(data, dict) or not data.get('name') or not data.get('version'):
+        raise PackError(f'{path.name}: a pack needs a name and a version.')
+    data['fingerprint'] = fingerprint(data)
+    return data
+
+
+def fingerprint(data):
+    """Hash the pack content independently of file format and key order."""
+    content = {key: value for key, value in data.items() if key != 'fingerprint'}
+    encoded = json.dumps(content, sort_keys=True, separators=(',', ':'), ensure_ascii=False)
+    return hashlib.sha256(encoded.encode('utf-8')).hexdigest()
+
+
+def _values(row, fields, kind):
+    try:
+        key = row[next(iter(fields))]
+    except (KeyError, TypeError):
+        raise PackError(f'{kind} without {next(iter(fields))}: {row!r}')
+    return key, {column: row[name] for name, column in fields.items() if name in row}
+
+
+def _sync(model, wanted, existing, stamp):
+    """
+    Insert the rows of ``wanted`` missing from ``existing`` and update the
+    ones that differ. ``wanted`` maps keys to field values. Returns the
+    numbers of created and updated rows.
+    """
+    created, updated, changed_fields = [], [], set()
+    for key, values in wanted.items():
+        obj = existing.get(key)
+        if obj is None:
+            created.append(model(**values))
+            continue
+        changed = {field for field, value in values.items() if getattr(obj, field) != value}
+        if changed:
+            for field in changed:
+                setattr(obj, field, values[field])
+            changed_fields |= changed
+            updated.append(obj)
+    if created:
+        model.objects.bulk_create(created)
+    if updated:
+        if stamp:
+            for obj in updated:
+                obj.updated_at = timezone.now()
+            changed_fields.add('updated_at')
+        model.objects.bulk_update(updated, sorted(changed_fields))
+    return len(created), len(updated)
+
+
+def apply_pack(data, force=False):
+    """Bring the checklist tables in line with a pack read by ``read_pack``."""
+    from apps.core.models import DPDPSection
+    from .models import AuditCategory, ChecklistItem, ChecklistPack
+
+    name, digest = data['name'], data['fingerprint']
+    if not force and ChecklistPack.objects.filter(name=name, fingerprint=digest).exists():
+        return PackResult(name, data['version'], digest, False, {}, {})
+
+    created, updated = {}, {}
+    with transaction.atomic():
+        sections = dict(_values(row, SECTION_FIELDS, 'section') for row in data.get('sections', []))
+        existing = DPDPSection.objects.in_bulk(field_name='section_number')
+        created['sections'], updated['sections'] = _sync(
+            DPDPSection, sections, existing, stamp=False
+        )
+        if created['sections']:
+            existing = DPDPSection.objects.in_bulk(field_name='section_number')
+        section_ids = {number: section.pk for number, section in existing.items()}
+
+        categories = {}
+        for row in data.get('categories', []):
+            key, values = _values(row, CATEGORY_FIELDS, 'category')
+            if 'section' in row:
+                if row['section'] is not None and row['section'] not in section_ids:
+                    raise PackError(f"Category {key!r} refers to unknown section {row['section']!r}")
+                values['dpdp_section_id'] = section_ids.get(row['section'])
+            categories[key] = values
+        existing = {category.name: category for category in AuditCategory.objects.all()}
+        created['categories'], updated['categories'] = _sync(
+            AuditCategory, categories, existing, stamp=True
+        )
+        if created['categories']:
+            category_ids = dict(AuditCategory.objects.values_list('name', 'pk'))
+        else:
+            category_ids = {category.name: category.pk for category in existing.values()}
+
+        severities = {value for value, _ in ChecklistItem.SEVERITY_CHOICES}
+        items = {}
+        for row in data.get('items', []):
+            key, values = _values(row, ITEM_FIELDS, 'item')
+            if row.get('category') not in category_ids:
+                raise PackError(f"Item {key!r} refers to unknown category {row.get('category')!r}")
+            if 'severity' in values and values['severity'] not in severities:
+                raise PackError(f"Item {key!r} has unknown severity {values['severity']!r}")
+            values['category_id'] = category_ids[row['category']]
+            items[key] = values
+        existing = ChecklistItem.objects.in_bulk(field_name='code')
+        # bulk_create skips save(), so new items get their ordinals here.
+        ordinal = ChecklistItem.next_ordinal()
+        for key in items:
+            if key not in existing:
+                items[key]['ordinal'] = ordinal
+                ordinal += 1
+        created['items'], updated['items'] = _sync(
+            ChecklistItem, items, existing, stamp=True
+        )
+
+        ChecklistPack.objects.update_or_create(
+            name=name, defaults={'version': data['version'], 'fingerprint': digest}
+        )
+    return PackResult(name, data['version'], digest, True, created, updated)
+
+
+def pack_state():
+    """Return ``{name: fingerprint}`` of every applied pack."""
+    from .models import ChecklistPack
+    return dict(ChecklistPack.objects.values_list('name', 'fingerprint'))
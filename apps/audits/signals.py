@@ -0,0 +1,123 @@
+"""
+Signal handlers keeping audit status vectors in sync with responses and
+publishing live progress deltas.
+
+Views that save many responses at once wrap the loop in
+``deferred_status_vectors``: the changed audits' vectors are then rebuilt
+once when the block ends instead of being updated row by row.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.core.events import broker, publish_on_commit
+from .models import Audit, AuditArchive, AuditResponse, AuditStatusVector, ChecklistItem
+from . import status_vector
+
+
+def _ordinal(response):
+    # Views that save many responses load their items with select_related;
+    # only fall back to a query when the item is not already at hand.
+    if AuditResponse.checklist_item.is_cached(response):
+        return response.checklist_item.ordinal
+    return ChecklistItem.objects.filter(
+        pk=response.checklist_item_id
+    ).values_list('ordinal', flat=True).first()
+
+
+_deferred = ContextVar('deferred_status_vectors', default=None)
+
+
+@contextmanager
+def deferred_status_vectors():
+    """Rebuild the vector of each audit whose responses change in the block once."""
+    if _deferred.get() is not None:
+        yield
+        return
+    changed = {}
+    token = _deferred.set(changed)
+    try:
+        yield
+    finally:
+        _deferred.reset(token)
+    for responses in changed.values():
+        vector = AuditStatusVector.rebuild(responses[0].audit)
+        _publish_responses(responses, vector)
+
+
+def _publish_responses(responses, vector):
+    audit_id = responses[0].audit_id
+    audit_topic = f'audit:{audit_id}'
+    if not broker.has_subscribers('dashboard', audit_topic):
+        return
+    progress = status_vector.progress(bytes(vector.vector))
+    for response in responses:
+        publish_on_commit([audit_topic], 'response', {
+            'audit': audit_id,
+            'response': response.pk,
+            'status': response.status,
+            'label': response.get_status_display(),
+            'progress': progress,
+        })
+    publish_on_commit(['dashboard', audit_topic], 'progress', {
+        'audit': audit_id,
+        'progress': progress,
+    })
+
+
+@receiver(post_save, sender=AuditResponse)
+def update_status_vector(sender, instance, raw=False, created=False, update_fields=None, **kwargs):
+    if raw:
+        return
+    if update_fields is not None and 'status' not in update_fields:
+        return
+    if not created and instance.loaded('status') == instance.status:
+        return
+    changed = _deferred.get()
+    if changed is not None:
+        changed.setdefault(instance.audit_id, []).append(instance)
+        return
+    ordinal = _ordinal(instance)
+    if ordinal is None:
+        return
+    vector = AuditStatusVector.set_status(instance.audit_id, ordinal, instance.status)
+    if vector is None:
+        vector = AuditStatusVector.rebuild(instance.audit)
+    _publish_responses([instance], vector)
+
+
+@receiver(post_delete, sender=AuditResponse)
+def clear_status_vector(sender, instance, **kwargs):
+    # Archiving removes the rows but not the statuses they carried.
+    if AuditArchive.objects.filter(audit_id=instance.audit_id).exists():
+        return
+    ordinal = _ordinal(instance)
+    if ordinal is not None:
+        AuditStatusVector.set_status(instance.audit_id, ordinal, None)
+
+
+@receiver(pre_save, sender=Audit)
+def remember_audit_status(sender, instance, raw=False, **kwargs):
+    # Also read by the activity recorder to spot completions.
+    if raw or instance.pk is None:
+        return
+    instance._previous_status = Audit.objects.filter(
+        pk=instance.pk
+    ).values_list('status', flat=True).first()
+
+
+@receiver(post_save, sender=Audit)
+def publish_audit_status(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    previous = getattr(instance, '_previous_status', instance.status)
+    if not created and previous == instance.status:
+        return
+    audit_topic = f'audit:{instance.pk}'
+    if broker.has_subscribers('dashboard', audit_topic):
+        publish_on_commit(['dashboard', audit_topic], 'status', {
+            'audit': instance.pk,
+            'status': instance.status,
+            'label': instance.get_status_display(),
+        })
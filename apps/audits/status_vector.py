@@ -0,0 +1,96 @@
+"""
+Packed per-audit status vectors.
+
+Each audit's response statuses are stored as a compact byte string indexed
+by ``ChecklistItem.ordinal``: every byte holds two 4-bit status codes (low
+nibble for the even ordinal, high nibble for the odd one). Code 0 means the
+audit has no response for that item.
+
+Cross-audit analytics read one small blob per audit instead of one
+``AuditResponse`` row per checklist item.
+"""
+from collections import Counter, defaultdict
+
+STATUS_CODES = {
+    'pending': 1,
+    'compliant': 2,
+    'non_compliant': 3,
+    'partially_compliant': 4,
+    'not_applicable': 5,
+}
+CODE_STATUSES = {code: status for status, code in STATUS_CODES.items()}
+
+
+def get_code(vector, ordinal):
+    """Return the status code stored for ``ordinal`` (0 when absent)."""
+    index, high = divmod(ordinal, 2)
+    if index >= len(vector):
+        return 0
+    byte = vector[index]
+    return byte >> 4 if high else byte & 0x0F
+
+
+def set_code(vector, ordinal, code):
+    """Return a copy of ``vector`` with ``ordinal`` set to ``code``."""
+    index, high = divmod(ordinal, 2)
+    data = bytearray(vector)
+    if index >= len(data):
+        data.extend(b'\x00' * (index + 1 - len(data)))
+    if high:
+        data[index] = (data[index] & 0x0F) | (code << 4)
+    else:
+        data[index] = (data[index] & 0xF0) | code
+    return bytes(data)
+
+
+def encode(statuses):
+    """Pack an iterable of ``(ordinal, status)`` pairs into a vector."""
+    statuses = list(statuses)
+    size = max((ordinal for ordinal, _ in statuses), default=-1) // 2 + 1
+    data = bytearray(size)
+    for ordinal, status in statuses:
+        index, high = divmod(ordinal, 2)
+        code = STATUS_CODES[status]
+        data[index] |= code << 4 if high else code
+    return bytes(data)
+
+
+def decode(vector):
+    """Unpack a vector into a ``{ordinal: status}`` dict."""
+    statuses = {}
+    for index, byte in enumerate(vector):
+        for ordinal, code in ((index * 2, byte & 0x0F), (index * 2 + 1, byte >> 4)):
+            if code:
+                statuses[ordinal] = CODE_STATUSES[code]
+    return statuses
+
+
+def progress(vector):
+    """Return the percentage of present items that are no longer pending."""
+    codes = [code for code in (get_code(vector, i) for i in range(len(vector) * 2)) if code]
+    if not codes:
+        return 0
+    done = sum(1 for code in codes if code != STATUS_CODES['pending'])
+    return int((done / len(codes)) * 100)
+
+
+def _vectors(audit_ids=None):
+    from .models import AuditStatusVector
+    queryset = AuditStatusVector.objects.all()
+    if audit_ids is not None:
+        queryset = queryset.filter(audit_id__in=audit_ids)
+    for audit_id, vector in queryset.values_list('audit_id', 'vector').iterator():
+        yield audit_id, bytes(vector)
+
+
+def item_status_counts(audit_ids=None):
+    """
+    Return ``{ordinal: Counter(status -> audits)}`` across the given audits,
+    the basis for per-item heatmaps.
+    """
+    counts = defaultdict(Counter)
+    for _, vector in _vectors(audit_ids):
+        for ordinal, status in decode(vector).items():
+            counts[ordinal][status] += 1
+    return dict(counts)
+
@@ -9,5 +9,7 @@ urlpatterns = [
     path('create/', views.audit_create, name='audit_create'),
     path('<int:pk>/', views.audit_detail, name='audit_detail'),
     path('<int:pk>/execute/', views.audit_execute, name='audit_execute'),
+    path('<int:pk>/suggest/', views.audit_suggest_findings, name='audit_suggest_findings'),
+    path('<int:pk>/bundle/', views.audit_export_bundle, name='audit_export_bundle'),
     path('checklist/', views.checklist_list, name='checklist_list'),
 ]
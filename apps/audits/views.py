@@ -5,9 +5,12 @@ from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
 from django.utils import timezone
-from django.http import JsonResponse
-from .models import AuditCategory, ChecklistItem, Audit, AuditResponse
+from django.http import JsonResponse, StreamingHttpResponse
+from .models import PROGRESS_COUNTS, AuditCategory, ChecklistItem, Audit, AuditResponse, AuditStatusVector
 from .forms import AuditForm, AuditResponseForm
+from . import bundle, findings_index
+from .signals import deferred_status_vectors
+from apps.core.streaming import stream_chunks
 
 
 @login_required
@@ -23,6 +26,7 @@ def audit_list(request):
         audits = Audit.objects.filter(auditor=user)
     else:  # admin
         audits = Audit.objects.all()
+    audits = audits.select_related('application', 'auditor', 'archive').annotate(**PROGRESS_COUNTS)
     
     return render(request, 'audits/audit_list.html', {'audits': audits})
 
@@ -39,10 +43,15 @@ def audit_detail(request, pk):
         messages.error(request, 'Access denied.')
         return redirect('audit_list')
     
-    responses = audit.responses.select_related('checklist_item', 'checklist_item__category')
-    categories = AuditCategory.objects.filter(
-        checklist_items__responses__audit=audit
-    ).distinct()
+    responses = audit.get_responses()
+    if audit.is_archived:
+        categories = AuditCategory.objects.filter(
+            pk__in={response.checklist_item.category_id for response in responses}
+        )
+    else:
+        categories = AuditCategory.objects.filter(
+            checklist_items__responses__audit=audit
+        ).distinct()
     
     return render(request, 'audits/audit_detail.html', {
         'audit': audit,
@@ -67,8 +76,11 @@ def audit_create(request):
             
             # Create audit responses for all active checklist items
             checklist_items = ChecklistItem.objects.filter(is_active=True)
-            for item in checklist_items:
-                AuditResponse.objects.create(audit=audit, checklist_item=item)
+            AuditResponse.objects.bulk_create([
+                AuditResponse(audit=audit, checklist_item=item)
+                for item in checklist_items
+            ])
+            AuditStatusVector.rebuild(audit)
             
             messages.success(request, 'Audit created successfully.')
             return redirect('audit_detail', pk=audit.pk)
@@ -87,6 +99,10 @@ def audit_execute(request, pk):
         messages.error(request, 'Only the assigned auditor can execute this audit.')
         return redirect('audit_detail', pk=pk)
     
+    if audit.is_archived:
+        messages.error(request, 'Archived audits are read-only.')
+        return redirect('audit_detail', pk=pk)
+    
     if audit.status == 'pending':
         audit.status = 'in_progress'
         audit.started_at = timezone.now()
@@ -97,18 +113,19 @@ def audit_execute(request, pk):
     ).order_by('checklist_item__category__order', 'checklist_item__order')
     
     if request.method == 'POST':
-        for response in responses:
-            status = request.POST.get(f'status_{response.id}')
-            findings = request.POST.get(f'findings_{response.id}', '')
-            recommendations = request.POST.get(f'recommendations_{response.id}', '')
-            
-            if status:
-                response.status = status
-                response.findings = findings
-                response.recommendations = recommendations
-                response.reviewed_by = request.user
-                response.reviewed_at = timezone.now()
-                response.save()
+        with deferred_status_vectors():
+            for response in responses:
+                status = request.POST.get(f'status_{response.id}')
+                findings = request.POST.get(f'findings_{response.id}', '')
+                recommendations = request.POST.get(f'recommendations_{response.id}', '')
+                
+                if status:
+                    response.status = status
+                    response.findings = findings
+                    response.recommendations = recommendations
+                    response.reviewed_by = request.user
+                    response.reviewed_at = timezone.now()
+                    response.save()
         
         messages.success(request, 'Audit responses saved.')
         
@@ -125,6 +142,41 @@ def audit_execute(request, pk):
     })
 
 
+@login_required
+def audit_suggest_findings(request, pk):
+    """Suggest similar past findings for a checklist item (JSON)."""
+    audit = get_object_or_404(Audit, pk=pk)
+    
+    if request.user != audit.auditor and not request.user.is_admin_user:
+        return JsonResponse({'error': 'Access denied.'}, status=403)
+    
+    try:
+        item_id = int(request.GET.get('item', ''))
+    except ValueError:
+        return JsonResponse({'error': 'A checklist item is required.'}, status=400)
+    
+    index = findings_index.get_index(audit.organization_id)
+    text = request.GET.get('q', '').strip()
+    suggestions = index.search(item_id, text) if index and text else []
+    return JsonResponse({'suggestions': suggestions})
+
+
+@login_required
+def audit_export_bundle(request, pk):
+    """Download an audit with its attachments as a portable bundle."""
+    audit = get_object_or_404(Audit.objects.select_related('application', 'auditor'), pk=pk)
+    
+    if not request.user.is_admin_user:
+        messages.error(request, 'Only admins can export audits.')
+        return redirect('audit_detail', pk=pk)
+    
+    response = StreamingHttpResponse(
+        stream_chunks(request, bundle.iter_bundle(audit)), content_type='application/gzip'
+    )
+    response['Content-Disposition'] = f'attachment; filename="audit-{audit.pk}.tar.gz"'
+    return response
+
+
 @login_required
 def checklist_list(request):
     """View all checklist items organized by category."""
@@ -1,11 +1,11 @@
 from django.contrib import admin
-from .models import Application, ComplianceScore, Remediation, Evidence
+from .models import Application, ComplianceRollup, ComplianceScore, Remediation, Evidence, RemediationSnapshot
 
 
 @admin.register(Application)
 class ApplicationAdmin(admin.ModelAdmin):
-    list_display = ('name', 'application_type', 'environment', 'owner', 'department', 'is_active')
-    list_filter = ('application_type', 'environment', 'is_active')
+    list_display = ('name', 'organization', 'application_type', 'environment', 'owner', 'department', 'is_active')
+    list_filter = ('organization', 'application_type', 'environment', 'is_active')
     search_fields = ('name', 'description', 'department')
     raw_id_fields = ('owner',)
 
@@ -32,3 +32,18 @@ class EvidenceAdmin(admin.ModelAdmin):
     list_filter = ('evidence_type', 'created_at')
     search_fields = ('title', 'description')
     raw_id_fields = ('audit_response', 'uploaded_by')
+
+
+@admin.register(ComplianceRollup)
+class ComplianceRollupAdmin(admin.ModelAdmin):
+    list_display = ('organization', 'department', 'application_type', 'environment', 'severity', 'application_count', 'average_score', 'open_remediation_count', 'refreshed_at')
+    list_filter = ('organization', 'application_type', 'environment', 'severity')
+    search_fields = ('department',)
+
+
+@admin.register(RemediationSnapshot)
+class RemediationSnapshotAdmin(admin.ModelAdmin):
+    list_display = ('date', 'organization', 'department', 'priority', 'open_count', 'resolved_count', 'closed_count', 'resolved_on_day')
+    list_filter = ('organization', 'priority', 'date')
+    search_fields = ('department',)
+    date_hierarchy = 'date'
@@ -5,3 +5,6 @@ class ComplianceConfig(AppConfig):
     default_auto_field = 'django.db.models.BigAutoField'
     name = 'apps.compliance'
     verbose_name = 'Compliance Tracking'
+
+    def ready(self):
+        from . import signals  # noqa: F401
@@ -0,0 +1,147 @@
+"""
+Daily remediation snapshots and the burndown analytics read from them.
+
+A snapshot for a day is reconstructed from ``created_at`` and
+``resolved_at``, so the same code writes today's row and backfills past
+days. Deferred and won't-fix remediations have no closing timestamp and
+are counted as closed on every day after their creation.
+
+Snapshot rows carry the organization of the remediation's audit and are
+read through the tenant-scoped manager, so each tenant's charts only
+include its own remediations.
+"""
+from collections import defaultdict
+from datetime import datetime, time, timedelta
+
+from django.db import transaction
+from django.db.models import Case, Count, IntegerField, Q, Sum, Value, When
+from django.utils import timezone
+
+from apps.core.tenancy import unscoped
+from .models import Remediation, RemediationSnapshot
+
+AGE_BUCKETS = [
+    ('age_0_7', 7),
+    ('age_8_30', 30),
+    ('age_31_90', 90),
+    ('age_over_90', None),
+]
+CLOSED_STATUSES = ['deferred', 'wont_fix']
+ORGANIZATION = 'audit_response__audit__organization'
+DEPARTMENT = 'audit_response__audit__application__department'
+# Query-string value selecting the snapshots of applications without a
+# department, which are stored under department ''.
+UNASSIGNED = '__none__'
+
+
+def _end_of(day):
+    return timezone.make_aware(datetime.combine(day + timedelta(days=1), time.min))
+
+
+@unscoped()
+def snapshot(day):
+    """Write the snapshot rows for ``day`` for every organization, replacing any existing ones."""
+    end = _end_of(day)
+    start = end - timedelta(days=1)
+    existing = Remediation.objects.filter(created_at__lt=end)
+    cells = defaultdict(lambda: defaultdict(int))
+
+    unresolved = existing.exclude(status__in=CLOSED_STATUSES).filter(
+        Q(resolved_at__isnull=True) | Q(resolved_at__gte=end)
+    )
+    whens = [
+        When(created_at__gte=end - timedelta(days=days), then=Value(field))
+        for field, days in AGE_BUCKETS if days is not None
+    ]
+    bucketed = unresolved.annotate(
+        bucket=Case(*whens, default=Value(AGE_BUCKETS[-1][0]))
+    ).values_list(ORGANIZATION, DEPARTMENT, 'priority', 'bucket').annotate(count=Count('pk'))
+    for organization, department, priority, bucket, count in bucketed:
+        cells[(organization, department or '', priority)][bucket] += count
+        cells[(organization, department or '', priority)]['open_count'] += count
+
+    resolved = existing.filter(resolved_at__lt=end).values_list(
+        ORGANIZATION, DEPARTMENT, 'priority'
+    ).annotate(count=Count('pk'))
+    for organization, department, priority, count in resolved:
+        cells[(organization, department or '', priority)]['resolved_count'] = count
+
+    closed = existing.filter(status__in=CLOSED_STATUSES).values_list(
+        ORGANIZATION, DEPARTMENT, 'priority'
+    ).annotate(count=Count('pk'))
+    for organization, department, priority, count in closed:
+        cells[(organization, department or '', priority)]['closed_count'] = count
+
+    resolved_today = existing.filter(resolved_at__gte=start, resolved_at__lt=end).values_list(
+        ORGANIZATION, DEPARTMENT, 'priority', 'created_at', 'resolved_at'
+    )
+    for organization, department, priority, created_at, resolved_at in resolved_today:
+        cell = cells[(organization, department or '', priority)]
+        cell['resolved_on_day'] += 1
+        cell['resolve_seconds_on_day'] += int((resolved_at - created_at).total_seconds())
+
+    with transaction.atomic():
+        RemediationSnapshot.objects.filter(date=day).delete()
+        RemediationSnapshot.objects.bulk_create([
+            RemediationSnapshot(
+                date=day, organization_id=organization, department=department,
+                priority=priority, **counts
+            )
+            for (organization, department, priority), counts in cells.items()
+        ])
+    return len(cells)
+
+
+def backfill(first_day, last_day=None):
+    """Write snapshots for every day from ``first_day`` to ``last_day``."""
+    last_day = last_day or timezone.localdate()
+    day = first_day
+    days = 0
+    while day <= last_day:
+        snapshot(day)
+        day += timedelta(days=1)
+        days += 1
+    return days
+
+
+def burndown(first_day, last_day, department=None, priority=None):
+    """Return per-day open/resolved/closed totals between two dates."""
+    rows = RemediationSnapshot.objects.filter(date__range=(first_day, last_day))
+    if department is not None:
+        rows = rows.filter(department=department)
+    if priority:
+        rows = rows.filter(priority=priority)
+    return list(rows.values('date').annotate(
+        open=Sum('open_count'),
+        resolved=Sum('resolved_count'),
+        closed=Sum('closed_count'),
+        resolved_on_day=Sum('resolved_on_day'),
+    ).order_by('date'))
+
+
+def aging(day, department=None):
+    """Return the open-item age buckets per priority on ``day``."""
+    rows = RemediationSnapshot.objects.filter(date=day)
+    if department is not None:
+        rows = rows.filter(department=department)
+    buckets = {field: Sum(field) for field, _ in AGE_BUCKETS}
+    return list(rows.values('priority').annotate(
+        open=Sum('open_count'), **buckets
+    ).order_by(Case(
+        *[When(priority=value, then=Value(i)) for i, (value, _) in enumerate(Remediation.PRIORITY_CHOICES)],
+        output_field=IntegerField(),
+    )))
+
+
+def mean_time_to_resolve(first_day, last_day):
+    """Return ``{department: mean days to resolve}`` for a date window."""
+    rows = RemediationSnapshot.objects.filter(
+        date__range=(first_day, last_day)
+    ).values('department').annotate(
+        resolved=Sum('resolved_on_day'),
+        seconds=Sum('resolve_seconds_on_day'),
+    ).order_by('department')
+    return {
+        row['department']: round(row['seconds'] / row['resolved'] / 86400, 1)
+        for row in rows if row['resolved']
+    }
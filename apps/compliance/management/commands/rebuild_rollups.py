@@ -0,0 +1,14 @@
+"""
+Management command to rebuild the department compliance rollup cube.
+Run with: python manage.py rebuild_rollups
+"""
+from django.core.management.base import BaseCommand
+from apps.compliance import rollups
+
+
+class Command(BaseCommand):
+    help = 'Recompute every cell of the department compliance rollup cube'
+
+    def handle(self, *args, **options):
+        groups = rollups.rebuild()
+        self.stdout.write(self.style.SUCCESS(f'Rebuilt rollups for {groups} application group(s)'))
@@ -0,0 +1,42 @@
+"""
+Management command to record daily remediation snapshots.
+Run daily with: python manage.py snapshot_remediations
+Backfill with: python manage.py snapshot_remediations --backfill-days 365
+"""
+from datetime import date, timedelta
+
+from django.core.management.base import BaseCommand, CommandError
+from django.utils import timezone
+from apps.compliance import burndown
+
+
+class Command(BaseCommand):
+    help = 'Record the daily remediation state snapshot used by burndown charts'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--date',
+            help='Day to snapshot (YYYY-MM-DD), defaults to today',
+        )
+        parser.add_argument(
+            '--backfill-days',
+            type=int,
+            default=0,
+            help='Also rebuild snapshots for this many days before --date',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            day = date.fromisoformat(options['date']) if options['date'] else timezone.localdate()
+        except ValueError:
+            raise CommandError('--date must be in YYYY-MM-DD format')
+        
+        if options['backfill_days']:
+            first_day = day - timedelta(days=options['backfill_days'])
+            days = burndown.backfill(first_day, day)
+            self.stdout.write(self.style.SUCCESS(
+                f'Wrote snapshots for {days} day(s) from {first_day} to {day}'
+            ))
+        else:
+            cells = burndown.snapshot(day)
+            self.stdout.write(self.style.SUCCESS(f'Wrote {cells} snapshot row(s) for {day}'))
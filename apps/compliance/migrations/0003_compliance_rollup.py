@@ -0,0 +1,36 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:04
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='ComplianceRollup',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('department', models.CharField(blank=True, max_length=255)),
+                ('application_type', models.CharField(choices=[('web', 'Web Application'), ('mobile', 'Mobile Application'), ('api', 'API/Service'), ('database', 'Database'), ('infrastructure', 'Infrastructure'), ('other', 'Other')], max_length=20)),
+                ('environment', models.CharField(choices=[('production', 'Production'), ('staging', 'Staging'), ('development', 'Development'), ('testing', 'Testing')], max_length=20)),
+                ('severity', models.CharField(choices=[('all', 'All Severities'), ('critical', 'Critical'), ('major', 'Major'), ('minor', 'Minor'), ('advisory', 'Advisory')], max_length=20)),
+                ('application_count', models.PositiveIntegerField(default=0)),
+                ('audited_application_count', models.PositiveIntegerField(default=0, help_text='Applications with at least one completed audit')),
+                ('score_sum', models.DecimalField(decimal_places=2, default=0, help_text='Sum of the latest score of each scored application', max_digits=12)),
+                ('score_count', models.PositiveIntegerField(default=0)),
+                ('open_remediation_count', models.PositiveIntegerField(default=0)),
+                ('refreshed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Compliance Rollup',
+                'verbose_name_plural': 'Compliance Rollups',
+                'db_table': 'compliance_rollups',
+                'ordering': ['department', 'application_type', 'environment', 'severity'],
+                'unique_together': {('department', 'application_type', 'environment', 'severity')},
+            },
+        ),
+    ]
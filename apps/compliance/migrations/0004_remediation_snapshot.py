@@ -0,0 +1,38 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:06
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0003_compliance_rollup'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='RemediationSnapshot',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('date', models.DateField(db_index=True)),
+                ('department', models.CharField(blank=True, max_length=255)),
+                ('priority', models.CharField(choices=[('critical', 'Critical'), ('high', 'High'), ('medium', 'Medium'), ('low', 'Low')], max_length=20)),
+                ('open_count', models.PositiveIntegerField(default=0, help_text='Open or in-progress remediations at the end of the day')),
+                ('resolved_count', models.PositiveIntegerField(default=0, help_text='Remediations resolved on or before the day')),
+                ('closed_count', models.PositiveIntegerField(default=0, help_text="Remediations deferred or marked as won't fix")),
+                ('age_0_7', models.PositiveIntegerField(default=0)),
+                ('age_8_30', models.PositiveIntegerField(default=0)),
+                ('age_31_90', models.PositiveIntegerField(default=0)),
+                ('age_over_90', models.PositiveIntegerField(default=0)),
+                ('resolved_on_day', models.PositiveIntegerField(default=0)),
+                ('resolve_seconds_on_day', models.BigIntegerField(default=0, help_text='Total time to resolve of the remediations resolved on the day')),
+            ],
+            options={
+                'verbose_name': 'Remediation Snapshot',
+                'verbose_name_plural': 'Remediation Snapshots',
+                'db_table': 'remediation_snapshots',
+                'ordering': ['date', 'department', 'priority'],
+                'unique_together': {('date', 'department', 'priority')},
+            },
+        ),
+    ]
@@ -0,0 +1,54 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:15
+
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+from django.db.models import OuterRef, Subquery
+
+
+def assign_organizations(apps, schema_editor):
+    Application = apps.get_model('compliance', 'Application')
+    Organization = apps.get_model('users', 'Organization')
+    User = apps.get_model('users', 'User')
+    Application.objects.filter(organization__isnull=True, owner__isnull=False).update(
+        organization=Subquery(
+            User.objects.filter(pk=OuterRef('owner')).values('organization')[:1]
+        )
+    )
+    orphans = Application.objects.filter(organization__isnull=True)
+    if orphans.exists():
+        organization, _ = Organization.objects.get_or_create(
+            slug=settings.DEFAULT_ORGANIZATION_SLUG,
+            defaults={'name': settings.DEFAULT_ORGANIZATION_NAME},
+        )
+        orphans.update(organization=organization)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0004_remediation_snapshot'),
+        ('users', '0003_organizations'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='application',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='applications', to='users.organization'),
+        ),
+        migrations.RunPython(assign_organizations, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['organization', 'name'], name='application_org_name_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['organization', 'owner'], name='application_org_owner_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='application',
+            index=models.Index(fields=['organization', 'department'], name='application_org_dept_idx'),
+        ),
+    ]
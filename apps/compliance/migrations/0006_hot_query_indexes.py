@@ -0,0 +1,24 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:27
+
+from django.conf import settings
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('audits', '0008_hot_query_indexes'),
+        ('compliance', '0005_application_organization'),
+        migrations.swappable_dependency(settings.AUTH_USER_MODEL),
+    ]
+
+    operations = [
+        migrations.AddIndex(
+            model_name='compliancescore',
+            index=models.Index(fields=['application', '-calculated_at'], name='score_app_calculated_idx'),
+        ),
+        migrations.AddIndex(
+            model_name='remediation',
+            index=models.Index(fields=['assigned_to', 'status'], name='remediation_assignee_idx'),
+        ),
+    ]
@@ -0,0 +1,49 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:48
+
+import django.db.models.deletion
+from django.db import migrations, models
+
+
+def clear_untenanted(apps, schema_editor):
+    # Both tables are derived data that mixed every organization's numbers;
+    # rebuild_rollups and snapshot_remediations --backfill-days refill them.
+    apps.get_model('compliance', 'ComplianceRollup').objects.all().delete()
+    apps.get_model('compliance', 'RemediationSnapshot').objects.all().delete()
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('compliance', '0006_hot_query_indexes'),
+        ('users', '0003_organizations'),
+    ]
+
+    operations = [
+        migrations.RunPython(clear_untenanted, migrations.RunPython.noop),
+        migrations.AlterUniqueTogether(
+            name='compliancerollup',
+            unique_together=set(),
+        ),
+        migrations.AlterUniqueTogether(
+            name='remediationsnapshot',
+            unique_together=set(),
+        ),
+        migrations.AddField(
+            model_name='compliancerollup',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='compliance_rollups', to='users.organization'),
+        ),
+        migrations.AddField(
+            model_name='remediationsnapshot',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.CASCADE, related_name='remediation_snapshots', to='users.organization'),
+        ),
+        migrations.AlterUniqueTogether(
+            name='compliancerollup',
+            unique_together={('organization', 'department', 'application_type', 'environment', 'severity')},
+        ),
+        migrations.AlterUniqueTogether(
+            name='remediationsnapshot',
+            unique_together={('date', 'organization', 'department', 'priority')},
+        ),
+    ]
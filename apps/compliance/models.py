@@ -3,7 +3,17 @@ Compliance models for application tracking and remediation.
 """
 from django.db import models
 from django.conf import settings
-from apps.core.models import TimeStampedModel
+from django.utils import timezone
+from apps.core.models import LoadedFieldsMixin, TimeStampedModel
+from apps.core.tenancy import TenantManager
+
+
+class ScoreManager(TenantManager):
+    tenant_field = 'application__organization'
+
+
+class RemediationManager(TenantManager):
+    tenant_field = 'audit_response__audit__organization'
 
 
 class Application(TimeStampedModel):
@@ -37,6 +47,13 @@ class Application(TimeStampedModel):
         choices=ENVIRONMENT_CHOICES, 
         default='production'
     )
+    organization = models.ForeignKey(
+        'users.Organization',
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='applications'
+    )
     owner = models.ForeignKey(
         settings.AUTH_USER_MODEL,
         on_delete=models.SET_NULL,
@@ -52,15 +69,27 @@ class Application(TimeStampedModel):
     )
     is_active = models.BooleanField(default=True)
 
+    objects = TenantManager()
+
     class Meta:
         db_table = 'applications'
         ordering = ['name']
         verbose_name = 'Application'
         verbose_name_plural = 'Applications'
+        indexes = [
+            models.Index(fields=['organization', 'name'], name='application_org_name_idx'),
+            models.Index(fields=['organization', 'owner'], name='application_org_owner_idx'),
+            models.Index(fields=['organization', 'department'], name='application_org_dept_idx'),
+        ]
 
     def __str__(self):
         return f"{self.name} ({self.get_application_type_display()})"
     
+    def save(self, *args, **kwargs):
+        if self.organization_id is None and self.owner_id is not None:
+            self.organization_id = self.owner.organization_id
+        super().save(*args, **kwargs)
+    
     @property
     def latest_audit(self):
         return self.audits.order_by('-created_at').first()
@@ -107,17 +136,22 @@ class ComplianceScore(TimeStampedModel):
         null=True
     )
 
+    objects = ScoreManager()
+
     class Meta:
         db_table = 'compliance_scores'
         ordering = ['-calculated_at']
         verbose_name = 'Compliance Score'
         verbose_name_plural = 'Compliance Scores'
+        indexes = [
+            models.Index(fields=['application', '-calculated_at'], name='score_app_calculated_idx'),
+        ]
 
     def __str__(self):
         return f"{self.application.name}: {self.overall_score}%"
 
 
-class Remediation(TimeStampedModel):
+class Remediation(LoadedFieldsMixin, TimeStampedModel):
     """Remediation actions for non-compliant items."""
     
     STATUS_CHOICES = [
@@ -163,14 +197,30 @@ class Remediation(TimeStampedModel):
     resolved_at = models.DateTimeField(null=True, blank=True)
     resolution_notes = models.TextField(blank=True)
 
+    # Compared on save by the inbox signal handlers.
+    loaded_fields = ['status', 'assigned_to']
+    objects = RemediationManager()
+
     class Meta:
         db_table = 'remediations'
         ordering = ['-created_at']
         verbose_name = 'Remediation'
         verbose_name_plural = 'Remediations'
+        indexes = [
+            models.Index(fields=['assigned_to', 'status'], name='remediation_assignee_idx'),
+        ]
 
     def __str__(self):
         return f"{self.title} - {self.get_status_display()}"
+    
+    def save(self, *args, **kwargs):
+        # Keep resolved_at in step with the status so burndown history can
+        # be reconstructed from it.
+        if self.status == 'resolved' and self.resolved_at is None:
+            self.resolved_at = timezone.now()
+        elif self.status != 'resolved':
+            self.resolved_at = None
+        super().save(*args, **kwargs)
 
 
 class Evidence(TimeStampedModel):
@@ -212,3 +262,122 @@ class Evidence(TimeStampedModel):
 
     def __str__(self):
         return f"{self.title} ({self.get_evidence_type_display()})"
+
+
+class ComplianceRollup(models.Model):
+    """
+    Materialized compliance metrics per organization, department,
+    application type, environment and checklist severity.
+    
+    Rows with severity ``all`` carry the overall figures; the per-severity
+    rows carry the matching score column and open remediations for items
+    of that severity. Maintained by ``apps.compliance.rollups``.
+    """
+    
+    SEVERITY_CHOICES = [('all', 'All Severities')] + [
+        ('critical', 'Critical'),
+        ('major', 'Major'),
+        ('minor', 'Minor'),
+        ('advisory', 'Advisory'),
+    ]
+    
+    organization = models.ForeignKey(
+        'users.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='compliance_rollups'
+    )
+    department = models.CharField(max_length=255, blank=True)
+    application_type = models.CharField(max_length=20, choices=Application.TYPE_CHOICES)
+    environment = models.CharField(max_length=20, choices=Application.ENVIRONMENT_CHOICES)
+    severity = models.CharField(max_length=20, choices=SEVERITY_CHOICES)
+    application_count = models.PositiveIntegerField(default=0)
+    audited_application_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Applications with at least one completed audit'
+    )
+    score_sum = models.DecimalField(
+        max_digits=12,
+        decimal_places=2,
+        default=0,
+        help_text='Sum of the latest score of each scored application'
+    )
+    score_count = models.PositiveIntegerField(default=0)
+    open_remediation_count = models.PositiveIntegerField(default=0)
+    refreshed_at = models.DateTimeField(auto_now=True)
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = 'compliance_rollups'
+        ordering = ['department', 'application_type', 'environment', 'severity']
+        unique_together = ['organization', 'department', 'application_type', 'environment', 'severity']
+        verbose_name = 'Compliance Rollup'
+        verbose_name_plural = 'Compliance Rollups'
+
+    def __str__(self):
+        return (
+            f"{self.department or 'Unassigned'} / {self.application_type} / "
+            f"{self.environment} / {self.severity}"
+        )
+    
+    @property
+    def average_score(self):
+        if not self.score_count:
+            return None
+        return round(self.score_sum / self.score_count, 2)
+
+
+class RemediationSnapshot(models.Model):
+    """
+    Daily remediation state counts per organization, department and
+    priority.
+    
+    Written by ``snapshot_remediations`` so burndown and aging views read a
+    few hundred rows instead of scanning the remediation table.
+    """
+    
+    date = models.DateField(db_index=True)
+    organization = models.ForeignKey(
+        'users.Organization',
+        on_delete=models.CASCADE,
+        null=True,
+        blank=True,
+        related_name='remediation_snapshots'
+    )
+    department = models.CharField(max_length=255, blank=True)
+    priority = models.CharField(max_length=20, choices=Remediation.PRIORITY_CHOICES)
+    open_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Open or in-progress remediations at the end of the day'
+    )
+    resolved_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Remediations resolved on or before the day'
+    )
+    closed_count = models.PositiveIntegerField(
+        default=0,
+        help_text='Remediations deferred or marked as won\'t fix'
+    )
+    age_0_7 = models.PositiveIntegerField(default=0)
+    age_8_30 = models.PositiveIntegerField(default=0)
+    age_31_90 = models.PositiveIntegerField(default=0)
+    age_over_90 = models.PositiveIntegerField(default=0)
+    resolved_on_day = models.PositiveIntegerField(default=0)
+    resolve_seconds_on_day = models.BigIntegerField(
+        default=0,
+        help_text='Total time to resolve of the remediations resolved on the day'
+    )
+
+    objects = TenantManager()
+
+    class Meta:
+        db_table = 'remediation_snapshots'
+        ordering = ['date', 'department', 'priority']
+        unique_together = ['date', 'organization', 'department', 'priority']
+        verbose_name = 'Remediation Snapshot'
+        verbose_name_plural = 'Remediation Snapshots'
+
+    def __str__(self):
+        return f"{self.date} {self.department or 'Unassigned'} / {self.priority}"
@@ -0,0 +1,243 @@
+"""
+Maintenance and querying of the department compliance rollup cube.
+
+Each cell of ``ComplianceRollup`` belongs to a group of applications sharing
+organization, department, application type and environment. When a score,
+remediation, audit or application changes, only the affected group is
+recomputed. Cells are read through the tenant-scoped manager, so every
+organization only sees its own groups.
+
+Signal handlers ``schedule`` refreshes rather than running them. Inside a
+request (``RollupMiddleware``) each group is refreshed once, when the
+response is ready; elsewhere the refresh waits for the surrounding
+transaction to commit.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from decimal import Decimal
+
+from asgiref.sync import sync_to_async
+from django.db import transaction
+from django.db.models import Count, OuterRef, Subquery, Sum
+
+from apps.core.middleware import HybridMiddleware
+from apps.core.tenancy import unscoped
+from .models import Application, ComplianceRollup, ComplianceScore, Remediation
+
+DIMENSION_CHOICES = [
+    ('department', 'Department'),
+    ('application_type', 'Application Type'),
+    ('environment', 'Environment'),
+    ('severity', 'Severity'),
+]
+DIMENSIONS = [dimension for dimension, _ in DIMENSION_CHOICES]
+OPEN_REMEDIATION_STATUSES = ['open', 'in_progress']
+
+# Severity cells whose score comes from a ComplianceScore column.
+SCORE_FIELDS = {
+    'all': 'overall_score',
+    'critical': 'critical_score',
+    'major': 'major_score',
+}
+
+
+GROUP_FIELDS = ['organization', 'department', 'application_type', 'environment']
+CELL_FIELDS = [
+    'application_count', 'audited_application_count', 'score_sum', 'score_count',
+    'open_remediation_count', 'refreshed_at',
+]
+
+_pending = ContextVar('rollup_pending', default=None)
+
+
+def group_key(application):
+    return (
+        application.organization_id,
+        application.department,
+        application.application_type,
+        application.environment,
+    )
+
+
+@unscoped()
+def refresh_group(organization_id, department, application_type, environment):
+    """
+    Recompute every severity cell of one organization/department/type/
+    environment group. Signals may fire in another tenant's request (or in
+    none), so scoping is lifted and the organization filtered explicitly.
+    """
+    group = {
+        'organization_id': organization_id,
+        'department': department,
+        'application_type': application_type,
+        'environment': environment,
+    }
+    applications = Application.objects.filter(is_active=True, **group)
+    cells = ComplianceRollup.objects.filter(**group)
+
+    latest = ComplianceScore.objects.filter(
+        application=OuterRef('pk')
+    ).order_by('-calculated_at')
+    scored = applications.annotate(**{
+        field: Subquery(latest.values(field)[:1]) for field in SCORE_FIELDS.values()
+    }).values(*SCORE_FIELDS.values())
+
+    application_count = applications.count()
+    with transaction.atomic():
+        if application_count == 0:
+            cells.delete()
+            return
+
+        audited = applications.filter(audits__status='completed').distinct().count()
+        scores = list(scored)
+        remediations = dict(
+            Remediation.objects.filter(
+                audit_response__audit__application__in=applications,
+                status__in=OPEN_REMEDIATION_STATUSES,
+            ).values_list('audit_response__checklist_item__severity').annotate(count=Count('pk'))
+        )
+
+        rows = []
+        for severity, _ in ComplianceRollup.SEVERITY_CHOICES:
+            field = SCORE_FIELDS.get(severity)
+            values = [row[field] for row in scores if field and row[field] is not None]
+            if severity == 'all':
+                open_remediations = sum(remediations.values())
+            else:
+                open_remediations = remediations.get(severity, 0)
+            rows.append(ComplianceRollup(
+                **group,
+                severity=severity,
+                application_count=application_count,
+                audited_application_count=audited,
+                score_sum=sum(values, Decimal('0')),
+                score_count=len(values),
+                open_remediation_count=open_remediations,
+            ))
+        if organization_id is None:
+            # NULL never conflicts in a unique key, so replace these cells.
+            cells.delete()
+        ComplianceRollup.objects.bulk_create(
+            rows, update_conflicts=True,
+            unique_fields=GROUP_FIELDS + ['severity'], update_fields=CELL_FIELDS,
+        )
+
+
+def _refresh(groups, application_ids):
+    if application_ids:
+        with unscoped():
+            groups |= set(
+                Application.objects.filter(pk__in=application_ids).values_list(*GROUP_FIELDS)
+            )
+    for key in groups:
+        refresh_group(*key)
+
+
+def schedule(group=None, application_id=None):
+    """
+    Refresh ``group`` (a ``group_key``) or the group of an application once
+    the changes are committed.
+    """
+    groups = {group} if group is not None else set()
+    application_ids = {application_id} if application_id is not None else set()
+    pending = _pending.get()
+    if pending is not None:
+        pending[0].update(groups)
+        pending[1].update(application_ids)
+    else:
+        transaction.on_commit(lambda: _refresh(groups, application_ids))
+
+
+@contextmanager
+def deferred_refresh():
+    """Collect ``schedule`` calls made in the block and refresh each group once."""
+    if _pending.get() is not None:
+        yield
+        return
+    pending = (set(), set())
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        _refresh_on_commit(pending)
+
+
+def _refresh_on_commit(pending):
+    if pending[0] or pending[1]:
+        transaction.on_commit(lambda: _refresh(*pending))
+
+
+@unscoped()
+def rebuild():
+    """Recompute the whole cube, dropping cells whose group no longer exists."""
+    groups = set(
+        Application.objects.filter(is_active=True).values_list(*GROUP_FIELDS).distinct()
+    )
+    stale = set(
+        ComplianceRollup.objects.values_list(*GROUP_FIELDS).distinct()
+    ) - groups
+    for key in groups | stale:
+        refresh_group(*key)
+    return len(groups)
+
+
+def slice_cube(filters=None, group_by=None):
+    """
+    Aggregate cube cells matching ``filters`` (a dimension -> value dict)
+    by the ``group_by`` dimensions. Each result row lists its dimension
+    values, in ``group_by`` order, under ``group``.
+
+    Application counts are repeated on every severity cell of a group, so
+    unless severity is grouped on, only one severity (``all`` by default)
+    is aggregated.
+    """
+    filters = {k: v for k, v in (filters or {}).items() if k in DIMENSIONS and v}
+    group_by = [dimension for dimension in (group_by or []) if dimension in DIMENSIONS]
+
+    cells = ComplianceRollup.objects.all()
+    if 'severity' in group_by:
+        if filters.get('severity') == 'all':
+            del filters['severity']
+        cells = cells.exclude(severity='all')
+    else:
+        filters.setdefault('severity', 'all')
+    cells = cells.filter(**filters)
+
+    rows = cells.values(*group_by).annotate(
+        applications=Sum('application_count'),
+        audited_applications=Sum('audited_application_count'),
+        score_total=Sum('score_sum'),
+        scored=Sum('score_count'),
+        open_remediations=Sum('open_remediation_count'),
+    ).order_by(*group_by)
+
+    results = []
+    for row in rows:
+        row['group'] = [row[dimension] for dimension in group_by]
+        row['average_score'] = (
+            round(row['score_total'] / row['scored'], 2) if row['scored'] else None
+        )
+        row['coverage'] = (
+            round(row['audited_applications'] * 100 / row['applications'], 1)
+            if row['applications'] else None
+        )
+        results.append(row)
+    return results
+
+
+class RollupMiddleware(HybridMiddleware):
+    """Refresh each rollup group once per request, however many rows it saved."""
+
+    def handle(self, request):
+        with deferred_refresh():
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        pending = (set(), set())
+        token = _pending.set(pending)
+        try:
+            return await self.get_response(request)
+        finally:
+            _pending.reset(token)
+            await sync_to_async(_refresh_on_commit)(pending)
@@ -0,0 +1,65 @@
+"""
+Signal handlers keeping the compliance rollup cube up to date.
+"""
+from django.db.models.signals import post_delete, post_save, pre_save
+from django.dispatch import receiver
+from apps.audits.models import Audit
+from .models import Application, ComplianceScore, Remediation
+from . import rollups
+
+
+@receiver(pre_save, sender=Application)
+def remember_rollup_group(sender, instance, raw=False, **kwargs):
+    if raw or instance.pk is None:
+        return
+    previous = Application.objects.filter(pk=instance.pk).first()
+    instance._previous_rollup_group = rollups.group_key(previous) if previous else None
+
+
+@receiver(post_save, sender=Application)
+def refresh_application_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    key = rollups.group_key(instance)
+    rollups.schedule(key)
+    previous = getattr(instance, '_previous_rollup_group', None)
+    if previous and previous != key:
+        rollups.schedule(previous)
+
+
+@receiver(post_delete, sender=Application)
+def drop_application_rollup(sender, instance, **kwargs):
+    rollups.schedule(rollups.group_key(instance))
+
+
+@receiver(post_save, sender=ComplianceScore)
+@receiver(post_delete, sender=ComplianceScore)
+def refresh_score_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    rollups.schedule(application_id=instance.application_id)
+
+
+@receiver(post_save, sender=Audit)
+@receiver(post_delete, sender=Audit)
+def refresh_audit_rollup(sender, instance, raw=False, **kwargs):
+    # Only completed audits count towards coverage, so refresh when an audit
+    # is completed or leaves that state (reopened or cancelled).
+    # _previous_status is set by the audits app's pre_save handler.
+    if raw:
+        return
+    previous = getattr(instance, '_previous_status', None)
+    if 'completed' in (instance.status, previous):
+        rollups.schedule(application_id=instance.application_id)
+
+
+@receiver(post_save, sender=Remediation)
+@receiver(post_delete, sender=Remediation)
+def refresh_remediation_rollup(sender, instance, raw=False, **kwargs):
+    if raw:
+        return
+    application_id = Audit.objects.filter(
+        responses__pk=instance.audit_response_id
+    ).values_list('application_id', flat=True).first()
+    if application_id is not None:
+        rollups.schedule(application_id=application_id)
@@ -11,4 +11,6 @@ urlpatterns = [
     path('applications/<int:pk>/edit/', views.application_edit, name='application_edit'),
     path('remediations/', views.remediation_list, name='remediation_list'),
     path('remediations/<int:pk>/', views.remediation_detail, name='remediation_detail'),
+    path('remediations/burndown/', views.remediation_burndown, name='remediation_burndown'),
+    path('rollups/', views.rollup_cube, name='rollup_cube'),
 ]
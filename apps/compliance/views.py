@@ -1,11 +1,15 @@
 """
 Compliance views for application management and tracking.
 """
+from datetime import timedelta
+
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from .models import Application, ComplianceScore, Remediation, Evidence
+from django.utils import timezone
+from .models import Application, ComplianceRollup, ComplianceScore, Remediation, Evidence, RemediationSnapshot
 from .forms import ApplicationForm, RemediationForm
+from . import burndown, rollups
 
 
 @login_required
@@ -30,7 +34,7 @@ def application_detail(request, pk):
         messages.error(request, 'Access denied.')
         return redirect('application_list')
     
-    audits = application.audits.order_by('-created_at')[:10]
+    audits = application.audits.select_related('archive').order_by('-created_at')[:10]
     scores = application.compliance_scores.order_by('-calculated_at')[:10]
     
     return render(request, 'compliance/application_detail.html', {
@@ -131,3 +135,76 @@ def remediation_detail(request, pk):
         'remediation': remediation,
         'form': form
     })
+
+
+@login_required
+def rollup_cube(request):
+    """Slice and dice the department compliance rollup cube."""
+    if request.user.is_developer:
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    filters = {dimension: request.GET.get(dimension, '') for dimension in rollups.DIMENSIONS}
+    requested = request.GET.getlist('group_by') or ['department']
+    group_by = [dimension for dimension in rollups.DIMENSIONS if dimension in requested]
+    rows = rollups.slice_cube(filters, group_by)
+    
+    departments = ComplianceRollup.objects.values_list(
+        'department', flat=True
+    ).distinct().order_by('department')
+    
+    return render(request, 'compliance/rollup_cube.html', {
+        'rows': rows,
+        'filters': filters,
+        'group_by': group_by,
+        'dimension_choices': rollups.DIMENSION_CHOICES,
+        'departments': departments,
+        'type_choices': Application.TYPE_CHOICES,
+        'environment_choices': Application.ENVIRONMENT_CHOICES,
+        'severity_choices': ComplianceRollup.SEVERITY_CHOICES,
+    })
+
+
+@login_required
+def remediation_burndown(request):
+    """Burndown, aging and time-to-resolve charts from daily snapshots."""
+    if request.user.is_developer:
+        messages.error(request, 'Access denied.')
+        return redirect('dashboard')
+    
+    try:
+        days = min(max(int(request.GET.get('days', 90)), 7), 365)
+    except ValueError:
+        days = 90
+    department = request.GET.get('department') or None
+    if department == burndown.UNASSIGNED:
+        department = ''
+    priority = request.GET.get('priority', '')
+    
+    last_day = RemediationSnapshot.objects.order_by('-date').values_list('date', flat=True).first()
+    last_day = last_day or timezone.localdate()
+    first_day = last_day - timedelta(days=days - 1)
+    
+    series = burndown.burndown(first_day, last_day, department, priority)
+    peak = max((row['open'] + row['resolved'] for row in series), default=0)
+    for row in series:
+        row['open_pct'] = round(row['open'] * 100 / peak, 1) if peak else 0
+        row['resolved_pct'] = round(row['resolved'] * 100 / peak, 1) if peak else 0
+    
+    departments = RemediationSnapshot.objects.values_list(
+        'department', flat=True
+    ).distinct().order_by('department')
+    
+    return render(request, 'compliance/remediation_burndown.html', {
+        'series': series,
+        'aging': burndown.aging(last_day, department),
+        'mttr': burndown.mean_time_to_resolve(first_day, last_day),
+        'first_day': first_day,
+        'last_day': last_day,
+        'days': days,
+        'department': department,
+        'priority': priority,
+        'departments': departments,
+        'unassigned': burndown.UNASSIGNED,
+        'priority_choices': Remediation.PRIORITY_CHOICES,
+    })
@@ -1,5 +1,5 @@
 from django.contrib import admin
-from .models import DPDPSection
+from .models import DPDPSection, SlowQuery
 
 
 @admin.register(DPDPSection)
@@ -7,3 +7,12 @@ class DPDPSectionAdmin(admin.ModelAdmin):
     list_display = ('section_number', 'title', 'is_active')
     list_filter = ('is_active',)
     search_fields = ('section_number', 'title', 'description')
+
+
+@admin.register(SlowQuery)
+class SlowQueryAdmin(admin.ModelAdmin):
+    list_display = ('fingerprint', 'view', 'duration_ms', 'rows', 'created_at')
+    list_filter = ('view',)
+    search_fields = ('fingerprint', 'sql')
+    date_hierarchy = 'created_at'
+    readonly_fields = ('fingerprint', 'sql', 'view', 'duration_ms', 'rows', 'created_at')
@@ -0,0 +1,332 @@
+"""
+Denormalized columnar snapshots of the analytics tables.
+
+Each exported table is described by a queryset and a list of columns
+(name, ORM lookup, Arrow type). Rows are streamed from the database in
+chunks and written as Parquet row groups, so memory use is bounded by the
+chunk size rather than the table size.
+
+A full export replaces the table's directory with a single new part; it
+is written to a temporary directory first and swapped in by rename.
+Incremental runs only export rows whose ``updated_at`` is newer than the
+last run's watermark and add them as a new part next to the earlier ones,
+so a row changed between runs appears in several parts. ``id`` plus
+``updated_at`` is the deduplication key: readers keep the row with the
+newest ``updated_at`` per ``id``, which is also what ``compact_table``
+does to fold the parts back into one. Rows deleted from the database only
+disappear on the next full export.
+
+Responses moved into ``AuditArchive`` are exported from the archive
+payload with ``archived`` set, so archiving an audit does not drop its
+responses from the analytics.
+"""
+import itertools
+import json
+import os
+import shutil
+
+from django.utils import timezone
+from django.utils.dateparse import parse_datetime
+
+STATE_FILE = '_state.json'
+
+
+def _responses():
+    from django.db.models import BooleanField, Value
+    from apps.audits.models import AuditResponse
+    return AuditResponse.objects.annotate(archived=Value(False, output_field=BooleanField()))
+
+
+def _scores():
+    from apps.compliance.models import ComplianceScore
+    return ComplianceScore.objects.all()
+
+
+def _remediations():
+    from apps.compliance.models import Remediation
+    return Remediation.objects.all()
+
+
+APPLICATION_COLUMNS = [
+    ('application_id', 'application_id', 'int64'),
+    ('application_name', 'application__name', 'string'),
+    ('application_type', 'application__application_type', 'string'),
+    ('environment', 'application__environment', 'string'),
+    ('department', 'application__department', 'string'),
+]
+
+
+def _prefixed(prefix, columns):
+    return [(name, f'{prefix}{lookup}', kind) for name, lookup, kind in columns]
+
+
+TABLES = {
+    'audit_responses': (_responses, [
+        ('id', 'id', 'int64'),
+        ('audit_id', 'audit_id', 'int64'),
+        ('audit_title', 'audit__title', 'string'),
+        ('audit_status', 'audit__status', 'string'),
+        *_prefixed('audit__', APPLICATION_COLUMNS),
+        ('checklist_item_code', 'checklist_item__code', 'string'),
+        ('checklist_item_severity', 'checklist_item__severity', 'string'),
+        ('category', 'checklist_item__category__name', 'string'),
+        ('status', 'status', 'string'),
+        ('findings', 'findings', 'string'),
+        ('recommendations', 'recommendations', 'string'),
+        ('reviewed_by', 'reviewed_by__username', 'string'),
+        ('reviewed_at', 'reviewed_at', 'timestamp'),
+        ('created_at', 'created_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+        ('archived', 'archived', 'bool'),
+    ]),
+    'compliance_scores': (_scores, [
+        ('id', 'id', 'int64'),
+        ('audit_id', 'audit_id', 'int64'),
+        *APPLICATION_COLUMNS,
+        ('overall_score', 'overall_score', 'decimal'),
+        ('critical_score', 'critical_score', 'decimal'),
+        ('major_score', 'major_score', 'decimal'),
+        ('calculated_at', 'calculated_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+    ]),
+    'remediations': (_remediations, [
+        ('id', 'id', 'int64'),
+        ('audit_response_id', 'audit_response_id', 'int64'),
+        ('audit_id', 'audit_response__audit_id', 'int64'),
+        *_prefixed('audit_response__audit__', APPLICATION_COLUMNS),
+        ('checklist_item_code', 'audit_response__checklist_item__code', 'string'),
+        ('checklist_item_severity', 'audit_response__checklist_item__severity', 'string'),
+        ('title', 'title', 'string'),
+        ('status', 'status', 'string'),
+        ('priority', 'priority', 'string'),
+        ('assigned_to', 'assigned_to__username', 'string'),
+        ('due_date', 'due_date', 'date'),
+        ('resolved_at', 'resolved_at', 'timestamp'),
+        ('created_at', 'created_at', 'timestamp'),
+        ('updated_at', 'updated_at', 'timestamp'),
+    ]),
+}
+
+
+def _archived_responses(since=None):
+    """
+    Yield ``audit_responses`` rows, in column order, for the responses held
+    in audit archives (those archived after ``since`` when given).
+    """
+    from apps.audits.models import AuditArchive, ChecklistItem
+    from apps.users.models import User
+
+    archives = AuditArchive.objects.select_related('audit__application').order_by('pk')
+    if since is not None:
+        archives = archives.filter(archived_at__gt=since)
+    for archive in archives.iterator(chunk_size=100):
+        audit, application = archive.audit, archive.audit.application
+        rows = archive.unpack()
+        items = {
+            item.pk: item for item in ChecklistItem.objects.select_related('category').filter(
+                pk__in={row['checklist_item_id'] for row in rows}
+            )
+        }
+        reviewers = dict(User.objects.filter(
+            pk__in={row['reviewed_by_id'] for row in rows if row['reviewed_by_id']}
+        ).values_list('pk', 'username'))
+        for row in rows:
+            item = items.get(row['checklist_item_id'])
+            yield (
+                row['id'], audit.pk, audit.title, audit.status,
+                application.pk, application.name, application.application_type,
+                application.environment, application.department,
+                item.code if item else None,
+                item.severity if item else None,
+                item.category.name if item else None,
+                row['status'], row['findings'], row['recommendations'],
+                reviewers.get(row['reviewed_by_id']), row['reviewed_at'],
+                row['created_at'], row['updated_at'], True,
+            )
+
+
+# Extra row sources appended to a table's export, keyed by table name.
+ARCHIVED_ROWS = {
+    'audit_responses': _archived_responses,
+}
+
+
+def _arrow_schema(pa, columns):
+    types = {
+        'int64': pa.int64(),
+        'decimal': pa.decimal128(5, 2),
+        'string': pa.string(),
+        'bool': pa.bool_(),
+        'date': pa.date32(),
+        'timestamp': pa.timestamp('us', tz='UTC'),
+    }
+    return pa.schema([(name, types[kind]) for name, _, kind in columns])
+
+
+def load_state(directory):
+    path = os.path.join(directory, STATE_FILE)
+    if not os.path.exists(path):
+        return {}
+    with open(path) as fh:
+        return json.load(fh)
+
+
+def save_state(directory, state):
+    path = os.path.join(directory, STATE_FILE)
+    with open(f'{path}.tmp', 'w') as fh:
+        json.dump(state, fh, indent=2)
+    os.replace(f'{path}.tmp', path)
+
+
+def _swap_directory(new, current):
+    """Put directory ``new`` in the place of ``current`` by renames."""
+    previous = f'{current}.old'
+    shutil.rmtree(previous, ignore_errors=True)
+    if os.path.exists(current):
+        os.replace(current, previous)
+    os.replace(new, current)
+    shutil.rmtree(previous, ignore_errors=True)
+
+
+def _part_path(table_dir):
+    return os.path.join(table_dir, f'part-{timezone.now():%Y%m%dT%H%M%S%f}.parquet')
+
+
+def _hidden(path):
+    # Parquet readers skip files starting with a dot.
+    directory, name = os.path.split(path)
+    return os.path.join(directory, f'.{name}.tmp')
+
+
+def export_table(name, directory, since=None, chunk_size=5000, compression='zstd'):
+    """
+    Write rows of table ``name`` updated after ``since`` to a new Parquet
+    part file under ``directory/name``. Without ``since`` every row is
+    exported and the part replaces the table's earlier parts.
+
+    Returns ``(rows written, path or None, newest updated_at seen)``.
+    """
+    import pyarrow as pa
+    import pyarrow.parquet as pq
+
+    queryset_factory, columns = TABLES[name]
+    schema = _arrow_schema(pa, columns)
+    queryset = queryset_factory()
+    if since is not None:
+        queryset = queryset.filter(updated_at__gt=since)
+    rows = queryset.order_by('pk').values_list(
+        *[lookup for _, lookup, _ in columns]
+    ).iterator(chunk_size=chunk_size)
+    if name in ARCHIVED_ROWS:
+        rows = itertools.chain(rows, ARCHIVED_ROWS[name](since))
+
+    table_dir = os.path.join(directory, name)
+    target_dir = table_dir
+    if since is None:
+        target_dir = os.path.join(directory, f'.{name}.tmp')
+        shutil.rmtree(target_dir, ignore_errors=True)
+    os.makedirs(target_dir, exist_ok=True)
+    path = _part_path(target_dir)
+    tmp_path = _hidden(path)
+
+    updated_index = [column for column, _, _ in columns].index('updated_at')
+    written = 0
+    newest = since
+    writer = None
+    batch = []
+
+    def flush():
+        nonlocal writer
+        arrays = [
+            pa.array([row[i] for row in batch], type=schema.field(i).type)
+            for i in range(len(columns))
+        ]
+        if writer is None:
+            writer = pq.ParquetWriter(tmp_path, schema, compression=compression)
+        writer.write_batch(pa.RecordBatch.from_arrays(arrays, schema=schema))
+
+    try:
+        for row in rows:
+            batch.append(row)
+            if newest is None or row[updated_index] > newest:
+                newest = row[updated_index]
+            if len(batch) >= chunk_size:
+                flush()
+                written += len(batch)
+                batch = []
+        if batch:
+            flush()
+            written += len(batch)
+    except BaseException:
+        if writer is not None:
+            writer.close()
+            os.remove(tmp_path)
+        if target_dir != table_dir:
+            shutil.rmtree(target_dir, ignore_errors=True)
+        raise
+    if writer is not None:
+        writer.close()
+        os.replace(tmp_path, path)
+
+    if target_dir != table_dir:
+        _swap_directory(target_dir, table_dir)
+        path = os.path.join(table_dir, os.path.basename(path))
+    if writer is None:
+        return 0, None, newest
+    return written, path, newest
+
+
+def compact_table(name, directory, compression='zstd'):
+    """
+    Fold the parts of table ``name`` into one, keeping only the newest
+    ``updated_at`` of every ``id``. Reads the whole table into memory.
+
+    Returns ``(rows before, rows after)``.
+    """
+    import pyarrow as pa
+    import pyarrow.compute as pc
+    import pyarrow.parquet as pq
+
+    table_dir = os.path.join(directory, name)
+    if not os.path.isdir(table_dir):
+        return 0, 0
+    table = pq.read_table(table_dir)
+    if table.num_rows == 0:
+        return 0, 0
+    table = table.sort_by([('id', 'ascending'), ('updated_at', 'descending')])
+    ids = table.column('id').combine_chunks()
+    newest = pa.concat_arrays([
+        pa.array([True]),
+        pc.not_equal(ids.slice(1), ids.slice(0, len(ids) - 1)),
+    ])
+    compacted = table.filter(newest)
+
+    target_dir = os.path.join(directory, f'.{name}.tmp')
+    shutil.rmtree(target_dir, ignore_errors=True)
+    os.makedirs(target_dir)
+    pq.write_table(compacted, _part_path(target_dir), compression=compression)
+    _swap_directory(target_dir, table_dir)
+    return table.num_rows, compacted.num_rows
+
+
+def export(directory, tables=None, incremental=False, chunk_size=5000, progress=None):
+    """
+    Export ``tables`` (all by default) into ``directory``. Incremental runs
+    start from, and advance, each table's ``updated_at`` watermark; full
+    runs replace the table and restart its watermark.
+    """
+    state = load_state(directory)
+    results = {}
+    for name in tables or TABLES:
+        since = parse_datetime(state[name]) if incremental and state.get(name) else None
+        written, path, newest = export_table(name, directory, since, chunk_size)
+        if newest is not None:
+            state[name] = newest.isoformat()
+        else:
+            state.pop(name, None)
+        results[name] = (written, path)
+        if progress:
+            progress(name, written, path)
+    os.makedirs(directory, exist_ok=True)
+    save_state(directory, state)
+    return results
@@ -0,0 +1,128 @@
+"""
+Container start-up without redundant work.
+
+Each start-up step is guarded by a cheap check of its inputs:
+
+* ``migrate`` runs only if the migration graph has unapplied nodes;
+* the checklist packs are applied only if a pack file's fingerprint
+  differs from the one recorded in ``ChecklistPack``;
+* ``load_sample_data`` runs only if the command changed since it last
+  ran, tracked in ``BootStep``;
+* ``collectstatic`` runs only if the hash of the static source files
+  differs from the one stamped into ``STATIC_ROOT`` by the last run.
+
+Database steps run in order under a database advisory lock, so replicas
+starting together do not migrate at the same time; whoever gets the lock
+second re-checks and usually finds nothing left to do. ``collectstatic``
+touches only the local filesystem and runs alongside them.
+"""
+import hashlib
+import inspect
+import os
+import zlib
+from contextlib import contextmanager
+from pathlib import Path
+
+from django.conf import settings
+from django.db import DEFAULT_DB_ALIAS, connections
+from django.db.migrations.executor import MigrationExecutor
+
+LOCK_NAME = 'dp_compass.boot'
+LOCK_TIMEOUT = 600
+STATIC_STAMP = '.boot-static.sha256'
+STATIC_IGNORE = ['CVS', '.*', '*~']
+
+
+@contextmanager
+def advisory_lock(name=LOCK_NAME, using=DEFAULT_DB_ALIAS, timeout=LOCK_TIMEOUT):
+    """Hold a lock shared by every process using the database."""
+    connection = connections[using]
+    if connection.vendor == 'postgresql':
+        key = zlib.crc32(name.encode())
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT pg_advisory_lock(%s)', [key])
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT pg_advisory_unlock(%s)', [key])
+    elif connection.vendor == 'mysql':
+        with connection.cursor() as cursor:
+            cursor.execute('SELECT GET_LOCK(%s, %s)', [name, timeout])
+            if cursor.fetchone()[0] != 1:
+                raise TimeoutError(f'Could not acquire lock {name!r} within {timeout}s')
+        try:
+            yield
+        finally:
+            with connection.cursor() as cursor:
+                cursor.execute('SELECT RELEASE_LOCK(%s)', [name])
+    else:
+        # SQLite has no advisory locks; processes sharing the database
+        # file share its directory, so a lock file beside it will do.
+        import fcntl
+        path = f"{connection.settings_dict['NAME']}.{name}.lock"
+        with open(path, 'a') as fh:
+            fcntl.flock(fh, fcntl.LOCK_EX)
+            try:
+                yield
+            finally:
+                fcntl.flock(fh, fcntl.LOCK_UN)
+
+
+def pending_migrations(using=DEFAULT_DB_ALIAS):
+    """Return the ``(migration, backwards)`` plan ``migrate`` would run."""
+    executor = MigrationExecutor(connections[using])
+    return executor.migration_plan(executor.loader.graph.leaf_nodes())
+
+
+def changed_packs():
+    """Return the pack files whose content differs from what was applied."""
+    from apps.audits.packs import pack_paths, pack_state, read_pack
+    applied = pack_state()
+    packs = [(path, read_pack(path)) for path in pack_paths()]
+    return [path for path, data in packs if applied.get(data['name']) != data['fingerprint']]
+
+
+def sample_data_fingerprint():
+    from apps.audits.management.commands import load_sample_data
+    return hashlib.sha256(inspect.getsource(load_sample_data).encode('utf-8')).hexdigest()
+
+
+def step_changed(name, fingerprint):
+    from .models import BootStep
+    return not BootStep.objects.filter(name=name, fingerprint=fingerprint).exists()
+
+
+def record_step(name, fingerprint):
+    from .models import BootStep
+    BootStep.objects.update_or_create(name=name, defaults={'fingerprint': fingerprint})
+
+
+def static_fingerprint():
+    """Hash the paths and contents of every file ``collectstatic`` would copy."""
+    from django.contrib.staticfiles.finders import get_finders
+    digest = hashlib.sha256()
+    for finder in get_finders():
+        for path, storage in sorted(finder.list(STATIC_IGNORE), key=lambda pair: pair[0]):
+            digest.update(path.encode('utf-8') + b'\0')
+            with storage.open(path) as fh:
+                for chunk in iter(lambda: fh.read(64 * 1024), b''):
+                    digest.update(chunk)
+    return digest.hexdigest()
+
+
+def _static_stamp():
+    return Path(settings.STATIC_ROOT) / STATIC_STAMP
+
+
+def static_changed(fingerprint):
+    try:
+        return _static_stamp().read_text().strip() != fingerprint
+    except OSError:
+        return True
+
+
+def record_static(fingerprint):
+    stamp = _static_stamp()
+    os.makedirs(stamp.parent, exist_ok=True)
+    stamp.write_text(fingerprint + '\n')
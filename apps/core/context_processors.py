@@ -0,0 +1,13 @@
+"""
+Template context processors for DP-COMPASS.
+"""
+from django.utils.functional import SimpleLazyObject
+from .inbox import inbox_count
+
+
+def inbox(request):
+    """Expose the user's open work item count for the sidebar badge."""
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated:
+        return {}
+    return {'inbox_count': SimpleLazyObject(lambda: inbox_count(user))}
@@ -0,0 +1,280 @@
+"""
+Synthetic dataset builder for benchmarks and load tests.
+
+Creates users, applications, audits with a response per active checklist
+item, remediations for failed items, evidence stubs, compliance scores and
+the derived status vectors and rollups, all with batched ``bulk_create``
+calls. Secondary indexes of the bulk-loaded tables are dropped for the
+duration of the load and rebuilt once at the end, which is much cheaper
+than maintaining them row by row. The same ``seed`` always produces the
+same data. The checklist itself must already be loaded (``load_checklist``).
+"""
+import random
+from contextlib import contextmanager
+from decimal import Decimal
+
+from django.apps import apps as django_apps
+from django.contrib.auth.hashers import make_password
+from django.core.files.base import ContentFile
+from django.core.files.storage import default_storage
+from django.core.cache import cache
+from django.core.management import call_command
+from django.db import connection, transaction
+from django.test.utils import setup_test_environment, teardown_test_environment
+from django.utils import timezone
+
+BATCH_SIZE = 1000
+DEPARTMENTS = ['Retail', 'Payments', 'Lending', 'HR', 'Marketing', 'Support', '']
+AUDIT_STATUS_WEIGHTS = [('completed', 5), ('in_progress', 3), ('pending', 2)]
+RESPONSE_STATUS_WEIGHTS = [
+    ('compliant', 6), ('non_compliant', 2), ('partially_compliant', 2), ('not_applicable', 1),
+]
+PASSWORD = 'Bench@123'
+EVIDENCE_RATE = 0.2
+EVIDENCE_PLACEHOLDER = 'evidence/synthetic/placeholder.txt'
+LOADED_MODELS = [
+    'users.User', 'compliance.Application', 'audits.Audit', 'audits.AuditResponse',
+    'audits.AuditStatusVector', 'compliance.ComplianceScore', 'compliance.Remediation',
+    'compliance.Evidence',
+]
+
+
+@contextmanager
+def deferred_indexes(models):
+    """Drop the ``Meta.indexes`` of ``models`` and recreate them on exit."""
+    dropped = [(model, index) for model in models for index in model._meta.indexes]
+    with connection.schema_editor() as editor:
+        for model, index in dropped:
+            editor.remove_index(model, index)
+    try:
+        yield
+    finally:
+        with connection.schema_editor() as editor:
+            for model, index in dropped:
+                editor.add_index(model, index)
+
+
+def _weighted(rng, weights):
+    values, counts = zip(*weights)
+    return rng.choices(values, counts)[0]
+
+
+def _users(rng, prefix, role, count, organization, password):
+    from apps.users.models import User
+    users = [
+        User(
+            username=f'{prefix}{index}',
+            email=f'{prefix}{index}@example.com',
+            first_name=prefix.title(),
+            last_name=str(index),
+            role=role,
+            organization=organization,
+            department=rng.choice(DEPARTMENTS),
+            is_verified=True,
+            password=password,
+        )
+        for index in range(count)
+    ]
+    User.objects.bulk_create(users, batch_size=BATCH_SIZE)
+    return list(User.objects.filter(
+        username__in=[user.username for user in users]
+    ).order_by('pk'))
+
+
+@contextmanager
+def test_database():
+    """
+    Run the block against a fresh test database, with an empty cache and
+    the checklist loaded, and drop the database afterwards.
+    """
+    setup_test_environment(debug=False)
+    old_name = connection.creation.create_test_db(verbosity=0, autoclobber=True, serialize=False)
+    cache.clear()
+    try:
+        call_command('load_checklist', verbosity=0)
+        yield
+    finally:
+        connection.creation.destroy_test_db(old_name, verbosity=0)
+        teardown_test_environment()
+
+
+def _placeholder():
+    """Store the file every synthetic evidence row points at, once."""
+    if not default_storage.exists(EVIDENCE_PLACEHOLDER):
+        return default_storage.save(
+            EVIDENCE_PLACEHOLDER, ContentFile(b'Synthetic evidence placeholder.\n')
+        )
+    return EVIDENCE_PLACEHOLDER
+
+
+def build(applications=20, audits_per_app=3, seed=0, prefix='bench', progress=None,
+          defer_indexes=True):
+    """
+    Create a dataset of ``applications`` applications with
+    ``audits_per_app`` audits each. Returns a dict of created row counts.
+    Usernames and application names start with ``prefix``.
+    """
+    from apps.compliance import rollups
+
+    models = [django_apps.get_model(label) for label in LOADED_MODELS] if defer_indexes else []
+    with deferred_indexes(models):
+        counts = _load(applications, audits_per_app, seed, prefix, progress)
+    if progress:
+        progress('rebuilding rollups')
+    rollups.rebuild()
+    return counts
+
+
+def _load(applications, audits_per_app, seed, prefix, progress):
+    from apps.audits.models import Audit, AuditResponse, AuditStatusVector, ChecklistItem
+    from apps.audits import status_vector
+    from apps.compliance.models import Application, ComplianceScore, Evidence, Remediation
+    from apps.users.models import Organization
+
+    rng = random.Random(seed)
+    items = list(ChecklistItem.objects.filter(is_active=True).order_by('ordinal'))
+    if not items:
+        raise ValueError('No checklist items; run load_checklist first.')
+    now = timezone.now()
+    counts = {}
+
+    with transaction.atomic():
+        organization = Organization.get_default()
+        password = make_password(PASSWORD)
+        admins = _users(rng, f'{prefix}_admin', 'admin', 1, organization, password)
+        auditors = _users(
+            rng, f'{prefix}_auditor', 'auditor', max(1, applications // 10), organization, password
+        )
+        developers = _users(
+            rng, f'{prefix}_dev', 'developer', max(1, applications // 5), organization, password
+        )
+        counts['users'] = len(admins) + len(auditors) + len(developers)
+
+        Application.objects.bulk_create([
+            Application(
+                name=f'{prefix} application {index:05d}',
+                description='Synthetic application for benchmarking.',
+                application_type=rng.choice(Application.TYPE_CHOICES)[0],
+                environment=rng.choice(Application.ENVIRONMENT_CHOICES)[0],
+                organization=organization,
+                owner=rng.choice(developers),
+                department=rng.choice(DEPARTMENTS),
+            )
+            for index in range(applications)
+        ], batch_size=BATCH_SIZE)
+        apps = list(Application.objects.filter(name__startswith=f'{prefix} application ').order_by('pk'))
+        counts['applications'] = len(apps)
+        if progress:
+            progress(f'{len(apps)} applications')
+
+        audits = []
+        for application in apps:
+            for number in range(audits_per_app):
+                status = _weighted(rng, AUDIT_STATUS_WEIGHTS)
+                audits.append(Audit(
+                    application=application,
+                    organization=organization,
+                    auditor=rng.choice(auditors),
+                    title=f'{application.name} audit {number + 1}',
+                    status=status,
+                    started_at=now if status != 'pending' else None,
+                    completed_at=now if status == 'completed' else None,
+                ))
+        Audit.objects.bulk_create(audits, batch_size=BATCH_SIZE)
+        audits = list(Audit.objects.filter(
+            application__in=apps
+        ).only('pk', 'status', 'application_id', 'auditor_id').order_by('pk'))
+        counts['audits'] = len(audits)
+
+        responses = []
+        vectors = []
+        scores = []
+        created = 0
+        for audit in audits:
+            batch = []
+            for item in items:
+                if audit.status == 'pending' or (
+                        audit.status == 'in_progress' and rng.random() < 0.5):
+                    status = 'pending'
+                else:
+                    status = _weighted(rng, RESPONSE_STATUS_WEIGHTS)
+                reviewed = status != 'pending'
+                batch.append(AuditResponse(
+                    audit_id=audit.pk,
+                    checklist_item_id=item.pk,
+                    status=status,
+                    findings=f'Observed {status.replace("_", " ")} controls for {item.code}.' if reviewed else '',
+                    recommendations='Review and document the control.' if status != 'compliant' and reviewed else '',
+                    reviewed_by_id=audit.auditor_id if reviewed else None,
+                    reviewed_at=now if reviewed else None,
+                ))
+            responses.extend(batch)
+            vectors.append(AuditStatusVector(
+                audit_id=audit.pk,
+                vector=status_vector.encode(
+                    (item.ordinal, response.status) for item, response in zip(items, batch)
+                ),
+            ))
+            if audit.status == 'completed':
+                assessed = [r for r in batch if r.status not in ('pending', 'not_applicable')]
+                compliant = sum(1 for r in assessed if r.status == 'compliant')
+                score = Decimal(compliant * 100 / len(assessed)).quantize(Decimal('0.01')) if assessed else Decimal('0')
+                scores.append(ComplianceScore(
+                    application_id=audit.application_id,
+                    audit_id=audit.pk,
+                    overall_score=score,
+                    critical_score=score,
+                    major_score=score,
+                ))
+            if len(responses) >= BATCH_SIZE:
+                AuditResponse.objects.bulk_create(responses, batch_size=BATCH_SIZE)
+                created += len(responses)
+                responses = []
+        AuditResponse.objects.bulk_create(responses, batch_size=BATCH_SIZE)
+        created += len(responses)
+        AuditStatusVector.objects.bulk_create(vectors, batch_size=BATCH_SIZE)
+        ComplianceScore.objects.bulk_create(scores, batch_size=BATCH_SIZE)
+        counts['responses'] = created
+        counts['scores'] = len(scores)
+        if progress:
+            progress(f'{len(audits)} audits, {created} responses')
+
+        reviewed = AuditResponse.objects.filter(
+            audit__in=[audit.pk for audit in audits if audit.status == 'completed'],
+            status__in=['compliant', 'non_compliant', 'partially_compliant'],
+        ).values_list('pk', 'status', 'checklist_item__code', 'reviewed_by_id').order_by('pk')
+        placeholder = _placeholder()
+        remediations, evidence = [], []
+        counts['remediations'] = counts['evidence'] = 0
+        for response_id, status, code, reviewer_id in reviewed.iterator(chunk_size=BATCH_SIZE):
+            if status == 'non_compliant':
+                remediation = Remediation(
+                    audit_response_id=response_id,
+                    title=f'Remediate {code}',
+                    description='Close the gap found during the audit.',
+                    status=rng.choice(Remediation.STATUS_CHOICES)[0],
+                    priority=rng.choice(Remediation.PRIORITY_CHOICES)[0],
+                    assigned_to=rng.choice(developers),
+                )
+                if remediation.status == 'resolved':
+                    remediation.resolved_at = now
+                remediations.append(remediation)
+            elif rng.random() < EVIDENCE_RATE:
+                evidence.append(Evidence(
+                    audit_response_id=response_id,
+                    title=f'Evidence for {code}',
+                    evidence_type=rng.choice(Evidence.TYPE_CHOICES)[0],
+                    file=placeholder,
+                    uploaded_by_id=reviewer_id,
+                ))
+            if len(remediations) >= BATCH_SIZE:
+                counts['remediations'] += len(Remediation.objects.bulk_create(remediations))
+                remediations = []
+            if len(evidence) >= BATCH_SIZE:
+                counts['evidence'] += len(Evidence.objects.bulk_create(evidence))
+                evidence = []
+        counts['remediations'] += len(Remediation.objects.bulk_create(remediations))
+        counts['evidence'] += len(Evidence.objects.bulk_create(evidence))
+        if progress:
+            progress(f"{counts['remediations']} remediations, {counts['evidence']} evidence stubs")
+    return counts
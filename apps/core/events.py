@@ -0,0 +1,190 @@
+"""
+Event broker behind the server-sent events feed.
+
+Signal handlers publish small JSON deltas to named topics (``dashboard``,
+``audit:<pk>``); the SSE view subscribes on the ASGI event loop and relays
+them to the browser.
+
+On PostgreSQL, events travel through ``NOTIFY`` on one channel: every
+worker that serves a stream runs a ``Relay`` thread that ``LISTEN``s on a
+connection of its own and hands the notifications to its local
+subscriptions, so a client sees events raised by any worker. Other
+databases have no such channel and events stay in the publishing
+process; run a single web worker there.
+"""
+import asyncio
+import json
+import logging
+import select
+import threading
+import time
+
+from django.db import DEFAULT_DB_ALIAS, connections, transaction
+
+logger = logging.getLogger(__name__)
+
+CHANNEL = 'dp_compass_events'
+RELAY_POLL_SECONDS = 5
+RELAY_RETRY_SECONDS = 5
+
+
+def shared():
+    """Whether events are relayed between processes by the database."""
+    return connections[DEFAULT_DB_ALIAS].vendor == 'postgresql'
+
+
+class Subscription:
+    """A bounded queue of events for one connected client."""
+
+    def __init__(self, broker, topics, maxsize=100):
+        self.broker = broker
+        self.topics = frozenset(topics)
+        self.loop = asyncio.get_running_loop()
+        self.queue = asyncio.Queue(maxsize=maxsize)
+        self.overflowed = False
+
+    def _deliver(self, event):
+        try:
+            self.queue.put_nowait(event)
+        except asyncio.QueueFull:
+            # A slow client misses deltas; tell it to reload instead.
+            self.overflowed = True
+
+    async def get(self, timeout=None):
+        """Return the next ``(event, data)`` pair, or None on timeout."""
+        try:
+            event = await asyncio.wait_for(self.queue.get(), timeout)
+        except asyncio.TimeoutError:
+            return None
+        if self.overflowed:
+            self.overflowed = False
+            return 'resync', {}
+        return event
+
+    def close(self):
+        self.broker.unsubscribe(self)
+
+
+class Broker:
+    """Fan-out of published events to the subscriptions of each topic."""
+
+    def __init__(self):
+        self._lock = threading.Lock()
+        self._subscriptions = {}
+        self._relay = None
+
+    def subscribe(self, topics):
+        """Register a subscription; must be called from the event loop."""
+        if shared():
+            self._start_relay()
+        subscription = Subscription(self, topics)
+        with self._lock:
+            for topic in subscription.topics:
+                self._subscriptions.setdefault(topic, set()).add(subscription)
+        return subscription
+
+    def unsubscribe(self, subscription):
+        with self._lock:
+            for topic in subscription.topics:
+                subscribers = self._subscriptions.get(topic)
+                if subscribers is not None:
+                    subscribers.discard(subscription)
+                    if not subscribers:
+                        del self._subscriptions[topic]
+
+    def has_subscribers(self, *topics):
+        # Listeners in other workers are not visible from here.
+        if shared():
+            return True
+        with self._lock:
+            return any(topic in self._subscriptions for topic in topics)
+
+    def publish(self, topic, event, data):
+        """Deliver an event to every subscriber of ``topic``; thread-safe."""
+        with self._lock:
+            subscribers = list(self._subscriptions.get(topic, ()))
+        self._deliver(subscribers, (event, data))
+
+    def resync(self):
+        """Tell every subscriber to reload, after events may have been lost."""
+        with self._lock:
+            subscribers = {s for group in self._subscriptions.values() for s in group}
+        self._deliver(subscribers, ('resync', {}))
+
+    def _deliver(self, subscribers, event):
+        for subscription in subscribers:
+            try:
+                subscription.loop.call_soon_threadsafe(subscription._deliver, event)
+            except RuntimeError:
+                # The client's event loop has already shut down.
+                self.unsubscribe(subscription)
+
+    def _start_relay(self):
+        with self._lock:
+            if self._relay is None:
+                self._relay = Relay(self)
+                self._relay.start()
+
+
+class Relay(threading.Thread):
+    """Feeds the notifications of ``CHANNEL`` to the local broker."""
+
+    def __init__(self, broker):
+        super().__init__(name='event-relay', daemon=True)
+        self.broker = broker
+        self.listening = False
+
+    def run(self):
+        while True:
+            try:
+                self.listen()
+            except Exception:
+                logger.exception('Event relay lost its connection; reconnecting')
+            if self.listening:
+                # Events sent while reconnecting are gone.
+                self.listening = False
+                self.broker.resync()
+            time.sleep(RELAY_RETRY_SECONDS)
+
+    def listen(self):
+        # A connection of its own, held open for the life of the process;
+        # poll() and notifies are psycopg2's notification API.
+        wrapper = connections.create_connection(DEFAULT_DB_ALIAS)
+        try:
+            wrapper.ensure_connection()
+            wrapper.set_autocommit(True)
+            with wrapper.cursor() as cursor:
+                cursor.execute(f'LISTEN {CHANNEL}')
+            self.listening = True
+            raw = wrapper.connection
+            while True:
+                if select.select([raw], [], [], RELAY_POLL_SECONDS) == ([], [], []):
+                    continue
+                raw.poll()
+                while raw.notifies:
+                    message = json.loads(raw.notifies.pop(0).payload)
+                    for topic in message['topics']:
+                        self.broker.publish(topic, message['event'], message['data'])
+        finally:
+            wrapper.close()
+
+
+broker = Broker()
+
+
+def publish_on_commit(topics, event, data):
+    """Publish ``event`` to each topic once the current transaction commits."""
+    def send():
+        if shared():
+            payload = json.dumps({'topics': list(topics), 'event': event, 'data': data})
+            with connections[DEFAULT_DB_ALIAS].cursor() as cursor:
+                cursor.execute('SELECT pg_notify(%s, %s)', [CHANNEL, payload])
+            return
+        for topic in topics:
+            broker.publish(topic, event, data)
+    transaction.on_commit(send)
+
+
+def format_event(event, data):
+    """Encode one event in the ``text/event-stream`` wire format."""
+    return f'event: {event}\ndata: {json.dumps(data, separators=(",", ":"))}\n\n'
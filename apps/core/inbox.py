@@ -0,0 +1,150 @@
+"""
+Per-user work inbox.
+
+A user's open work is spread over four tables: remediations assigned to
+them, audits they have not started, audits with responses still pending
+review, and (for administrators) reports awaiting approval. The inbox
+selects all of them with a single UNION query, and caches the item count
+shown in the sidebar badge in the user's organization cache namespace.
+
+Changes to work items expire those counts through ``expire``. Inside a
+request (``InboxMiddleware``) every organization is expired at most once,
+when the response is ready; elsewhere the expiry waits for the surrounding
+transaction to commit.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from asgiref.sync import sync_to_async
+from django.core.cache import cache
+from django.db import transaction
+from django.db.models import CharField, Count, F, IntegerField, Q, Value
+from . import tenancy
+from .middleware import HybridMiddleware
+
+INBOX_COUNT_TIMEOUT = 300
+
+_pending = ContextVar('inbox_pending', default=None)
+
+COLUMNS = ['kind', 'object_id', 'label', 'state', 'pending', 'changed_at']
+
+
+def _columns(queryset, kind, pending=None):
+    return queryset.annotate(
+        kind=Value(kind, output_field=CharField()),
+        object_id=F('pk'),
+        label=F('title'),
+        state=F('status'),
+        pending=pending if pending is not None else Value(0, output_field=IntegerField()),
+        changed_at=F('updated_at'),
+    ).values(*COLUMNS)
+
+
+def inbox_queryset(user):
+    """Return a UNION queryset of the user's open work items, newest first."""
+    from apps.audits.models import Audit
+    from apps.compliance.models import Remediation
+    from apps.reports.models import ComplianceReport
+
+    remediations = _columns(
+        Remediation.objects.filter(assigned_to=user, status__in=['open', 'in_progress']),
+        'remediation',
+    )
+    audits = _columns(
+        Audit.objects.filter(auditor=user, status__in=['pending', 'on_hold']),
+        'audit',
+    )
+    reviews = _columns(
+        Audit.objects.filter(auditor=user, status='in_progress'),
+        'review',
+        pending=Count('responses', filter=Q(responses__status='pending')),
+    ).filter(pending__gt=0)
+    branches = [remediations, audits, reviews]
+
+    if user.is_admin_user:
+        branches.append(_columns(
+            ComplianceReport.objects.filter(status='generated'),
+            'report',
+        ))
+
+    first, *rest = [branch.order_by() for branch in branches]
+    return first.union(*rest, all=True).order_by('-changed_at')
+
+
+def _count_key(user):
+    organization_id = tenancy.organization_for(user)
+    version = tenancy.get_or_set_version(organization_id, 'inbox')
+    return tenancy.cache_key(organization_id, 'inbox', 'count', version, user.pk)
+
+
+def inbox_count(user):
+    """Return the number of open work items, cached per user."""
+    key = _count_key(user)
+    count = cache.get(key)
+    if count is None:
+        count = inbox_queryset(user).count()
+        cache.set(key, count, INBOX_COUNT_TIMEOUT)
+    return count
+
+
+def invalidate(organization_id=None):
+    """
+    Expire the cached inbox counts of one organization's users, or of every
+    organization when ``organization_id`` is None. Cross-tenant (superuser)
+    counts live in the global namespace and are always expired.
+    """
+    if organization_id is None:
+        namespaces = tenancy.organization_ids()
+    else:
+        namespaces = [None, organization_id]
+    for namespace in namespaces:
+        tenancy.bump_version(namespace, 'inbox')
+
+
+def expire(organization_id):
+    """Expire an organization's inbox counts once its changes are committed."""
+    pending = _pending.get()
+    if pending is not None:
+        pending.add(organization_id)
+    else:
+        transaction.on_commit(lambda: invalidate(organization_id))
+
+
+def _expire_all(pending):
+    if None in pending:
+        pending = {None}
+    for organization_id in pending:
+        transaction.on_commit(lambda organization_id=organization_id: invalidate(organization_id))
+
+
+@contextmanager
+def deferred_expiry():
+    """Collect ``expire`` calls made in the block and apply each one once."""
+    if _pending.get() is not None:
+        yield
+        return
+    pending = set()
+    token = _pending.set(pending)
+    try:
+        yield
+    finally:
+        _pending.reset(token)
+        _expire_all(pending)
+
+
+class InboxMiddleware(HybridMiddleware):
+    """Expire inbox counts once per request, however many items it saved."""
+
+    def handle(self, request):
+        with deferred_expiry():
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        pending = set()
+        token = _pending.set(pending)
+        try:
+            return await self.get_response(request)
+        finally:
+            _pending.reset(token)
+            if pending:
+                await sync_to_async(_expire_all)(pending)
@@ -0,0 +1,225 @@
+"""
+Per-request performance instrumentation.
+
+``RequestMetricsMiddleware`` measures, for every request, the number and
+duration of SQL queries, the time spent rendering templates and the cache
+hit/miss counts, and reports them in a ``Server-Timing`` header that shows
+up in the browser's network panel. Queries repeated with the same SQL
+shape (the statement text, whose parameters are passed separately) are
+logged as likely N+1 patterns together with the template line or view
+code that issued them.
+
+Enabled by ``REQUEST_METRICS_ENABLED``; when off the middleware removes
+itself at startup. Query timing uses the database wrapper hook and the
+origin of a repeated query is only looked up once per shape, so the
+overhead stays small enough for staging.
+
+The hooks are installed once per connection and read the collection from a
+context variable, so queries are counted in whichever thread runs the view,
+under WSGI and ASGI alike.
+"""
+import logging
+import os
+import sys
+import time
+from collections import Counter
+from contextlib import contextmanager
+from contextvars import ContextVar
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.core.signals import request_started
+from django.db import connections
+from django.db.backends.signals import connection_created
+
+from .middleware import HybridMiddleware
+
+logger = logging.getLogger(__name__)
+
+_current = ContextVar('request_metrics', default=None)
+_MISSING = object()
+_installed = False
+
+
+class RequestMetrics:
+    """Counters collected while one request is handled."""
+
+    def __init__(self):
+        self.started = time.perf_counter()
+        self.sql_count = 0
+        self.sql_time = 0.0
+        self.template_time = 0.0
+        self.template_depth = 0
+        self.cache_hits = 0
+        self.cache_misses = 0
+        self.shapes = Counter()
+        self.origins = {}
+
+    def server_timing(self):
+        total = (time.perf_counter() - self.started) * 1000
+        return ', '.join([
+            f'sql;desc="{self.sql_count} queries";dur={self.sql_time * 1000:.1f}',
+            f'tpl;desc="Templates";dur={self.template_time * 1000:.1f}',
+            f'cache;desc="{self.cache_hits} hits, {self.cache_misses} misses"',
+            f'total;dur={total:.1f}',
+        ])
+
+    def repeated_queries(self, threshold):
+        return [
+            (sql, count, self.origins.get(sql))
+            for sql, count in self.shapes.most_common()
+            if count >= threshold
+        ]
+
+
+def _origin():
+    """Describe the template line, or failing that the project code, running now."""
+    base_dir = str(settings.BASE_DIR)
+    code_frame = None
+    frame = sys._getframe(2)
+    while frame is not None:
+        if frame.f_code.co_name == 'render_annotated' and 'self' in frame.f_locals:
+            node = frame.f_locals['self']
+            origin = getattr(node, 'origin', None)
+            token = getattr(node, 'token', None)
+            if origin is not None and token is not None:
+                return f'{origin.template_name} line {token.lineno}'
+        filename = frame.f_code.co_filename
+        if (code_frame is None and filename.startswith(base_dir)
+                and f'{os.sep}site-packages{os.sep}' not in filename
+                and not filename.endswith('instrumentation.py')):
+            code_frame = frame
+        frame = frame.f_back
+    if code_frame is not None:
+        filename = os.path.relpath(code_frame.f_code.co_filename, base_dir)
+        return f'{filename}:{code_frame.f_lineno} in {code_frame.f_code.co_name}'
+    return None
+
+
+def _record_query(execute, sql, params, many, context):
+    metrics = _current.get()
+    if metrics is None:
+        return execute(sql, params, many, context)
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        metrics.sql_time += time.perf_counter() - started
+        metrics.sql_count += 1
+        metrics.shapes[sql] += 1
+        if metrics.shapes[sql] == 2:
+            metrics.origins[sql] = _origin()
+
+
+def install_query_wrapper(wrapper):
+    """Run ``wrapper`` around the queries of every database connection."""
+    def add(connection, **kwargs):
+        if wrapper not in connection.execute_wrappers:
+            connection.execute_wrappers.append(wrapper)
+
+    def add_to_open(**kwargs):
+        # Connections opened before the wrapper was installed; request_started
+        # runs in the thread that will run the view.
+        for connection in connections.all(initialized_only=True):
+            add(connection)
+
+    uid = f'{wrapper.__module__}.{wrapper.__qualname__}'
+    connection_created.connect(add, weak=False, dispatch_uid=uid)
+    request_started.connect(add_to_open, weak=False, dispatch_uid=uid)
+    add_to_open()
+
+
+def _install():
+    """Wrap queries, template rendering and cache reads; done once per process."""
+    global _installed
+    if _installed:
+        return
+    _installed = True
+
+    install_query_wrapper(_record_query)
+
+    from django.core.cache import caches
+    from django.template.base import Template
+
+    render = Template.render
+
+    def timed_render(self, context):
+        metrics = _current.get()
+        if metrics is None:
+            return render(self, context)
+        # Included templates are counted as part of the outermost render.
+        metrics.template_depth += 1
+        started = time.perf_counter()
+        try:
+            return render(self, context)
+        finally:
+            metrics.template_depth -= 1
+            if metrics.template_depth == 0:
+                metrics.template_time += time.perf_counter() - started
+
+    Template.render = timed_render
+
+    for cache_class in {type(caches[alias]) for alias in settings.CACHES}:
+        get = cache_class.get
+
+        def counted_get(self, key, default=None, version=None, _get=get):
+            value = _get(self, key, _MISSING, version=version)
+            metrics = _current.get()
+            if metrics is not None:
+                if value is _MISSING:
+                    metrics.cache_misses += 1
+                else:
+                    metrics.cache_hits += 1
+            return default if value is _MISSING else value
+
+        cache_class.get = counted_get
+
+
+@contextmanager
+def collect():
+    """
+    Count queries, template time and cache reads inside the block and yield
+    the ``RequestMetrics``. Nested blocks share the outermost collection, so
+    several middlewares can read the same counters.
+    """
+    metrics = _current.get()
+    if metrics is not None:
+        yield metrics
+        return
+    _install()
+    metrics = RequestMetrics()
+    token = _current.set(metrics)
+    try:
+        yield metrics
+    finally:
+        _current.reset(token)
+
+
+class RequestMetricsMiddleware(HybridMiddleware):
+    """Add a ``Server-Timing`` header and log repeated query shapes."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'REQUEST_METRICS_ENABLED', False):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.threshold = getattr(settings, 'REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', 5)
+        _install()
+
+    def handle(self, request):
+        with collect() as metrics:
+            response = self.get_response(request)
+        return self.report(request, response, metrics)
+
+    async def ahandle(self, request):
+        with collect() as metrics:
+            response = await self.get_response(request)
+        return self.report(request, response, metrics)
+
+    def report(self, request, response, metrics):
+        response['Server-Timing'] = metrics.server_timing()
+        for sql, count, origin in metrics.repeated_queries(self.threshold):
+            logger.warning(
+                'Possible N+1 on %s: %d identical queries from %s: %s',
+                request.path, count, origin or 'unknown origin', sql[:300],
+            )
+        return response
@@ -0,0 +1,234 @@
+"""
+Scripted load scenarios replaying role workflows over HTTP.
+
+Virtual users log in through the login form and loop over the workflow
+of their role against a running server (``runserver`` or gunicorn):
+
+* auditor: open an assigned audit in ``audit_execute``, save its
+  responses in batches and complete it;
+* developer: browse applications and remediations;
+* admin: generate a report for a completed audit and approve it.
+
+Every request is recorded under a step name; ``Stats.summary`` reports
+throughput, error rate and latency percentiles per step. Only the
+standard library is used, so the scenarios run wherever the project does.
+"""
+import math
+import random
+import re
+import threading
+import time
+from collections import defaultdict
+from http.cookiejar import CookieJar
+from urllib.error import HTTPError, URLError
+from urllib.parse import urlencode, urljoin
+from urllib.request import HTTPCookieProcessor, Request, build_opener
+
+RESPONSE_STATUSES = ['compliant', 'non_compliant', 'partially_compliant', 'not_applicable']
+
+
+class StepFailed(Exception):
+    """A step returned an error status or an unexpected page."""
+
+
+class Stats:
+    """Thread-safe latency and error counters per step."""
+
+    def __init__(self):
+        self.lock = threading.Lock()
+        self.timings = defaultdict(list)
+        self.errors = defaultdict(int)
+        self.started = time.perf_counter()
+
+    def record(self, step, elapsed, ok):
+        with self.lock:
+            self.timings[step].append(elapsed)
+            if not ok:
+                self.errors[step] += 1
+
+    def summary(self):
+        elapsed = time.perf_counter() - self.started
+        rows = {}
+        with self.lock:
+            for step, timings in sorted(self.timings.items()):
+                timings = sorted(timings)
+                rows[step] = {
+                    'requests': len(timings),
+                    'errors': self.errors[step],
+                    'error_rate': round(self.errors[step] / len(timings), 4),
+                    'rps': round(len(timings) / elapsed, 2),
+                    'p50_ms': round(_percentile(timings, 50) * 1000, 1),
+                    'p95_ms': round(_percentile(timings, 95) * 1000, 1),
+                    'p99_ms': round(_percentile(timings, 99) * 1000, 1),
+                }
+        return {'duration_s': round(elapsed, 1), 'steps': rows}
+
+
+def _percentile(samples, pct):
+    return samples[max(0, math.ceil(pct / 100 * len(samples)) - 1)]
+
+
+class Session:
+    """A browser-like client: keeps cookies and sends the CSRF token."""
+
+    def __init__(self, base_url, stats, timeout=30):
+        self.base_url = base_url.rstrip('/') + '/'
+        self.stats = stats
+        self.timeout = timeout
+        self.cookies = CookieJar()
+        self.opener = build_opener(HTTPCookieProcessor(self.cookies))
+
+    def csrf_token(self):
+        return next((c.value for c in self.cookies if c.name == 'csrftoken'), '')
+
+    def request(self, step, path, data=None):
+        """Issue one request, following redirects; returns ``(final url, body)``."""
+        url = urljoin(self.base_url, path.lstrip('/'))
+        headers = {'Referer': url}
+        body = None
+        if data is not None:
+            data = dict(data, csrfmiddlewaretoken=self.csrf_token())
+            body = urlencode(data, doseq=True).encode()
+            headers['X-CSRFToken'] = data['csrfmiddlewaretoken']
+        started = time.perf_counter()
+        ok = False
+        try:
+            with self.opener.open(Request(url, body, headers), timeout=self.timeout) as response:
+                content = response.read().decode('utf-8', 'replace')
+                final_url = response.geturl()
+            ok = True
+            return final_url, content
+        except HTTPError as exc:
+            raise StepFailed(f'{step}: HTTP {exc.code}')
+        except (URLError, OSError) as exc:
+            raise StepFailed(f'{step}: {exc}')
+        finally:
+            self.stats.record(step, time.perf_counter() - started, ok)
+
+    def get(self, step, path):
+        return self.request(step, path)
+
+    def post(self, step, path, data):
+        return self.request(step, path, data)
+
+    def login(self, username, password):
+        self.get('login page', '/users/login/')
+        final_url, _ = self.post('login', '/users/login/', {'username': username, 'password': password})
+        if '/users/login/' in final_url:
+            raise StepFailed(f'login: rejected credentials for {username}')
+
+
+def _ids(pattern, html):
+    return sorted({int(match) for match in re.findall(pattern, html)})
+
+
+def auditor_workflow(session, rng, batch_size=10):
+    _, html = session.get('audit list', '/audits/')
+    audits = _ids(r'/audits/(\d+)/execute/', html)
+    if not audits:
+        return
+    audit = rng.choice(audits)
+    path = f'/audits/{audit}/execute/'
+    _, html = session.get('audit execute', path)
+    responses = _ids(r'name="status_(\d+)"', html)
+    for start in range(0, len(responses), batch_size):
+        batch = {}
+        for response in responses[start:start + batch_size]:
+            batch[f'status_{response}'] = rng.choice(RESPONSE_STATUSES)
+            batch[f'findings_{response}'] = 'Reviewed during load test.'
+            batch[f'recommendations_{response}'] = ''
+        session.post('save responses', path, batch)
+    session.post('complete audit', path, {'complete': '1'})
+
+
+def developer_workflow(session, rng):
+    _, html = session.get('application list', '/compliance/applications/')
+    applications = _ids(r'/compliance/applications/(\d+)/"', html)
+    if applications:
+        session.get('application detail', f'/compliance/applications/{rng.choice(applications)}/')
+    _, html = session.get('remediation list', '/compliance/remediations/')
+    remediations = _ids(r'/compliance/remediations/(\d+)/"', html)
+    if remediations:
+        session.get('remediation detail', f'/compliance/remediations/{rng.choice(remediations)}/')
+
+
+def admin_workflow(session, rng):
+    _, html = session.get('audit list', '/audits/')
+    open_audits = set(_ids(r'/audits/(\d+)/execute/', html))
+    completed = [pk for pk in _ids(r'/audits/(\d+)/"', html) if pk not in open_audits]
+    if not completed:
+        return
+    audit = rng.choice(completed)
+    session.get('audit detail', f'/audits/{audit}/')
+    final_url, _ = session.post('generate report', f'/reports/generate/{audit}/', {})
+    report = re.search(r'/reports/(\d+)/$', final_url)
+    if report is None:
+        raise StepFailed(f'generate report: ended on {final_url}')
+    session.get('approve report', f'/reports/{report.group(1)}/approve/')
+
+
+WORKFLOWS = {
+    'auditor': auditor_workflow,
+    'developer': developer_workflow,
+    'admin': admin_workflow,
+}
+
+
+class VirtualUser(threading.Thread):
+    """Logs in once, then loops over its role's workflow until stopped."""
+
+    def __init__(self, base_url, role, username, password, stats, stop, wait, seed, errors):
+        super().__init__(daemon=True)
+        self.session = Session(base_url, stats)
+        self.role, self.username, self.password = role, username, password
+        self.stop, self.wait, self.errors = stop, wait, errors
+        self.rng = random.Random(seed)
+
+    def run(self):
+        try:
+            self.session.login(self.username, self.password)
+        except StepFailed as exc:
+            self.errors.append(str(exc))
+            return
+        while not self.stop.is_set():
+            try:
+                WORKFLOWS[self.role](self.session, self.rng)
+            except StepFailed as exc:
+                self.errors.append(str(exc))
+            self.stop.wait(self.rng.uniform(*self.wait))
+
+
+def run(base_url, accounts, mix, users, duration, password, wait=(0.5, 2.0), spawn_rate=5.0, seed=0):
+    """
+    Run ``users`` virtual users split across roles by the ``mix`` weights
+    for ``duration`` seconds. ``accounts`` maps each role to usernames.
+    Returns ``(summary, error messages)``.
+    """
+    rng = random.Random(seed)
+    roles = [role for role, weight in mix.items() if weight > 0]
+    if not roles:
+        raise ValueError('The user mix has no roles with a positive weight.')
+    total = sum(mix[role] for role in roles)
+    assigned = []
+    for role in roles:
+        assigned += [role] * round(users * mix[role] / total)
+    assigned = (assigned + rng.choices(roles, [mix[r] for r in roles], k=users))[:users]
+    for role in set(assigned):
+        if not accounts.get(role):
+            raise ValueError(f'No {role} accounts to log in with.')
+
+    stats, stop, errors = Stats(), threading.Event(), []
+    threads = []
+    used = defaultdict(int)
+    for index, role in enumerate(assigned):
+        username = accounts[role][used[role] % len(accounts[role])]
+        used[role] += 1
+        thread = VirtualUser(base_url, role, username, password, stats, stop, wait, seed + index, errors)
+        thread.start()
+        threads.append(thread)
+        time.sleep(1 / spawn_rate)
+    stop.wait(max(0, duration - len(threads) / spawn_rate))
+    stop.set()
+    for thread in threads:
+        thread.join()
+    return stats.summary(), errors
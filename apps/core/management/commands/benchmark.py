@@ -0,0 +1,270 @@
+"""
+Management command to benchmark the main views.
+Run with: python manage.py benchmark [--apps N] [--iterations N] [--output FILE]
+          python manage.py benchmark --compare BASELINE.json CURRENT.json
+
+Builds a synthetic dataset in a throwaway SQLite test database, requests
+each view through the test client and reports latency percentiles and
+query counts as JSON. Every dashboard widget is measured on its own, with
+its cached fragment dropped before each request. ``--compare`` flags views whose p95 latency grew by
+more than ``--threshold`` or whose query count grew at all.
+"""
+import json
+import math
+import platform
+import statistics
+import time
+from itertools import cycle
+
+import django
+from django.core.cache import cache
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+from django.test import Client, override_settings
+from django.test.utils import CaptureQueriesContext
+from django.urls import reverse
+from django.utils import timezone
+
+from apps.core import dataset, tenancy
+from apps.core.views import DASHBOARD_WIDGETS
+
+VIEWS = [
+    'dashboard',
+    *[f'widget_{name}' for name in DASHBOARD_WIDGETS],
+    'application_list',
+    'audit_list',
+    'audit_detail',
+    'audit_execute',
+    'audit_execute_post',
+    'remediation_list',
+    'report_generate',
+    'report_export_pdf',
+]
+PERCENTILES = (50, 90, 95, 99)
+
+
+def percentile(samples, pct):
+    """Nearest-rank percentile of a sorted list."""
+    if not samples:
+        return None
+    index = max(0, math.ceil(pct / 100 * len(samples)) - 1)
+    return samples[index]
+
+
+def summarize(timings, queries):
+    timings = sorted(timings)
+    summary = {f'p{pct}_ms': round(percentile(timings, pct) * 1000, 3) for pct in PERCENTILES}
+    summary.update({
+        'mean_ms': round(statistics.fmean(timings) * 1000, 3),
+        'min_ms': round(timings[0] * 1000, 3),
+        'max_ms': round(timings[-1] * 1000, 3),
+        'queries': max(queries),
+        'samples': len(timings),
+    })
+    return summary
+
+
+def compare(baseline, current, threshold):
+    """Return ``(rows, regressions)`` comparing two benchmark results."""
+    rows, regressions = [], []
+    for name, after in current['views'].items():
+        before = baseline['views'].get(name)
+        if before is None:
+            rows.append((name, None, after['p95_ms'], None, after['queries'], 'new'))
+            continue
+        change = (after['p95_ms'] - before['p95_ms']) / before['p95_ms'] if before['p95_ms'] else 0
+        flags = []
+        if change > threshold:
+            flags.append(f'p95 +{change:.0%}')
+        if after['queries'] > before['queries']:
+            flags.append(f"queries {before['queries']} -> {after['queries']}")
+        if flags:
+            regressions.append(name)
+        rows.append((
+            name, before['p95_ms'], after['p95_ms'], before['queries'], after['queries'],
+            ', '.join(flags) or 'ok',
+        ))
+    return rows, regressions
+
+
+class Command(BaseCommand):
+    help = 'Measure latency percentiles and query counts of the main views'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apps', type=int, default=50, help='Applications to create')
+        parser.add_argument('--audits-per-app', type=int, default=3, help='Audits per application')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed for the dataset')
+        parser.add_argument('--iterations', type=int, default=20, help='Timed requests per view')
+        parser.add_argument('--warmup', type=int, default=2, help='Untimed requests per view')
+        parser.add_argument(
+            '--view',
+            action='append',
+            dest='views',
+            choices=VIEWS,
+            help='Only benchmark the named view (may be repeated)',
+        )
+        parser.add_argument('--output', help='Write the JSON results to this file')
+        parser.add_argument(
+            '--compare',
+            nargs='+',
+            metavar='FILE',
+            help='Compare BASELINE against CURRENT (or against a fresh run when only one file is given)',
+        )
+        parser.add_argument(
+            '--threshold',
+            type=float,
+            default=0.10,
+            help='Relative p95 increase counted as a regression (default 0.10)',
+        )
+
+    def handle(self, *args, **options):
+        compare_files = options['compare'] or []
+        if len(compare_files) > 2:
+            raise CommandError('--compare takes a baseline and optionally a current result file.')
+        if len(compare_files) == 2:
+            self.report(self.load(compare_files[0]), self.load(compare_files[1]), options['threshold'])
+            return
+
+        if connection.vendor != 'sqlite':
+            raise CommandError('Benchmarks run against a SQLite test database; set USE_SQLITE=True.')
+
+        result = self.run(options)
+        output = json.dumps(result, indent=2)
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                fh.write(output + '\n')
+            self.stdout.write(f"Results written to {options['output']}")
+        elif not compare_files:
+            self.stdout.write(output)
+
+        if compare_files:
+            self.report(self.load(compare_files[0]), result, options['threshold'])
+
+    def load(self, path):
+        try:
+            with open(path) as fh:
+                return json.load(fh)
+        except (OSError, ValueError) as exc:
+            raise CommandError(f'Cannot read {path}: {exc}')
+
+    def report(self, baseline, current, threshold):
+        rows, regressions = compare(baseline, current, threshold)
+        if baseline['meta'].get('dataset') != current['meta'].get('dataset'):
+            self.stdout.write(self.style.WARNING('The two runs used different datasets.'))
+        self.stdout.write(f"{'view':<22}{'p95 before':>12}{'p95 after':>12}{'queries':>12}  status")
+        for name, before, after, q_before, q_after, status in rows:
+            before = '-' if before is None else f'{before:.1f}'
+            queries = f'{q_after}' if q_before is None else f'{q_before}->{q_after}'
+            self.stdout.write(f'{name:<22}{before:>12}{after:>12.1f}{queries:>12}  {status}')
+        if regressions:
+            raise CommandError(f"Regressions in: {', '.join(regressions)}")
+        self.stdout.write(self.style.SUCCESS('No regressions.'))
+
+    def run(self, options):
+        # Measure what production runs: no debug mode, no per-request metrics.
+        with dataset.test_database(), override_settings(REQUEST_METRICS_ENABLED=False):
+            started = time.perf_counter()
+            counts = dataset.build(
+                applications=options['apps'],
+                audits_per_app=options['audits_per_app'],
+                seed=options['seed'],
+                progress=lambda message: self.stdout.write(f'  {message}'),
+            )
+            self.stdout.write(f'Dataset built in {time.perf_counter() - started:.1f}s')
+            views = {}
+            for name, requests in self.requests(options).items():
+                timings, queries = self.measure(requests, options['warmup'], options['iterations'])
+                views[name] = summarize(timings, queries)
+                self.stdout.write(
+                    f"  {name:<22} p50 {views[name]['p50_ms']:>8.1f}ms  "
+                    f"p95 {views[name]['p95_ms']:>8.1f}ms  {views[name]['queries']} queries"
+                )
+        return {
+            'meta': {
+                'created_at': timezone.now().isoformat(),
+                'django': django.get_version(),
+                'python': platform.python_version(),
+                'database': connection.vendor,
+                'iterations': options['iterations'],
+                'warmup': options['warmup'],
+                'seed': options['seed'],
+                'dataset': counts,
+            },
+            'views': views,
+        }
+
+    def requests(self, options):
+        """Map each view to a callable issuing one request with the test client."""
+        from apps.audits.models import Audit
+        from apps.users.models import User
+
+        admin = User.objects.get(username='bench_admin0')
+        client = Client()
+        client.force_login(admin)
+        completed = list(Audit.objects.filter(status='completed').values_list('pk', flat=True))
+        in_progress = list(Audit.objects.filter(status='in_progress').values_list('pk', flat=True))
+        if not completed or not in_progress:
+            raise CommandError('The dataset is too small; raise --apps or --audits-per-app.')
+
+        execute_audit = Audit.objects.get(pk=in_progress[0])
+        execute_data = {
+            f'{field}_{response.pk}': value
+            for response in execute_audit.responses.all()
+            for field, value in (
+                ('status', response.status if response.status != 'pending' else 'compliant'),
+                ('findings', response.findings or 'Benchmark finding.'),
+                ('recommendations', response.recommendations),
+            )
+        }
+        # Report generation is deduplicated per audit, so each request
+        # uses the next completed audit; the first one backs the export.
+        generate_audits = cycle(completed[1:] or completed)
+        client.post(reverse('report_generate', args=[completed[0]]))
+        report = Audit.objects.get(pk=completed[0]).reports.get()
+
+        def widget(name):
+            key = tenancy.cache_key(tenancy.organization_for(admin), 'dashboard', name, admin.pk)
+
+            def request():
+                cache.delete(key)
+                return client.get(reverse('dashboard_widget', args=[name]))
+            return request
+
+        requests = {
+            'dashboard': lambda: client.get(reverse('dashboard')),
+            **{f'widget_{name}': widget(name) for name in DASHBOARD_WIDGETS},
+            'application_list': lambda: client.get(reverse('application_list')),
+            'audit_list': lambda: client.get(reverse('audit_list')),
+            'audit_detail': lambda: client.get(reverse('audit_detail', args=[completed[0]])),
+            'audit_execute': lambda: client.get(reverse('audit_execute', args=[execute_audit.pk])),
+            'audit_execute_post': lambda: client.post(
+                reverse('audit_execute', args=[execute_audit.pk]), execute_data
+            ),
+            'remediation_list': lambda: client.get(reverse('remediation_list')),
+            'report_generate': lambda: client.post(
+                reverse('report_generate', args=[next(generate_audits)])
+            ),
+            'report_export_pdf': lambda: client.get(reverse('report_export_pdf', args=[report.pk])),
+        }
+        selected = options['views'] or VIEWS
+        return {name: requests[name] for name in VIEWS if name in selected}
+
+    def measure(self, request, warmup, iterations):
+        for _ in range(warmup):
+            self.consume(request())
+        timings, queries = [], []
+        for _ in range(iterations):
+            with CaptureQueriesContext(connection) as captured:
+                started = time.perf_counter()
+                self.consume(request())
+                timings.append(time.perf_counter() - started)
+            queries.append(len(captured))
+        return timings, queries
+
+    def consume(self, response):
+        if response.status_code >= 400:
+            raise CommandError(f'{response.request["PATH_INFO"]} returned {response.status_code}')
+        if response.streaming:
+            for _ in response.streaming_content:
+                pass
+        return response
@@ -0,0 +1,107 @@
+"""
+Management command to prepare a container before the web server starts.
+Run with: python manage.py boot [--sample-data] [--skip-static] [--dry-run]
+
+Replaces ``migrate && load_checklist && load_sample_data && collectstatic``
+with checks that skip every step whose inputs are unchanged; see
+``apps.core.boot``.
+"""
+import io
+import time
+from concurrent.futures import ThreadPoolExecutor
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand
+
+from apps.audits.packs import apply_pack, read_pack
+from apps.core import boot
+
+
+class Command(BaseCommand):
+    help = 'Run only the start-up steps whose inputs changed'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--sample-data',
+            action='store_true',
+            help='Also load the demo data when load_sample_data changed',
+        )
+        parser.add_argument(
+            '--skip-static',
+            action='store_true',
+            help='Do not check or collect static files',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only report which steps would run',
+        )
+
+    def handle(self, *args, **options):
+        started = time.perf_counter()
+        with ThreadPoolExecutor(max_workers=1) as pool:
+            static = None if options['skip_static'] else pool.submit(self.static, options['dry_run'])
+            self.database(options['sample_data'], options['dry_run'])
+            if static is not None:
+                static.result()
+        self.stdout.write(self.style.SUCCESS(f'Boot finished in {time.perf_counter() - started:.1f}s'))
+
+    def step(self, name, message):
+        self.stdout.write(f'  {name}: {message}')
+
+    def database_work(self, sample_data):
+        """Describe the pending database steps, or return an empty list."""
+        migrations = boot.pending_migrations()
+        if migrations:
+            return [f'{len(migrations)} migration(s) to apply']
+        work = [f'pack {path.name} changed' for path in boot.changed_packs()]
+        if sample_data and boot.step_changed('sample_data', boot.sample_data_fingerprint()):
+            work.append('sample data changed')
+        return work
+
+    def database(self, sample_data, dry_run):
+        work = self.database_work(sample_data)
+        if not work:
+            self.step('database', 'up to date')
+            return
+        if dry_run:
+            self.step('database', '; '.join(work))
+            return
+
+        with boot.advisory_lock():
+            # Another replica may have done the work while we waited.
+            started = time.perf_counter()
+            plan = boot.pending_migrations()
+            if plan:
+                call_command('migrate', interactive=False, verbosity=0)
+                self.step('migrate', f'applied {len(plan)} migration(s) in {time.perf_counter() - started:.1f}s')
+            else:
+                self.step('migrate', 'up to date')
+
+            changed = boot.changed_packs()
+            for path in changed:
+                result = apply_pack(read_pack(path))
+                self.step('checklist', f'applied {result.name} {result.version}')
+            if not changed:
+                self.step('checklist', 'up to date')
+
+            if sample_data:
+                fingerprint = boot.sample_data_fingerprint()
+                if boot.step_changed('sample_data', fingerprint):
+                    call_command('load_sample_data', stdout=io.StringIO())
+                    boot.record_step('sample_data', fingerprint)
+                    self.step('sample data', 'loaded')
+                else:
+                    self.step('sample data', 'up to date')
+
+    def static(self, dry_run):
+        started = time.perf_counter()
+        fingerprint = boot.static_fingerprint()
+        if not boot.static_changed(fingerprint):
+            self.step('static', 'up to date')
+        elif dry_run:
+            self.step('static', 'sources changed')
+        else:
+            call_command('collectstatic', interactive=False, verbosity=0)
+            boot.record_static(fingerprint)
+            self.step('static', f'collected in {time.perf_counter() - started:.1f}s')
@@ -0,0 +1,61 @@
+"""
+Management command to check the query plans of the hot queries.
+Run with: python manage.py check_query_plans [--current] [--output FILE]
+
+Fails when a hot query falls back to a full table scan; see
+``apps.core.query_plans``.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+from django.db import connection
+
+from apps.core import dataset, query_plans
+
+
+class Command(BaseCommand):
+    help = 'Explain the hot queries on SQLite and fail on full table scans'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--current',
+            action='store_true',
+            help='Explain against the configured database instead of a generated one',
+        )
+        parser.add_argument('--apps', type=int, default=20, help='Applications in the generated dataset')
+        parser.add_argument('--output', help='Write the captured plans as JSON to this file')
+
+    def handle(self, *args, **options):
+        if connection.vendor != 'sqlite':
+            raise CommandError('Query plans are checked on SQLite; set USE_SQLITE=True.')
+
+        if options['current']:
+            results = self.explain_plans()
+        else:
+            with dataset.test_database():
+                dataset.build(applications=options['apps'], audits_per_app=3)
+                results = self.explain_plans()
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump({query.name: plan for query, plan, _ in results}, fh, indent=2)
+                fh.write('\n')
+
+        regressions = [(query, scans) for query, _, scans in results if scans]
+        if regressions:
+            raise CommandError('Full table scans: ' + '; '.join(
+                f"{query.name} ({', '.join(scans)})" for query, scans in regressions
+            ))
+        self.stdout.write(self.style.SUCCESS(f'{len(results)} query plans use indexes.'))
+
+    def explain_plans(self):
+        try:
+            results = list(query_plans.check())
+        except ValueError as exc:
+            raise CommandError(str(exc))
+        for query, plan, scans in results:
+            status = self.style.ERROR('FULL SCAN') if scans else 'ok'
+            self.stdout.write(f'{query.name}: {status}  ({query.description})')
+            for line in plan:
+                self.stdout.write(f'    {line}')
+        return results
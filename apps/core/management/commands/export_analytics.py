@@ -0,0 +1,72 @@
+"""
+Management command to export columnar analytics snapshots to Parquet.
+Run with: python manage.py export_analytics --output exports/ [--incremental] [--compact]
+Requires the optional ``pyarrow`` package.
+"""
+import time
+
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.analytics_export import TABLES, compact_table, export
+
+
+class Command(BaseCommand):
+    help = 'Write denormalized Parquet snapshots of responses, scores and remediations'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--output',
+            default='exports',
+            help='Directory to write the Parquet files to',
+        )
+        parser.add_argument(
+            '--table',
+            action='append',
+            dest='tables',
+            choices=list(TABLES),
+            help='Only export this table (may be repeated)',
+        )
+        parser.add_argument(
+            '--incremental',
+            action='store_true',
+            help='Only export rows updated since the previous export into the same directory',
+        )
+        parser.add_argument(
+            '--chunk-size',
+            type=int,
+            default=5000,
+            help='Rows fetched from the database and written per row group',
+        )
+        parser.add_argument(
+            '--compact',
+            action='store_true',
+            help='Afterwards fold each table\'s parts into one, keeping the newest row per id',
+        )
+
+    def handle(self, *args, **options):
+        try:
+            import pyarrow  # noqa: F401
+        except ImportError:
+            raise CommandError('export_analytics requires pyarrow: pip install pyarrow')
+        
+        def progress(name, written, path):
+            if path:
+                self.stdout.write(f'  {name}: {written} row(s) -> {path}')
+            else:
+                self.stdout.write(f'  {name}: no new rows')
+        
+        started = time.monotonic()
+        results = export(
+            options['output'],
+            tables=options['tables'],
+            incremental=options['incremental'],
+            chunk_size=options['chunk_size'],
+            progress=progress,
+        )
+        total = sum(written for written, _ in results.values())
+        if options['compact']:
+            for name in results:
+                before, after = compact_table(name, options['output'])
+                self.stdout.write(f'  {name}: compacted {before} row(s) to {after}')
+        self.stdout.write(self.style.SUCCESS(
+            f'Exported {total} row(s) in {time.monotonic() - started:.1f}s'
+        ))
@@ -0,0 +1,61 @@
+"""
+Management command to generate a production-scale synthetic dataset.
+Run with: python manage.py generate_dataset --apps N --audits-per-app M [--seed S]
+"""
+import time
+
+from django.core.management import call_command
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.audits.models import ChecklistItem
+from apps.core import dataset
+from apps.users.models import User
+
+
+class Command(BaseCommand):
+    help = 'Generate users, applications, audits, responses and remediations with batched inserts'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--apps', type=int, default=100, help='Applications to create')
+        parser.add_argument('--audits-per-app', type=int, default=5, help='Audits per application')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed; equal seeds give equal data')
+        parser.add_argument(
+            '--prefix',
+            default='synth',
+            help='Prefix of generated usernames and application names (default synth)',
+        )
+        parser.add_argument(
+            '--keep-indexes',
+            action='store_true',
+            help='Maintain secondary indexes during the load instead of rebuilding them afterwards',
+        )
+
+    def handle(self, *args, **options):
+        if options['apps'] < 1 or options['audits_per_app'] < 1:
+            raise CommandError('--apps and --audits-per-app must be at least 1.')
+        prefix = options['prefix']
+        if User.objects.filter(username__startswith=f'{prefix}_').exists():
+            raise CommandError(
+                f"A dataset with prefix '{prefix}' already exists; pick another --prefix."
+            )
+        if not ChecklistItem.objects.filter(is_active=True).exists():
+            call_command('load_checklist', verbosity=0)
+
+        items = ChecklistItem.objects.filter(is_active=True).count()
+        self.stdout.write(
+            f"Generating {options['apps']} applications x {options['audits_per_app']} audits "
+            f"x {items} items = {options['apps'] * options['audits_per_app'] * items} responses"
+        )
+        started = time.perf_counter()
+        counts = dataset.build(
+            applications=options['apps'],
+            audits_per_app=options['audits_per_app'],
+            seed=options['seed'],
+            prefix=prefix,
+            progress=lambda message: self.stdout.write(f'  {message}'),
+            defer_indexes=not options['keep_indexes'],
+        )
+        elapsed = time.perf_counter() - started
+        summary = ', '.join(f'{count} {name}' for name, count in counts.items())
+        self.stdout.write(self.style.SUCCESS(f'Created {summary} in {elapsed:.1f}s'))
+        self.stdout.write(f'Generated users sign in with password {dataset.PASSWORD}')
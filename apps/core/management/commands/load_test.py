@@ -0,0 +1,90 @@
+"""
+Management command to run scripted role workflows against a running server.
+Run with: python manage.py load_test --base-url http://127.0.0.1:8000 \\
+          --users 30 --mix auditor=5,developer=3,admin=1 --duration 120
+
+Virtual users sign in as accounts created by ``generate_dataset`` (same
+prefix and password), so point the server at the same database. See
+``apps.core.loadtest`` for the workflows.
+"""
+import json
+
+from django.core.management.base import BaseCommand, CommandError
+
+from apps.core import dataset, loadtest
+from apps.users.models import User
+
+
+def parse_mix(value):
+    try:
+        mix = {role: float(weight) for role, weight in (part.split('=') for part in value.split(','))}
+    except ValueError:
+        raise CommandError(f'Invalid --mix {value!r}; expected e.g. auditor=5,developer=3,admin=1')
+    unknown = set(mix) - set(loadtest.WORKFLOWS)
+    if unknown:
+        raise CommandError(f"Unknown role(s) in --mix: {', '.join(sorted(unknown))}")
+    return mix
+
+
+class Command(BaseCommand):
+    help = 'Replay auditor, developer and admin workflows over HTTP and report per-step latency'
+
+    def add_arguments(self, parser):
+        parser.add_argument('--base-url', default='http://127.0.0.1:8000', help='Server to load')
+        parser.add_argument('--users', type=int, default=10, help='Concurrent virtual users')
+        parser.add_argument(
+            '--mix',
+            default='auditor=5,developer=3,admin=1',
+            help='Relative weights of the roles (default auditor=5,developer=3,admin=1)',
+        )
+        parser.add_argument('--duration', type=float, default=60, help='Seconds to run')
+        parser.add_argument('--spawn-rate', type=float, default=5, help='Virtual users started per second')
+        parser.add_argument(
+            '--wait',
+            type=float,
+            nargs=2,
+            default=[0.5, 2.0],
+            metavar=('MIN', 'MAX'),
+            help='Think time between workflows in seconds',
+        )
+        parser.add_argument('--prefix', default='synth', help='Username prefix used by generate_dataset')
+        parser.add_argument('--password', default=dataset.PASSWORD, help='Password of those accounts')
+        parser.add_argument('--seed', type=int, default=0, help='Random seed of the virtual users')
+        parser.add_argument('--output', help='Write the summary as JSON to this file')
+
+    def handle(self, *args, **options):
+        mix = parse_mix(options['mix'])
+        accounts = {
+            role: list(User.objects.filter(
+                username__startswith=f"{options['prefix']}_", role=role
+            ).order_by('pk').values_list('username', flat=True))
+            for role in loadtest.WORKFLOWS
+        }
+        self.stdout.write(
+            f"Running {options['users']} virtual users ({options['mix']}) against "
+            f"{options['base_url']} for {options['duration']:.0f}s"
+        )
+        try:
+            summary, errors = loadtest.run(
+                options['base_url'], accounts, mix, options['users'], options['duration'],
+                options['password'], wait=tuple(options['wait']),
+                spawn_rate=options['spawn_rate'], seed=options['seed'],
+            )
+        except ValueError as exc:
+            raise CommandError(f"{exc} Run generate_dataset --prefix {options['prefix']} first.")
+
+        self.stdout.write(
+            f"{'step':<22}{'requests':>9}{'rps':>8}{'errors':>8}{'p50 ms':>9}{'p95 ms':>9}{'p99 ms':>9}"
+        )
+        for step, row in summary['steps'].items():
+            self.stdout.write(
+                f"{step:<22}{row['requests']:>9}{row['rps']:>8.1f}{row['error_rate']:>8.1%}"
+                f"{row['p50_ms']:>9.0f}{row['p95_ms']:>9.0f}{row['p99_ms']:>9.0f}"
+            )
+        for message in sorted(set(errors))[:10]:
+            self.stderr.write(f'  {message}')
+
+        if options['output']:
+            with open(options['output'], 'w') as fh:
+                json.dump(dict(summary, errors=len(errors)), fh, indent=2)
+                fh.write('\n')
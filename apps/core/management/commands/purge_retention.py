@@ -0,0 +1,70 @@
+"""
+Management command to apply data retention policies.
+Run with: python manage.py purge_retention [--policy NAME] [--dry-run]
+"""
+from django.core.management.base import BaseCommand, CommandError
+from apps.core.retention import get_policies, purge
+
+
+class Command(BaseCommand):
+    help = 'Delete rows past their retention period in bounded chunks'
+
+    def add_arguments(self, parser):
+        parser.add_argument(
+            '--policy',
+            action='append',
+            dest='policies',
+            help='Only apply the named policy (may be repeated)',
+        )
+        parser.add_argument(
+            '--batch-size',
+            type=int,
+            default=None,
+            help='Rows deleted per chunk (defaults to RETENTION_BATCH_SIZE)',
+        )
+        parser.add_argument(
+            '--sleep',
+            type=float,
+            default=None,
+            help='Seconds to pause between chunks (defaults to RETENTION_BATCH_SLEEP)',
+        )
+        parser.add_argument(
+            '--dry-run',
+            action='store_true',
+            help='Only count the rows each policy would delete',
+        )
+
+    def handle(self, *args, **options):
+        policies = get_policies()
+        names = options['policies'] or list(policies)
+        unknown = set(names) - set(policies)
+        if unknown:
+            raise CommandError(
+                f"Unknown policy: {', '.join(sorted(unknown))}. "
+                f"Available: {', '.join(policies)}"
+            )
+
+        for name in names:
+            policy = policies[name]
+            self.stdout.write(
+                f'{policy.name}: {policy.description} older than {policy.days} days'
+            )
+
+            if options['dry_run']:
+                count = policy.get_queryset().count()
+                self.stdout.write(f'  {count} row(s) would be deleted')
+                continue
+
+            def progress(deleted, elapsed):
+                rate = deleted / elapsed if elapsed else 0
+                self.stdout.write(f'  {deleted} deleted ({rate:.0f} rows/s)')
+
+            deleted, elapsed = purge(
+                policy,
+                batch_size=options['batch_size'],
+                sleep=options['sleep'],
+                progress=progress,
+            )
+            self.stdout.write(self.style.SUCCESS(
+                f'  Deleted {deleted} row(s) in {elapsed:.1f}s'
+            ))
@@ -0,0 +1,153 @@
+"""
+Prometheus metrics for views, the database, caches, background writers and
+report rendering, served in the text exposition format at ``/metrics``.
+
+``PrometheusMiddleware`` observes every request: its latency per view, and
+the query count, query time and cache hits/misses collected by
+``instrumentation.collect``. It also samples the number of entries waiting
+in the buffered background writers. ``observe_report_render`` times report
+generation and export.
+
+Each gunicorn worker keeps its own metric state. When
+``PROMETHEUS_MULTIPROC_DIR`` is set, prometheus_client writes that state to
+files in the directory and the endpoint aggregates all workers' files, so
+any worker can answer a scrape; ``gunicorn.conf.py`` empties the directory
+on start and retires the files of exited workers.
+
+Requires ``prometheus_client``; without it the middleware removes itself
+and the endpoint answers 503.
+"""
+import os
+import time
+from contextlib import contextmanager
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+
+from . import instrumentation
+from .middleware import HybridMiddleware
+
+try:
+    import prometheus_client
+    from prometheus_client import CollectorRegistry, Counter, Gauge, Histogram, multiprocess
+except ImportError:
+    prometheus_client = None
+
+CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+UNRESOLVED_VIEW = '<unresolved>'
+
+if prometheus_client is not None:
+    REQUEST_LATENCY = Histogram(
+        'dp_compass_request_duration_seconds',
+        'Time to handle a request, by view',
+        ['view', 'method', 'status'],
+    )
+    REQUEST_QUERIES = Histogram(
+        'dp_compass_request_db_queries',
+        'SQL queries issued while handling a request, by view',
+        ['view'],
+        buckets=(1, 2, 5, 10, 20, 50, 100, 200, 500, 1000),
+    )
+    REQUEST_QUERY_TIME = Histogram(
+        'dp_compass_request_db_duration_seconds',
+        'Time spent in SQL queries while handling a request, by view',
+        ['view'],
+    )
+    CACHE_READS = Counter(
+        'dp_compass_cache_reads_total',
+        'Cache reads made while handling requests, by result',
+        ['result'],
+    )
+    QUEUE_DEPTH = Gauge(
+        'dp_compass_background_queue_depth',
+        'Entries waiting in a buffered background writer',
+        ['queue'],
+        multiprocess_mode='livesum',
+    )
+    REPORT_RENDER = Histogram(
+        'dp_compass_report_render_seconds',
+        'Time to render a compliance report, by kind',
+        ['kind'],
+        buckets=(0.05, 0.1, 0.25, 0.5, 1, 2.5, 5, 10, 30, 60),
+    )
+
+
+def enabled():
+    return prometheus_client is not None and getattr(settings, 'METRICS_ENABLED', True)
+
+
+def _queues():
+    from apps.users.activity import recorder as activity
+    from .slow_queries import recorder as slow_queries
+    return {'activity': activity, 'slow_queries': slow_queries}
+
+
+def update_queue_depth():
+    """Publish how many entries this process's background writers hold."""
+    for name, recorder in _queues().items():
+        QUEUE_DEPTH.labels(name).set(recorder.pending())
+
+
+@contextmanager
+def observe_report_render(kind):
+    """Time the block as one report render of ``kind``."""
+    if not enabled():
+        yield
+        return
+    started = time.perf_counter()
+    try:
+        yield
+    finally:
+        REPORT_RENDER.labels(kind).observe(time.perf_counter() - started)
+
+
+def timed_stream(chunks, kind):
+    """Wrap a streamed body so that producing all of it counts as a render."""
+    with observe_report_render(kind):
+        yield from chunks
+
+
+def exposition():
+    """Return the current metrics of all workers in the text format."""
+    update_queue_depth()
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        registry = CollectorRegistry()
+        multiprocess.MultiProcessCollector(registry)
+    else:
+        registry = prometheus_client.REGISTRY
+    return prometheus_client.generate_latest(registry)
+
+
+class PrometheusMiddleware(HybridMiddleware):
+    """Observe request latency, queries and cache reads per view."""
+
+    def __init__(self, get_response):
+        if not enabled():
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+
+    def handle(self, request):
+        started = time.perf_counter()
+        with instrumentation.collect() as collected:
+            response = self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - started, collected)
+
+    async def ahandle(self, request):
+        started = time.perf_counter()
+        with instrumentation.collect() as collected:
+            response = await self.get_response(request)
+        return self.observe(request, response, time.perf_counter() - started, collected)
+
+    def observe(self, request, response, elapsed, collected):
+        # The route name, not the path, keeps the label set bounded.
+        match = request.resolver_match
+        view = match.view_name if match is not None else UNRESOLVED_VIEW
+        REQUEST_LATENCY.labels(view, request.method, str(response.status_code)).observe(elapsed)
+        REQUEST_QUERIES.labels(view).observe(collected.sql_count)
+        REQUEST_QUERY_TIME.labels(view).observe(collected.sql_time)
+        if collected.cache_hits:
+            CACHE_READS.labels('hit').inc(collected.cache_hits)
+        if collected.cache_misses:
+            CACHE_READS.labels('miss').inc(collected.cache_misses)
+        update_queue_depth()
+        return response
@@ -0,0 +1,32 @@
+"""
+Base class for the project's middleware.
+
+Django adapts between synchronous and asynchronous middleware by moving the
+request to another thread at every boundary between the two. Middleware
+built on ``HybridMiddleware`` runs natively in either mode: ``__call__``
+dispatches to ``handle`` when the rest of the chain is synchronous (WSGI,
+or below a sync-only middleware) and to ``ahandle`` when it is a coroutine.
+"""
+from asgiref.sync import iscoroutinefunction, markcoroutinefunction
+
+
+class HybridMiddleware:
+    sync_capable = True
+    async_capable = True
+
+    def __init__(self, get_response):
+        self.get_response = get_response
+        self.is_async = iscoroutinefunction(get_response)
+        if self.is_async:
+            markcoroutinefunction(self)
+
+    def __call__(self, request):
+        if self.is_async:
+            return self.ahandle(request)
+        return self.handle(request)
+
+    def handle(self, request):
+        raise NotImplementedError
+
+    async def ahandle(self, request):
+        raise NotImplementedError
@@ -0,0 +1,27 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:25
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0001_initial'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='BootStep',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('name', models.CharField(max_length=100, unique=True)),
+                ('fingerprint', models.CharField(max_length=64)),
+                ('completed_at', models.DateTimeField(auto_now=True)),
+            ],
+            options={
+                'verbose_name': 'Boot Step',
+                'verbose_name_plural': 'Boot Steps',
+                'db_table': 'boot_steps',
+            },
+        ),
+    ]
@@ -0,0 +1,33 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:33
+
+import django.utils.timezone
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('core', '0002_boot_steps'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='SlowQuery',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('fingerprint', models.CharField(max_length=16)),
+                ('sql', models.TextField()),
+                ('view', models.CharField(max_length=200)),
+                ('duration_ms', models.FloatField()),
+                ('rows', models.IntegerField(blank=True, null=True)),
+                ('created_at', models.DateTimeField(db_index=True, default=django.utils.timezone.now)),
+            ],
+            options={
+                'verbose_name': 'Slow Query',
+                'verbose_name_plural': 'Slow Queries',
+                'db_table': 'slow_queries',
+                'ordering': ['-created_at'],
+                'indexes': [models.Index(fields=['fingerprint', 'created_at'], name='slow_query_fp_created_idx')],
+            },
+        ),
+    ]
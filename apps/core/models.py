@@ -15,6 +15,38 @@ class TimeStampedModel(models.Model):
         abstract = True
 
 
+class LoadedFieldsMixin:
+    """
+    Remembers the values of ``loaded_fields`` as last read from or written
+    to the database, so that signal handlers can tell whether a save
+    changed them without re-reading the row.
+    """
+    loaded_fields = ()
+
+    @classmethod
+    def from_db(cls, db, field_names, values):
+        instance = super().from_db(db, field_names, values)
+        instance._remember_loaded(cls.loaded_fields)
+        return instance
+
+    def save(self, *args, **kwargs):
+        super().save(*args, **kwargs)
+        update_fields = kwargs.get('update_fields')
+        self._remember_loaded(self.loaded_fields if update_fields is None else [
+            name for name in self.loaded_fields if name in update_fields
+        ])
+
+    def _remember_loaded(self, names):
+        # Read from the instance dict so that deferred fields are not loaded.
+        loaded = self.__dict__.setdefault('_loaded', {})
+        for name in names:
+            loaded[name] = self.__dict__.get(self._meta.get_field(name).attname)
+
+    def loaded(self, name):
+        """The database value of field ``name``, or None if never loaded."""
+        return self.__dict__.get('_loaded', {}).get(name)
+
+
 class DPDPSection(models.Model):
     """DPDP Act Sections for reference in compliance tracking."""
     section_number = models.CharField(max_length=20, unique=True)
@@ -30,3 +62,46 @@ class DPDPSection(models.Model):
 
     def __str__(self):
         return f"Section {self.section_number}: {self.title}"
+
+
+class BootStep(models.Model):
+    """
+    Fingerprint of the inputs a startup step last ran with; ``boot``
+    skips the step while they are unchanged. See ``apps.core.boot``.
+    """
+    name = models.CharField(max_length=100, unique=True)
+    fingerprint = models.CharField(max_length=64)
+    completed_at = models.DateTimeField(auto_now=True)
+
+    class Meta:
+        db_table = 'boot_steps'
+        verbose_name = 'Boot Step'
+        verbose_name_plural = 'Boot Steps'
+
+    def __str__(self):
+        return self.name
+
+
+class SlowQuery(models.Model):
+    """
+    One SQL statement that exceeded ``SLOW_QUERY_THRESHOLD_MS``, stored in
+    normalized form. See ``apps.core.slow_queries``.
+    """
+    fingerprint = models.CharField(max_length=16)
+    sql = models.TextField()
+    view = models.CharField(max_length=200)
+    duration_ms = models.FloatField()
+    rows = models.IntegerField(null=True, blank=True)
+    created_at = models.DateTimeField(default=timezone.now, db_index=True)
+
+    class Meta:
+        db_table = 'slow_queries'
+        ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['fingerprint', 'created_at'], name='slow_query_fp_created_idx'),
+        ]
+        verbose_name = 'Slow Query'
+        verbose_name_plural = 'Slow Queries'
+
+    def __str__(self):
+        return f'{self.fingerprint} ({self.duration_ms:.0f} ms)'
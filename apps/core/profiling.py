@@ -0,0 +1,235 @@
+"""
+On-demand request profiling for administrators.
+
+An admin adds ``?_profile=1`` to a URL, or sends ``X-Profile: 1``, and
+``ProfilerMiddleware`` runs that one request under ``cProfile``. The stats
+are written to ``PROFILE_DIR`` as a standard ``.prof`` file (readable by
+``pstats``, snakeviz and friends) next to a small JSON file recording the
+URL, user, status and duration. A ``StackSampler`` thread samples the
+request's call stack meanwhile; the stacks are kept in the collapsed
+``.folded`` format (as read by flamegraph.pl and speedscope) and drawn as
+the flame chart on the detail page. Only the newest ``PROFILE_KEEP`` profiles
+are kept. The profile id is returned in the ``X-Profile-Id`` header and
+the ``profile_list`` page lists and renders them.
+
+Requests by anyone else, or without the flag, pass straight through.
+Enabled by ``PROFILER_ENABLED`` (default ``DEBUG``); when off the
+middleware removes itself at startup.
+"""
+import cProfile
+import json
+import os
+import pstats
+import re
+import sys
+import threading
+import time
+import uuid
+from collections import Counter, defaultdict
+from pathlib import Path
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.utils import timezone
+
+QUERY_FLAG = '_profile'
+HEADER = 'HTTP_X_PROFILE'
+SAMPLE_INTERVAL = 0.001
+PROFILE_ID = re.compile(r'^\d{8}-\d{6}-[0-9a-f]{8}$')
+
+
+def profile_dir():
+    return Path(getattr(settings, 'PROFILE_DIR', Path(settings.BASE_DIR) / 'var' / 'profiles'))
+
+
+def _wants_profile(request):
+    user = getattr(request, 'user', None)
+    if user is None or not user.is_authenticated or not user.is_admin_user:
+        return False
+    return request.GET.get(QUERY_FLAG) == '1' or request.META.get(HEADER) == '1'
+
+
+def save_profile(profiler, stacks, meta):
+    """Write the stats, sampled stacks and metadata of one profile; returns its id."""
+    directory = profile_dir()
+    directory.mkdir(parents=True, exist_ok=True)
+    profile_id = f"{time.strftime('%Y%m%d-%H%M%S')}-{uuid.uuid4().hex[:8]}"
+    profiler.dump_stats(directory / f'{profile_id}.prof')
+    with open(directory / f'{profile_id}.folded', 'w') as fh:
+        fh.writelines(f'{stack} {count}\n' for stack, count in stacks.most_common())
+    with open(directory / f'{profile_id}.json', 'w') as fh:
+        json.dump(dict(meta, id=profile_id), fh)
+    _prune(directory, getattr(settings, 'PROFILE_KEEP', 100))
+    return profile_id
+
+
+def _prune(directory, keep):
+    for meta_path in sorted(directory.glob('*.json'), reverse=True)[keep:]:
+        for path in (meta_path, meta_path.with_suffix('.prof'), meta_path.with_suffix('.folded')):
+            try:
+                os.remove(path)
+            except FileNotFoundError:
+                pass
+
+
+def list_profiles(limit=100):
+    """Return the metadata of the newest profiles, newest first."""
+    profiles = []
+    for meta_path in sorted(profile_dir().glob('*.json'), reverse=True)[:limit]:
+        try:
+            with open(meta_path) as fh:
+                profiles.append(json.load(fh))
+        except (OSError, ValueError):
+            continue
+    return profiles
+
+
+def profile_path(profile_id):
+    """Return the ``.prof`` path of a profile, or ``None`` if unknown."""
+    if not PROFILE_ID.match(profile_id):
+        return None
+    path = profile_dir() / f'{profile_id}.prof'
+    return path if path.exists() else None
+
+
+def load_profile(profile_id):
+    """Return ``(metadata, pstats.Stats, stacks)`` for a profile, or ``None``."""
+    path = profile_path(profile_id)
+    if path is None:
+        return None
+    try:
+        with open(path.with_suffix('.json')) as fh:
+            meta = json.load(fh)
+    except (OSError, ValueError):
+        meta = {'id': profile_id}
+    stacks = Counter()
+    try:
+        with open(path.with_suffix('.folded')) as fh:
+            for line in fh:
+                stack, _, count = line.rstrip('\n').rpartition(' ')
+                stacks[stack] += int(count)
+    except (OSError, ValueError):
+        pass
+    return meta, pstats.Stats(str(path)), stacks
+
+
+def _label(func):
+    filename, line, name = func
+    if filename == '~':
+        return name
+    return f'{name} ({os.path.basename(filename)}:{line})'
+
+
+def top_functions(stats, limit=30):
+    """The functions with the most own time, as dicts for templates."""
+    rows = sorted(stats.stats.items(), key=lambda item: item[1][2], reverse=True)[:limit]
+    return [
+        {'name': _label(func), 'calls': nc, 'own_ms': tt * 1000, 'total_ms': ct * 1000}
+        for func, (cc, nc, tt, ct, callers) in rows
+    ]
+
+
+class StackSampler(threading.Thread):
+    """
+    Record the call stack of one thread every ``interval`` seconds.
+    cProfile only keeps caller/callee totals; the sampled stacks are what
+    the flame chart is drawn from.
+    """
+
+    def __init__(self, thread_id, interval):
+        super().__init__(daemon=True)
+        self.thread_id = thread_id
+        self.interval = interval
+        self.stacks = Counter()
+        self.finished = threading.Event()
+
+    def run(self):
+        while not self.finished.wait(self.interval):
+            frame = sys._current_frames().get(self.thread_id)
+            stack = []
+            while frame is not None:
+                if frame.f_code is ProfilerMiddleware.__call__.__code__:
+                    break
+                code = frame.f_code
+                stack.append(_label((code.co_filename, code.co_firstlineno, code.co_name)))
+                frame = frame.f_back
+            if stack:
+                self.stacks[';'.join(reversed(stack))] += 1
+
+    def stop(self):
+        self.finished.set()
+        self.join()
+
+
+def flame_levels(stacks, min_fraction=0.005):
+    """
+    Lay sampled stacks (``{"a;b;c": samples}``) out as an icicle chart: a
+    list of levels, each a list of bars with ``left`` and ``width`` in
+    percent of all samples.
+    """
+    total = sum(stacks.values())
+    if not total:
+        return []
+    tree = {}
+    for stack, count in stacks.items():
+        node = tree
+        for name in stack.split(';'):
+            entry = node.setdefault(name, [0, {}])
+            entry[0] += count
+            node = entry[1]
+
+    levels = defaultdict(list)
+
+    def place(children, left, depth):
+        for name, (count, grandchildren) in sorted(children.items(), key=lambda item: -item[1][0]):
+            if count / total >= min_fraction:
+                levels[depth].append({
+                    'name': name,
+                    'left': left / total * 100,
+                    'width': count / total * 100,
+                    'samples': count,
+                })
+                place(grandchildren, left, depth + 1)
+            left += count
+
+    place(tree, 0, 0)
+    return [levels[depth] for depth in sorted(levels)]
+
+
+class ProfilerMiddleware:
+    """Profile a request when an admin asks for it."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'PROFILER_ENABLED', False):
+            raise MiddlewareNotUsed
+        self.get_response = get_response
+
+    def __call__(self, request):
+        if not _wants_profile(request):
+            return self.get_response(request)
+
+        profiler = cProfile.Profile()
+        try:
+            profiler.enable()
+        except ValueError:
+            # Another profiler is already running in this thread.
+            return self.get_response(request)
+        sampler = StackSampler(threading.get_ident(), SAMPLE_INTERVAL)
+        sampler.start()
+        started = time.perf_counter()
+        try:
+            response = self.get_response(request)
+        finally:
+            profiler.disable()
+            sampler.stop()
+        duration = time.perf_counter() - started
+        profile_id = save_profile(profiler, sampler.stacks, {
+            'method': request.method,
+            'path': request.get_full_path(),
+            'user': request.user.get_username(),
+            'status': response.status_code,
+            'duration_ms': round(duration * 1000, 1),
+            'created_at': timezone.now().isoformat(),
+        })
+        response['X-Profile-Id'] = profile_id
+        return response
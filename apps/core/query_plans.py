@@ -0,0 +1,106 @@
+"""
+Query-plan checks for the hot queries behind the main views.
+
+Each ``HotQuery`` rebuilds a queryset the way a view or widget issues it
+and names the tables it must reach through an index. ``check`` runs
+``EXPLAIN QUERY PLAN`` on SQLite and reports any of those tables that
+the planner reads with a full table scan, which is what a dropped or
+mis-ordered index turns into. Scoped variants run inside the tenant
+scope, because ``TenantManager`` adds the organization to every filter.
+"""
+import re
+from collections import namedtuple
+
+from .tenancy import scoped_to
+
+HotQuery = namedtuple('HotQuery', 'name description tables build scoped')
+
+# "SCAN audits" is a full scan; "SCAN audits USING INDEX ..." walks an index.
+_FULL_SCAN = re.compile(r'\bSCAN (?:TABLE )?(\w+)(?! USING)(?:\s|$)')
+
+
+def _sample():
+    """Pick rows the hot queries are parameterised with."""
+    from apps.audits.models import Audit
+    from apps.compliance.models import Remediation
+    audit = Audit.objects.filter(status='completed').select_related('application', 'auditor').first()
+    remediation = Remediation.objects.exclude(assigned_to=None).select_related('assigned_to').first()
+    if audit is None or remediation is None:
+        raise ValueError('The database needs a completed audit and an assigned remediation.')
+    return {
+        'audit': audit,
+        'application': audit.application,
+        'auditor': audit.auditor,
+        'assignee': remediation.assigned_to,
+        'organization': audit.organization_id,
+    }
+
+
+def hot_queries():
+    from apps.audits.models import Audit, AuditCategory, ChecklistItem
+    from apps.compliance.models import Remediation
+
+    return [
+        HotQuery(
+            'audit_progress', 'Audit.progress_percentage / compliance_score counts',
+            ['audit_responses'],
+            lambda s: s['audit'].responses.filter(status='compliant').order_by(), False,
+        ),
+        HotQuery(
+            'auditor_active_audits', 'Inbox: audits in progress for an auditor',
+            ['audits'],
+            lambda s: Audit.objects.filter(auditor=s['auditor'], status='in_progress').order_by(), False,
+        ),
+        HotQuery(
+            'auditor_audit_list', 'audit_list for an auditor, tenant-scoped',
+            ['audits'],
+            lambda s: Audit.objects.filter(auditor=s['auditor']), True,
+        ),
+        HotQuery(
+            'application_audits', 'application_detail: latest audits',
+            ['audits'],
+            lambda s: s['application'].audits.order_by('-created_at')[:10], False,
+        ),
+        HotQuery(
+            'application_scores', 'application_detail: latest compliance scores',
+            ['compliance_scores'],
+            lambda s: s['application'].compliance_scores.order_by('-calculated_at')[:10], False,
+        ),
+        HotQuery(
+            'assignee_open_remediations', 'Inbox: open remediations assigned to a user',
+            ['remediations'],
+            lambda s: Remediation.objects.filter(
+                assigned_to=s['assignee'], status__in=['open', 'in_progress']
+            ).order_by(), False,
+        ),
+        HotQuery(
+            'active_checklist', 'audit_create / checklist_list: active checklist items',
+            ['checklist_items'],
+            lambda s: ChecklistItem.objects.filter(is_active=True).order_by('category', 'order', 'code'), False,
+        ),
+        HotQuery(
+            'active_categories', 'checklist_list: active categories',
+            ['audit_categories'],
+            lambda s: AuditCategory.objects.filter(is_active=True), False,
+        ),
+    ]
+
+
+def explain(queryset):
+    """Return the plan lines of ``queryset`` without SQLite's node ids."""
+    return [re.sub(r'^\d+ \d+ \d+ ', '', line) for line in queryset.explain().splitlines()]
+
+
+def full_scans(plan, tables):
+    """Return the tables of ``tables`` that ``plan`` reads with a full scan."""
+    scanned = {match.group(1) for line in plan for match in _FULL_SCAN.finditer(line)}
+    return sorted(scanned & set(tables))
+
+
+def check():
+    """Explain every hot query; yields ``(query, plan, fully scanned tables)``."""
+    sample = _sample()
+    for query in hot_queries():
+        with scoped_to(sample['organization'] if query.scoped else None):
+            plan = explain(query.build(sample))
+        yield query, plan, full_scans(plan, query.tables)
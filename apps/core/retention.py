@@ -0,0 +1,130 @@
+"""
+Retention policies for append-only and superseded data.
+
+Rows are purged in bounded primary-key chunks so that no single DELETE holds
+long locks or makes Django collect millions of objects in memory.
+"""
+import time
+from datetime import timedelta
+
+from django.conf import settings
+from django.db.models import Exists, OuterRef
+from django.utils import timezone
+
+
+class RetentionPolicy:
+    """A named set of rows that may be deleted once older than ``days``."""
+
+    def __init__(self, name, description, days, queryset_factory):
+        self.name = name
+        self.description = description
+        self.days = days
+        self.queryset_factory = queryset_factory
+
+    def __str__(self):
+        return self.name
+
+    @property
+    def cutoff(self):
+        return timezone.now() - timedelta(days=self.days)
+
+    def get_queryset(self):
+        return self.queryset_factory(self.cutoff)
+
+
+def _user_activity(cutoff):
+    from apps.users.models import UserActivity
+    return UserActivity.objects.filter(created_at__lt=cutoff)
+
+
+def _draft_reports(cutoff):
+    from apps.reports.models import ComplianceReport
+    return ComplianceReport.objects.filter(status='draft', created_at__lt=cutoff)
+
+
+def _superseded_scores(cutoff):
+    from apps.compliance.models import ComplianceScore
+    newer = ComplianceScore.objects.filter(
+        application=OuterRef('application'),
+        calculated_at__gt=OuterRef('calculated_at'),
+    )
+    return ComplianceScore.objects.filter(calculated_at__lt=cutoff).filter(Exists(newer))
+
+
+def _slow_queries(cutoff):
+    from apps.core.models import SlowQuery
+    return SlowQuery.objects.filter(created_at__lt=cutoff)
+
+
+def get_policies():
+    """Return the configured retention policies, keyed by name."""
+    days = settings.RETENTION_DAYS
+    policies = [
+        RetentionPolicy(
+            'user_activity',
+            'User activity log entries',
+            days['user_activity'],
+            _user_activity,
+        ),
+        RetentionPolicy(
+            'draft_reports',
+            'Compliance reports left in draft',
+            days['draft_reports'],
+            _draft_reports,
+        ),
+        RetentionPolicy(
+            'superseded_scores',
+            'Compliance scores replaced by a newer score for the same application',
+            days['superseded_scores'],
+            _superseded_scores,
+        ),
+        RetentionPolicy(
+            'slow_queries',
+            'Slow-query log entries',
+            days['slow_queries'],
+            _slow_queries,
+        ),
+    ]
+    return {policy.name: policy for policy in policies}
+
+
+def purge(policy, batch_size=None, sleep=None, progress=None):
+    """
+    Delete the rows matched by ``policy`` in ascending primary-key chunks.
+
+    Each chunk re-evaluates the policy filter, fetches at most ``batch_size``
+    primary keys and deletes exactly those rows, then sleeps for ``sleep``
+    seconds to give other transactions room. ``progress`` is called after
+    every chunk with the running total and elapsed seconds.
+
+    Returns a ``(deleted, elapsed)`` tuple.
+    """
+    batch_size = batch_size or settings.RETENTION_BATCH_SIZE
+    sleep = settings.RETENTION_BATCH_SLEEP if sleep is None else sleep
+
+    queryset = policy.get_queryset()
+    model = queryset.model
+    deleted = 0
+    last_pk = None
+    started = time.monotonic()
+
+    while True:
+        chunk = queryset.order_by('pk')
+        if last_pk is not None:
+            chunk = chunk.filter(pk__gt=last_pk)
+        pks = list(chunk.values_list('pk', flat=True)[:batch_size])
+        if not pks:
+            break
+
+        count, _ = model.objects.filter(pk__in=pks).delete()
+        deleted += count
+        last_pk = pks[-1]
+
+        if progress:
+            progress(deleted, time.monotonic() - started)
+        if len(pks) < batch_size:
+            break
+        if sleep:
+            time.sleep(sleep)
+
+    return deleted, time.monotonic() - started
@@ -0,0 +1,57 @@
+"""
+Signal handlers expiring cached inbox counts when work items change.
+
+Only changes to the fields the inbox reads expire the counts. Work items
+remember those fields' database values (``LoadedFieldsMixin``), which are
+compared on save, so saving a response's findings, say, costs nothing.
+"""
+from django.db.models.signals import post_delete, post_save
+from apps.audits.models import Audit, AuditResponse
+from apps.compliance.models import Remediation
+from apps.reports.models import ComplianceReport
+from . import inbox, tenancy
+
+# What each work item contributes to the inbox, from a function returning
+# a field's value; only the item's ``loaded_fields`` are read.
+INBOX_STATE = {
+    Audit: lambda value: (value('status'), value('auditor')),
+    AuditResponse: lambda value: value('status') == 'pending',
+    Remediation: lambda value: (value('status'), value('assigned_to')),
+    ComplianceReport: lambda value: value('status'),
+}
+
+
+def _current_value(instance):
+    return lambda name: instance.__dict__.get(instance._meta.get_field(name).attname)
+
+
+def _organization_id(instance):
+    # Audits carry their tenant; other work items changed during a request
+    # belong to the tenant it is scoped to, and otherwise to their audit's.
+    organization_id = getattr(instance, 'organization_id', None) or tenancy.get_current_organization_id()
+    if organization_id is not None:
+        return organization_id
+    if isinstance(instance, AuditResponse) and AuditResponse.audit.is_cached(instance):
+        return instance.audit.organization_id
+    if isinstance(instance, Remediation):
+        audits = Audit.objects.filter(responses__pk=instance.audit_response_id)
+    else:
+        audits = Audit.objects.filter(pk=instance.audit_id)
+    return audits.values_list('organization_id', flat=True).first()
+
+
+def expire_inbox_counts(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    state = INBOX_STATE[sender]
+    if created or state(_current_value(instance)) != state(instance.loaded):
+        inbox.expire(_organization_id(instance))
+
+
+def expire_inbox_counts_on_delete(sender, instance, **kwargs):
+    inbox.expire(_organization_id(instance))
+
+
+for model in INBOX_STATE:
+    post_save.connect(expire_inbox_counts, sender=model, dispatch_uid=f'inbox:save:{model.__name__}')
+    post_delete.connect(expire_inbox_counts_on_delete, sender=model, dispatch_uid=f'inbox:delete:{model.__name__}')
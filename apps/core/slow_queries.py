@@ -0,0 +1,195 @@
+"""
+Slow-query log with normalized fingerprints.
+
+``SlowQueryMiddleware`` times every SQL statement of a sampled share
+(``SLOW_QUERY_SAMPLE_RATE``) of requests through the database wrapper hook.
+Statements that take at least ``SLOW_QUERY_THRESHOLD_MS`` are recorded with
+the view that issued them, their duration and the row count the driver
+reports. Each statement is reduced to a fingerprint: literals, placeholders
+and ``IN``/``VALUES`` lists are stripped so that every execution of the
+same query shape shares one key. Entries are written in batches by a
+background recorder, so the request only pays for two clock reads per query.
+The wrapper is installed on every connection and only times queries while a
+sampled request is being handled.
+
+``report`` aggregates the log by fingerprint for the admin page.
+"""
+import atexit
+import hashlib
+import random
+import re
+import time
+from collections import defaultdict
+from contextvars import ContextVar
+from datetime import timedelta
+
+from django.conf import settings
+from django.core.exceptions import MiddlewareNotUsed
+from django.db.models import Avg, Count, F, Max, Sum, Window
+from django.db.models.functions import Ceil, RowNumber
+from django.utils import timezone
+
+from apps.users.activity import ActivityRecorder
+from .instrumentation import install_query_wrapper
+from .middleware import HybridMiddleware
+
+_current = ContextVar('slow_queries', default=None)
+
+_STRING = re.compile(r"'(?:[^']|'')*'")
+_NUMBER = re.compile(r'(?<![\w."])\d+(?:\.\d+)?\b')
+_PLACEHOLDER = re.compile(r'%s|\?')
+_LIST = re.compile(r'\(\s*\?(?:\s*,\s*\?)*\s*\)')
+_ROWS = re.compile(r'(VALUES\s*\(\.\.\.\))(?:\s*,\s*\(\.\.\.\))+', re.IGNORECASE)
+_SPACE = re.compile(r'\s+')
+
+
+def normalize(sql):
+    """Strip the literals from ``sql``, leaving the shape of the query."""
+    sql = _STRING.sub('?', sql)
+    sql = _PLACEHOLDER.sub('?', sql)
+    sql = _NUMBER.sub('?', sql)
+    sql = _LIST.sub('(...)', sql)
+    sql = _ROWS.sub(r'\1', sql)
+    return _SPACE.sub(' ', sql).strip()
+
+
+def fingerprint(normalized_sql):
+    return hashlib.sha1(normalized_sql.encode()).hexdigest()[:16]
+
+
+class SlowQueryRecorder(ActivityRecorder):
+    """Buffers ``SlowQuery`` rows and writes them in batches."""
+
+    model = 'core.SlowQuery'
+    thread_name = 'slow-query-recorder'
+
+    def add(self, entries):
+        for entry in entries:
+            self._append(entry)
+
+
+recorder = SlowQueryRecorder(
+    flush_size=getattr(settings, 'ACTIVITY_FLUSH_SIZE', 100),
+    flush_interval=getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 5.0),
+)
+atexit.register(recorder.flush)
+
+
+def _record_query(execute, sql, params, many, context):
+    slow = _current.get()
+    if slow is None:
+        return execute(sql, params, many, context)
+    threshold, found = slow
+    started = time.perf_counter()
+    try:
+        return execute(sql, params, many, context)
+    finally:
+        elapsed = time.perf_counter() - started
+        if elapsed >= threshold:
+            rowcount = getattr(context['cursor'], 'rowcount', -1)
+            found.append((sql, elapsed, rowcount if rowcount >= 0 else None))
+
+
+class SlowQueryMiddleware(HybridMiddleware):
+    """Record the statements of sampled requests that exceed the threshold."""
+
+    def __init__(self, get_response):
+        if not getattr(settings, 'SLOW_QUERY_LOG_ENABLED', True):
+            raise MiddlewareNotUsed
+        super().__init__(get_response)
+        self.threshold = getattr(settings, 'SLOW_QUERY_THRESHOLD_MS', 100) / 1000
+        self.sample_rate = getattr(settings, 'SLOW_QUERY_SAMPLE_RATE', 0.1)
+        install_query_wrapper(_record_query)
+
+    def handle(self, request):
+        if random.random() >= self.sample_rate:
+            return self.get_response(request)
+        found = []
+        token = _current.set((self.threshold, found))
+        try:
+            response = self.get_response(request)
+        finally:
+            _current.reset(token)
+        if found:
+            self.save(request, found)
+        return response
+
+    async def ahandle(self, request):
+        if random.random() >= self.sample_rate:
+            return await self.get_response(request)
+        found = []
+        token = _current.set((self.threshold, found))
+        try:
+            response = await self.get_response(request)
+        finally:
+            _current.reset(token)
+        if found:
+            self.save(request, found)
+        return response
+
+    def save(self, request, found):
+        from .models import SlowQuery
+        match = request.resolver_match
+        view = match.view_name if match is not None else request.path
+        now = timezone.now()
+        entries = []
+        for sql, elapsed, rows in found:
+            normalized = normalize(sql)
+            entries.append(SlowQuery(
+                fingerprint=fingerprint(normalized),
+                sql=normalized,
+                view=view[:200],
+                duration_ms=round(elapsed * 1000, 2),
+                rows=rows,
+                created_at=now,
+            ))
+        recorder.add(entries)
+
+
+def report(days=7, view=None, limit=50):
+    """
+    Aggregate the log of the last ``days`` by fingerprint, most total time
+    first: statement, views, count, total/mean/p95/max duration and mean
+    row count. The p95 of every listed fingerprint is picked in one query
+    by numbering each fingerprint's entries in duration order.
+    """
+    from .models import SlowQuery
+    entries = SlowQuery.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+    if view:
+        entries = entries.filter(view=view)
+
+    rows = list(
+        entries.values('fingerprint')
+        .annotate(
+            sql=Max('sql'),
+            count=Count('id'),
+            total_ms=Sum('duration_ms'),
+            mean_ms=Avg('duration_ms'),
+            max_ms=Max('duration_ms'),
+            mean_rows=Avg('rows'),
+        )
+        .order_by('-total_ms')[:limit]
+    )
+    listed = entries.filter(fingerprint__in=[row['fingerprint'] for row in rows])
+    views = defaultdict(list)
+    for key, view_name in listed.values_list('fingerprint', 'view').distinct().order_by('view'):
+        views[key].append(view_name)
+    p95 = dict(
+        listed.annotate(
+            position=Window(RowNumber(), partition_by=F('fingerprint'), order_by=F('duration_ms').asc()),
+            entries=Window(Count('id'), partition_by=F('fingerprint')),
+        ).filter(position=Ceil(F('entries') * 0.95)).order_by().values_list('fingerprint', 'duration_ms')
+    )
+    for row in rows:
+        row['p95_ms'] = p95.get(row['fingerprint'])
+        row['views'] = views[row['fingerprint']]
+    return rows
+
+
+def logged_views(days=7):
+    """The views with log entries in the last ``days``, for the filter."""
+    from .models import SlowQuery
+    return list(
+        SlowQuery.objects.filter(created_at__gte=timezone.now() - timedelta(days=days))
+        .values_list('view', flat=True).distinct().order_by('view')
+    )
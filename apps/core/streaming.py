@@ -0,0 +1,39 @@
+"""
+Streamed response bodies that stay streamed under ASGI.
+
+Django serves a ``StreamingHttpResponse`` over a synchronous iterator under
+ASGI by collecting the whole iterator into a list in a worker thread first,
+so a large export would be buffered in memory and its first byte delayed
+until the last was produced. ``stream_chunks`` gives ASGI requests an
+asynchronous iterator that produces one chunk at a time in the request's
+sync thread, where the ORM queries behind the chunks belong; WSGI requests
+get the iterator unchanged.
+"""
+from asgiref.sync import sync_to_async
+from django.core.handlers.asgi import ASGIRequest
+
+_DONE = object()
+
+
+async def _pull(chunks):
+    pull = sync_to_async(next, thread_sensitive=True)
+    try:
+        while True:
+            chunk = await pull(chunks, _DONE)
+            if chunk is _DONE:
+                return
+            yield chunk
+    finally:
+        # A disconnected client stops the stream early; let the producer
+        # release its cursor in the thread it ran in.
+        close = getattr(chunks, 'close', None)
+        if close is not None:
+            await sync_to_async(close, thread_sensitive=True)()
+
+
+def stream_chunks(request, chunks):
+    """Return ``chunks`` in the form the request's handler streams lazily."""
+    chunks = iter(chunks)
+    if isinstance(request, ASGIRequest):
+        return _pull(chunks)
+    return chunks
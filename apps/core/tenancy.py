@@ -0,0 +1,116 @@
+"""
+Organization (tenant) scoping.
+
+``TenantMiddleware`` records the signed-in user's organization in a context
+variable for the duration of the request; ``TenantManager`` - the default
+manager of tenant-owned models - then filters every queryset to it. Code
+running outside a request (management commands, background threads) or on
+behalf of a superuser is unscoped.
+
+Cache keys are namespaced per organization so that invalidating one
+tenant's entries leaves every other tenant's untouched.
+"""
+from contextlib import contextmanager
+from contextvars import ContextVar
+from django.contrib.auth.models import UserManager
+from django.core.cache import cache
+from django.db import models
+from .middleware import HybridMiddleware
+
+# Matches no organization; used for signed-in users without one.
+NO_ORGANIZATION = 0
+
+_current_organization = ContextVar('current_organization', default=None)
+
+
+def get_current_organization_id():
+    """Return the organization the current request is scoped to, if any."""
+    return _current_organization.get()
+
+
+@contextmanager
+def scoped_to(organization_id):
+    """Scope tenant managers to ``organization_id`` (``None`` lifts scoping)."""
+    token = _current_organization.set(organization_id)
+    try:
+        yield
+    finally:
+        _current_organization.reset(token)
+
+
+def unscoped():
+    """Run cross-tenant work, such as shared aggregates, without scoping."""
+    return scoped_to(None)
+
+
+class TenantManager(models.Manager):
+    """
+    Manager filtering rows to the current organization. Models that reach
+    their tenant through a relation subclass it with another
+    ``tenant_field`` (a class attribute, so related managers keep it).
+    """
+
+    tenant_field = 'organization'
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        organization_id = get_current_organization_id()
+        if organization_id is None:
+            return queryset
+        return queryset.filter(**{self.tenant_field: organization_id})
+
+
+class TenantUserManager(UserManager):
+    """``UserManager`` filtering users to the current organization."""
+
+    def get_queryset(self):
+        queryset = super().get_queryset()
+        organization_id = get_current_organization_id()
+        if organization_id is None:
+            return queryset
+        return queryset.filter(organization=organization_id)
+
+
+def organization_for(user):
+    """Return the organization ``user``'s requests are scoped to."""
+    if not user.is_authenticated or user.is_superuser:
+        return None
+    return user.organization_id or NO_ORGANIZATION
+
+
+class TenantMiddleware(HybridMiddleware):
+    """Scope tenant managers to the signed-in user's organization."""
+
+    def handle(self, request):
+        with scoped_to(organization_for(request.user)):
+            return self.get_response(request)
+
+    async def ahandle(self, request):
+        with scoped_to(organization_for(await request.auser())):
+            return await self.get_response(request)
+
+
+def cache_key(organization_id, *parts):
+    """Build a cache key inside an organization's namespace."""
+    namespace = 'global' if organization_id is None else organization_id
+    return ':'.join(['org', str(namespace), *map(str, parts)])
+
+
+def organization_ids():
+    """Every cache namespace in use: each organization plus the global one."""
+    from apps.users.models import Organization
+    return [None, *Organization.objects.values_list('pk', flat=True)]
+
+
+def get_or_set_version(organization_id, name):
+    """Return the current version counter of a namespaced cache family."""
+    return cache.get_or_set(cache_key(organization_id, name, 'version'), 1, None)
+
+
+def bump_version(organization_id, name):
+    """Expire a namespaced cache family by moving to a new version."""
+    key = cache_key(organization_id, name, 'version')
+    try:
+        cache.incr(key)
+    except ValueError:
+        cache.set(key, 1, None)
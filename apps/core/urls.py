@@ -7,4 +7,12 @@ from . import views
 urlpatterns = [
     path('', views.home, name='home'),
     path('dashboard/', views.dashboard, name='dashboard'),
+    path('dashboard/widgets/<slug:name>/', views.dashboard_widget, name='dashboard_widget'),
+    path('inbox/', views.inbox, name='inbox'),
+    path('events/', views.events, name='events'),
+    path('profiles/', views.profile_list, name='profile_list'),
+    path('profiles/<str:profile_id>/', views.profile_detail, name='profile_detail'),
+    path('profiles/<str:profile_id>/download/', views.profile_download, name='profile_download'),
+    path('slow-queries/', views.slow_query_report, name='slow_query_report'),
+    path('metrics', views.prometheus_metrics, name='metrics'),
 ]
@@ -2,11 +2,26 @@
 Core views for DP-COMPASS platform.
 Dashboard and home page views.
 """
+from django.conf import settings
 from django.shortcuts import render, redirect
+from django.contrib import messages
 from django.contrib.auth.decorators import login_required
-from django.db.models import Count, Q
+from django.core.cache import cache
+from django.core.handlers.asgi import ASGIRequest
+from django.core.paginator import Paginator
+from django.db.models import Count
+from django.http import FileResponse, Http404, HttpResponse, StreamingHttpResponse
+from django.template.loader import render_to_string
+from django.utils.crypto import constant_time_compare
+from django.utils.cache import patch_cache_control
 from apps.compliance.models import Application, ComplianceScore
-from apps.audits.models import Audit, AuditResponse
+from apps.audits.models import PROGRESS_COUNTS, Audit, ChecklistItem
+from apps.audits import status_vector
+from . import metrics, profiling, slow_queries, tenancy
+from .events import broker, format_event
+from .inbox import inbox_queryset
+
+EVENT_HEARTBEAT_SECONDS = 15
 
 
 def home(request):
@@ -16,12 +31,8 @@ def home(request):
     return render(request, 'core/home.html')
 
 
-@login_required
-def dashboard(request):
-    """Main dashboard with compliance overview."""
-    user = request.user
-    
-    # Base querysets
+def _scoped_querysets(user):
+    """Return the application, audit and score querysets visible to ``user``."""
     app_qs = Application.objects.all()
     audit_qs = Audit.objects.all()
     score_qs = ComplianceScore.objects.select_related('application')
@@ -35,14 +46,236 @@ def dashboard(request):
         app_qs = app_qs.filter(owner=user)
         audit_qs = audit_qs.filter(application__owner=user)
         score_qs = score_qs.filter(application__owner=user)
-        
-    context = {
+    
+    return app_qs, audit_qs, score_qs
+
+
+def _counts_widget(user):
+    app_qs, audit_qs, _ = _scoped_querysets(user)
+    status_counts = dict(
+        audit_qs.order_by().values_list('status').annotate(count=Count('pk'))
+    )
+    return {
         'total_applications': app_qs.count(),
-        'pending_audits': audit_qs.filter(status='pending').count(),
-        'completed_audits': audit_qs.filter(status='completed').count(),
-        'in_progress_audits': audit_qs.filter(status='in_progress').count(),
-        'recent_audits': audit_qs.order_by('-created_at')[:5],
-        'compliance_scores': score_qs.order_by('-calculated_at')[:5],
+        'pending_audits': status_counts.get('pending', 0),
+        'completed_audits': status_counts.get('completed', 0),
+        'in_progress_audits': status_counts.get('in_progress', 0),
     }
+
+
+def _recent_audits_widget(user):
+    _, audit_qs, _ = _scoped_querysets(user)
+    return {
+        'recent_audits': audit_qs.select_related(
+            'application', 'archive'
+        ).annotate(**PROGRESS_COUNTS).order_by('-created_at')[:5],
+    }
+
+
+def _recent_scores_widget(user):
+    _, _, score_qs = _scoped_querysets(user)
+    return {'compliance_scores': score_qs.order_by('-calculated_at')[:5]}
+
+
+def _heatmap_widget(user):
+    _, audit_qs, _ = _scoped_querysets(user)
+    counts = status_vector.item_status_counts(audit_qs.values('pk'))
+    items = ChecklistItem.objects.filter(
+        ordinal__in=counts.keys()
+    ).order_by('category__order', 'order', 'code')
+    cells = []
+    for item in items:
+        statuses = counts[item.ordinal]
+        reviewed = sum(statuses.values()) - statuses['pending'] - statuses['not_applicable']
+        failing = statuses['non_compliant'] + statuses['partially_compliant']
+        if reviewed:
+            cells.append({
+                'item': item,
+                'reviewed': reviewed,
+                'failing': failing,
+                'heat': round(failing / reviewed, 2),
+            })
+    return {'cells': cells}
+
+
+# name -> (context builder, cache timeout in seconds)
+DASHBOARD_WIDGETS = {
+    'counts': (_counts_widget, 60),
+    'recent_audits': (_recent_audits_widget, 30),
+    'recent_scores': (_recent_scores_widget, 120),
+    'heatmap': (_heatmap_widget, 300),
+}
+
+
+@login_required
+def dashboard(request):
+    """Main dashboard shell; widgets are fetched separately by the browser."""
+    return render(request, 'core/dashboard.html')
+
+
+@login_required
+def dashboard_widget(request, name):
+    """Render one dashboard widget fragment, cached per user."""
+    if name not in DASHBOARD_WIDGETS:
+        raise Http404('Unknown widget')
+    
+    builder, timeout = DASHBOARD_WIDGETS[name]
+    key = tenancy.cache_key(
+        tenancy.organization_for(request.user), 'dashboard', name, request.user.pk
+    )
+    html = cache.get(key)
+    if html is None:
+        html = render_to_string(
+            f'core/widgets/{name}.html', builder(request.user), request=request
+        )
+        cache.set(key, html, timeout)
     
-    return render(request, 'core/dashboard.html', context)
+    response = HttpResponse(html)
+    patch_cache_control(response, private=True, max_age=timeout)
+    return response
+
+
+@login_required
+def inbox(request):
+    """Unified list of the user's open remediations, audits, reviews and approvals."""
+    paginator = Paginator(inbox_queryset(request.user), 25)
+    page = paginator.get_page(request.GET.get('page'))
+    return render(request, 'core/inbox.html', {'page': page})
+
+
+async def events(request):
+    """
+    Server-sent events feed of live audit progress.
+    
+    ``?audit=<pk>`` follows one audit; without it admins receive the
+    dashboard feed. Only served under ASGI: a WSGI worker would be tied
+    up for the lifetime of the stream, so there the endpoint answers
+    204, which tells ``EventSource`` not to reconnect.
+    """
+    user = await request.auser()
+    if not user.is_authenticated:
+        return HttpResponse(status=401)
+    if not isinstance(request, ASGIRequest):
+        return HttpResponse(status=204)
+    
+    audit_id = request.GET.get('audit', '')
+    if audit_id:
+        audit = None
+        if audit_id.isdigit():
+            audit = await Audit.objects.select_related('application').filter(
+                pk=audit_id
+            ).afirst()
+        if audit is None:
+            raise Http404('Audit not found')
+        if not (user.is_admin_user or
+                audit.auditor_id == user.pk or
+                audit.application.owner_id == user.pk):
+            return HttpResponse(status=403)
+        topics = [f'audit:{audit.pk}']
+    elif user.is_admin_user:
+        topics = ['dashboard']
+    else:
+        return HttpResponse(status=403)
+    
+    async def stream():
+        subscription = broker.subscribe(topics)
+        try:
+            yield 'retry: 5000\n\n'
+            while True:
+                event = await subscription.get(timeout=EVENT_HEARTBEAT_SECONDS)
+                yield ': keep-alive\n\n' if event is None else format_event(*event)
+        finally:
+            subscription.close()
+    
+    response = StreamingHttpResponse(stream(), content_type='text/event-stream')
+    response['Cache-Control'] = 'no-cache'
+    response['X-Accel-Buffering'] = 'no'
+    return response
+
+
+def _admin_only(request):
+    if request.user.is_admin_user:
+        return None
+    messages.error(request, 'Access denied. Administrator privileges required.')
+    return redirect('dashboard')
+
+
+@login_required
+def profile_list(request):
+    """Recent request profiles (admin only)."""
+    denied = _admin_only(request)
+    if denied:
+        return denied
+    return render(request, 'core/profile_list.html', {
+        'profiles': profiling.list_profiles(),
+        'query_flag': profiling.QUERY_FLAG,
+    })
+
+
+@login_required
+def profile_detail(request, profile_id):
+    """Icicle chart and hottest functions of one profile (admin only)."""
+    denied = _admin_only(request)
+    if denied:
+        return denied
+    loaded = profiling.load_profile(profile_id)
+    if loaded is None:
+        raise Http404('No such profile.')
+    meta, stats, stacks = loaded
+    return render(request, 'core/profile_detail.html', {
+        'profile': meta,
+        'levels': profiling.flame_levels(stacks),
+        'functions': profiling.top_functions(stats),
+    })
+
+
+@login_required
+def profile_download(request, profile_id):
+    """The raw ``.prof`` file, for pstats or snakeviz (admin only)."""
+    denied = _admin_only(request)
+    if denied:
+        return denied
+    path = profiling.profile_path(profile_id)
+    if path is None:
+        raise Http404('No such profile.')
+    return FileResponse(open(path, 'rb'), as_attachment=True, filename=path.name)
+
+
+@login_required
+def slow_query_report(request):
+    """Slow queries aggregated by fingerprint (admin only)."""
+    denied = _admin_only(request)
+    if denied:
+        return denied
+    try:
+        days = min(max(int(request.GET.get('days', 7)), 1), 90)
+    except ValueError:
+        days = 7
+    view = request.GET.get('view', '')
+    return render(request, 'core/slow_query_report.html', {
+        'queries': slow_queries.report(days=days, view=view),
+        'views': slow_queries.logged_views(days=days),
+        'days': days,
+        'view': view,
+        'threshold_ms': settings.SLOW_QUERY_THRESHOLD_MS,
+        'sample_rate': settings.SLOW_QUERY_SAMPLE_RATE,
+    })
+
+
+def prometheus_metrics(request):
+    """
+    Prometheus scrape endpoint. Scrapers must send ``METRICS_TOKEN`` as a
+    bearer token; without a configured token the endpoint only answers
+    when ``DEBUG`` is on.
+    """
+    token = settings.METRICS_TOKEN
+    if not token and not settings.DEBUG:
+        raise Http404
+    if not metrics.enabled():
+        return HttpResponse(
+            'Metrics are disabled or prometheus_client is not installed.',
+            status=503, content_type='text/plain',
+        )
+    if token and not constant_time_compare(request.headers.get('Authorization', ''), f'Bearer {token}'):
+        return HttpResponse('Unauthorized', status=401, content_type='text/plain')
+    return HttpResponse(metrics.exposition(), content_type=metrics.CONTENT_TYPE)
@@ -0,0 +1,18 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:01
+
+from django.db import migrations, models
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('reports', '0002_initial'),
+    ]
+
+    operations = [
+        migrations.AddField(
+            model_name='compliancereport',
+            name='fingerprint',
+            field=models.CharField(blank=True, editable=False, help_text='Hash of the audit, its latest response change and the template version', max_length=64, null=True, unique=True),
+        ),
+    ]
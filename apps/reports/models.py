@@ -1,9 +1,16 @@
 """
 Report models for compliance report generation.
 """
+import hashlib
+
 from django.db import models
 from django.conf import settings
-from apps.core.models import TimeStampedModel
+from apps.core.models import LoadedFieldsMixin, TimeStampedModel
+from apps.core.tenancy import TenantManager
+
+
+class ReportManager(TenantManager):
+    tenant_field = 'audit__organization'
 
 
 class ReportTemplate(TimeStampedModel):
@@ -26,9 +33,13 @@ class ReportTemplate(TimeStampedModel):
         return self.name
 
 
-class ComplianceReport(TimeStampedModel):
+class ComplianceReport(LoadedFieldsMixin, TimeStampedModel):
     """Generated compliance reports."""
     
+    # Bump whenever the way reports are computed or rendered changes, so
+    # that previously generated reports are no longer treated as current.
+    RENDERER_VERSION = 1
+    
     STATUS_CHOICES = [
         ('draft', 'Draft'),
         ('generated', 'Generated'),
@@ -75,6 +86,18 @@ class ComplianceReport(TimeStampedModel):
         related_name='approved_reports'
     )
     approved_at = models.DateTimeField(null=True, blank=True)
+    fingerprint = models.CharField(
+        max_length=64,
+        unique=True,
+        null=True,
+        blank=True,
+        editable=False,
+        help_text='Hash of the audit, its latest response change and the template version'
+    )
+
+    # Compared on save by the inbox signal handlers.
+    loaded_fields = ['status']
+    objects = ReportManager()
 
     class Meta:
         db_table = 'compliance_reports'
@@ -84,3 +107,18 @@ class ComplianceReport(TimeStampedModel):
 
     def __str__(self):
         return f"{self.title} - {self.audit.application.name}"
+    
+    @classmethod
+    def compute_fingerprint(cls, audit, template=None):
+        """Fingerprint the inputs a report for ``audit`` would be built from."""
+        last_modified = audit.responses_last_modified()
+        template_version = (
+            f'{template.pk}@{template.updated_at.isoformat()}' if template else 'default'
+        )
+        key = ':'.join([
+            str(audit.pk),
+            last_modified.isoformat() if last_modified else '',
+            template_version,
+            str(cls.RENDERER_VERSION),
+        ])
+        return hashlib.sha256(key.encode('utf-8')).hexdigest()
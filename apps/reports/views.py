@@ -4,11 +4,14 @@ Report views for generating and viewing compliance reports.
 from django.shortcuts import render, redirect, get_object_or_404
 from django.contrib.auth.decorators import login_required
 from django.contrib import messages
-from django.http import HttpResponse
-from django.template.loader import render_to_string
+from django.db import IntegrityError, transaction
+from django.http import StreamingHttpResponse
+from django.template.loader import get_template
 from django.utils import timezone
 from .models import ComplianceReport, ReportTemplate
 from apps.audits.models import Audit
+from apps.core.metrics import observe_report_render, timed_stream
+from apps.core.streaming import stream_chunks
 
 
 @login_required
@@ -33,6 +36,30 @@ def report_detail(request, pk):
     return render(request, 'reports/report_detail.html', {'report': report})
 
 
+def _create_report(request, audit, template, title, fingerprint):
+    """Calculate scores for ``audit`` and store a new generated report."""
+    if audit.is_archived:
+        total = audit.archive.response_count - audit.archive.pending_count
+        compliant = audit.archive.compliant_count
+    else:
+        responses = audit.responses.all()
+        total = responses.exclude(status='pending').count()
+        compliant = responses.filter(status='compliant').count()
+    
+    compliance_score = round((compliant / total) * 100, 2) if total > 0 else 0
+    
+    return ComplianceReport.objects.create(
+        audit=audit,
+        template=template,
+        title=title,
+        summary=f'Compliance assessment completed with score of {compliance_score}%',
+        generated_by=request.user,
+        generated_at=timezone.now(),
+        status='generated',
+        fingerprint=fingerprint,
+    )
+
+
 @login_required
 def report_generate(request, audit_id):
     """Generate a new compliance report from an audit."""
@@ -44,24 +71,29 @@ def report_generate(request, audit_id):
     
     if request.method == 'POST':
         title = request.POST.get('title', f'Compliance Report - {audit.application.name}')
+        template = None
+        if request.POST.get('template', '').isdigit():
+            template = ReportTemplate.objects.filter(
+                pk=request.POST['template'], is_active=True
+            ).first()
         
-        # Calculate scores
-        responses = audit.responses.all()
-        total = responses.exclude(status='pending').count()
-        compliant = responses.filter(status='compliant').count()
-        non_compliant = responses.filter(status='non_compliant').count()
-        
-        compliance_score = round((compliant / total) * 100, 2) if total > 0 else 0
+        fingerprint = ComplianceReport.compute_fingerprint(audit, template)
+        existing = ComplianceReport.objects.filter(fingerprint=fingerprint).first()
+        if existing:
+            messages.info(request, 'An up-to-date report already exists for this audit.')
+            return redirect('report_detail', pk=existing.pk)
         
-        # Create report
-        report = ComplianceReport.objects.create(
-            audit=audit,
-            title=title,
-            summary=f'Compliance assessment completed with score of {compliance_score}%',
-            generated_by=request.user,
-            generated_at=timezone.now(),
-            status='generated'
-        )
+        try:
+            with transaction.atomic():
+                # Concurrent submissions for the same audit queue up on the
+                # audit row; whoever gets it second finds the first's report.
+                Audit.objects.select_for_update().filter(pk=audit.pk).first()
+                report = ComplianceReport.objects.filter(fingerprint=fingerprint).first()
+                if report is None:
+                    with observe_report_render('generate'):
+                        report = _create_report(request, audit, template, title, fingerprint)
+        except IntegrityError:
+            report = ComplianceReport.objects.get(fingerprint=fingerprint)
         
         messages.success(request, 'Report generated successfully.')
         return redirect('report_detail', pk=report.pk)
@@ -73,20 +105,57 @@ def report_generate(request, audit_id):
     })
 
 
+def _stream_report(report, chunk_size=200):
+    """
+    Yield the report HTML piece by piece: the header, then the responses
+    of each category in chunks of ``chunk_size``, then the footer.
+    """
+    audit = report.audit
+    context = {'report': report, 'audit': audit}
+    yield get_template('reports/report_pdf_header.html').render(context)
+    
+    responses_template = get_template('reports/report_pdf_responses.html')
+    if audit.is_archived:
+        responses = iter(audit.get_responses())
+    else:
+        responses = audit.responses.select_related(
+            'checklist_item', 'checklist_item__category'
+        ).order_by(
+            'checklist_item__category__order', 'checklist_item__category__name',
+            'checklist_item__order', 'checklist_item__code'
+        ).iterator(chunk_size=chunk_size)
+    
+    category = None
+    chunk = []
+    for response in responses:
+        if response.checklist_item.category != category or len(chunk) >= chunk_size:
+            if chunk:
+                yield responses_template.render({'responses': chunk})
+                chunk = []
+            if response.checklist_item.category != category:
+                category = response.checklist_item.category
+                yield responses_template.render({'category': category, 'responses': []})
+        chunk.append(response)
+    if chunk:
+        yield responses_template.render({'responses': chunk})
+    
+    yield get_template('reports/report_pdf_footer.html').render(context)
+
+
 @login_required
 def report_export_pdf(request, pk):
     """Export report as PDF."""
-    report = get_object_or_404(ComplianceReport, pk=pk)
-    
-    # Generate HTML content
-    html_content = render_to_string('reports/report_pdf_template.html', {
-        'report': report,
-        'audit': report.audit,
-        'responses': report.audit.responses.all(),
-    })
+    report = get_object_or_404(
+        ComplianceReport.objects.select_related('audit__application', 'audit__auditor'),
+        pk=pk
+    )
     
-    # For now, return HTML (PDF generation requires WeasyPrint setup)
-    response = HttpResponse(html_content, content_type='text/html')
+    # Stream the HTML so large audits neither buffer the whole document in
+    # memory nor delay the first byte (PDF generation requires WeasyPrint setup)
+    response = StreamingHttpResponse(
+        stream_chunks(request, timed_stream(_stream_report(report), 'export')),
+        content_type='text/html'
+    )
     response['Content-Disposition'] = f'attachment; filename="{report.title}.html"'
     return response
 
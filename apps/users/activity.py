@@ -0,0 +1,134 @@
+"""
+Buffered writer for the user activity audit trail.
+
+Signal handlers call ``recorder.record``, which only appends to an
+in-memory buffer. A background thread writes the buffer with a single
+``bulk_create`` once it holds ``ACTIVITY_FLUSH_SIZE`` entries or every
+``ACTIVITY_FLUSH_INTERVAL`` seconds, and whatever is left is flushed at
+interpreter shutdown.
+
+Actions on records are attributed to the user making the request, which
+``ActivityMiddleware`` makes available to ``record_action``; the owner or
+auditor stored on the record may be someone else.
+"""
+import atexit
+import logging
+import os
+import threading
+from contextvars import ContextVar
+from django.apps import apps
+from django.conf import settings
+from django.db import connection, transaction
+from django.utils import timezone
+from apps.core.middleware import HybridMiddleware
+
+logger = logging.getLogger(__name__)
+
+_request = ContextVar('activity_request', default=None)
+
+
+class ActivityRecorder:
+    """Collects ``UserActivity`` rows and writes them in batches."""
+
+    model = 'users.UserActivity'
+    thread_name = 'activity-recorder'
+
+    def __init__(self, flush_size=100, flush_interval=5.0):
+        self.flush_size = flush_size
+        self.flush_interval = flush_interval
+        self._buffer = []
+        self._lock = threading.Lock()
+        self._wakeup = threading.Event()
+        self._thread = None
+        self._pid = None
+
+    def record(self, user_id, action, details='', ip_address=None):
+        """Queue an activity entry once the surrounding transaction commits."""
+        if user_id is None:
+            return
+        from .models import UserActivity
+        entry = UserActivity(
+            user_id=user_id,
+            action=action,
+            details=details,
+            ip_address=ip_address,
+            created_at=timezone.now(),
+        )
+        transaction.on_commit(lambda: self._append(entry))
+
+    def _append(self, entry):
+        with self._lock:
+            self._buffer.append(entry)
+            full = len(self._buffer) >= self.flush_size
+            self._ensure_thread()
+        if full:
+            self._wakeup.set()
+
+    def _ensure_thread(self):
+        # Forked workers do not inherit the parent's thread.
+        if self._thread is not None and self._pid == os.getpid() and self._thread.is_alive():
+            return
+        self._pid = os.getpid()
+        self._thread = threading.Thread(
+            target=self._run, name=self.thread_name, daemon=True
+        )
+        self._thread.start()
+
+    def _run(self):
+        while True:
+            self._wakeup.wait(self.flush_interval)
+            self._wakeup.clear()
+            self.flush()
+            connection.close()
+
+    def pending(self):
+        """Number of entries waiting to be written."""
+        with self._lock:
+            return len(self._buffer)
+
+    def flush(self):
+        """Write all buffered entries; returns the number written."""
+        with self._lock:
+            entries, self._buffer = self._buffer, []
+        if not entries:
+            return 0
+        model = apps.get_model(self.model)
+        try:
+            model.objects.bulk_create(entries, batch_size=self.flush_size)
+        except Exception:
+            logger.exception('Dropped %d %s entries', len(entries), model._meta.verbose_name)
+            return 0
+        return len(entries)
+
+
+recorder = ActivityRecorder(
+    flush_size=getattr(settings, 'ACTIVITY_FLUSH_SIZE', 100),
+    flush_interval=getattr(settings, 'ACTIVITY_FLUSH_INTERVAL', 5.0),
+)
+atexit.register(recorder.flush)
+
+
+def record_action(action, details=''):
+    """Record ``action`` against the signed-in user of the current request."""
+    request = _request.get()
+    if request is None or not request.user.is_authenticated:
+        return
+    recorder.record(request.user.pk, action, details, ip_address=request.META.get('REMOTE_ADDR'))
+
+
+class ActivityMiddleware(HybridMiddleware):
+    """Make the current request's user the actor of recorded actions."""
+
+    def handle(self, request):
+        token = _request.set(request)
+        try:
+            return self.get_response(request)
+        finally:
+            _request.reset(token)
+
+    async def ahandle(self, request):
+        token = _request.set(request)
+        try:
+            return await self.get_response(request)
+        finally:
+            _request.reset(token)
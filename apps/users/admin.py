@@ -1,21 +1,29 @@
 from django.contrib import admin
 from django.contrib.auth.admin import UserAdmin as BaseUserAdmin
-from .models import User, UserActivity
+from .models import Organization, User, UserActivity
+
+
+@admin.register(Organization)
+class OrganizationAdmin(admin.ModelAdmin):
+    list_display = ('name', 'slug', 'is_active', 'created_at')
+    list_filter = ('is_active',)
+    search_fields = ('name', 'slug')
+    prepopulated_fields = {'slug': ('name',)}
 
 
 @admin.register(User)
 class UserAdmin(BaseUserAdmin):
     list_display = ('username', 'email', 'first_name', 'last_name', 'role', 'organization', 'is_verified', 'is_active')
-    list_filter = ('role', 'is_verified', 'is_active', 'is_staff')
-    search_fields = ('username', 'email', 'first_name', 'last_name', 'organization')
+    list_filter = ('role', 'organization', 'is_verified', 'is_active', 'is_staff')
+    search_fields = ('username', 'email', 'first_name', 'last_name', 'organization__name', 'department')
     ordering = ('-date_joined',)
     
     fieldsets = BaseUserAdmin.fieldsets + (
-        ('DP-COMPASS Info', {'fields': ('role', 'organization', 'designation', 'phone', 'is_verified')}),
+        ('DP-COMPASS Info', {'fields': ('role', 'organization', 'department', 'designation', 'phone', 'is_verified')}),
     )
     
     add_fieldsets = BaseUserAdmin.add_fieldsets + (
-        ('DP-COMPASS Info', {'fields': ('role', 'organization', 'designation', 'phone')}),
+        ('DP-COMPASS Info', {'fields': ('role', 'organization', 'department', 'designation', 'phone')}),
     )
 
 
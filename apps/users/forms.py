@@ -7,12 +7,17 @@ from .models import User
 
 
 class UserRegistrationForm(UserCreationForm):
-    """Form for new user registration."""
+    """
+    Form for new user registration.
+    
+    Registrants do not pick an organization: an administrator assigns one
+    when approving the account, and until then it sees no tenant's data.
+    """
     
     email = forms.EmailField(required=True)
     first_name = forms.CharField(max_length=30, required=True)
     last_name = forms.CharField(max_length=30, required=True)
-    organization = forms.CharField(max_length=255, required=True)
+    department = forms.CharField(max_length=255, required=False)
     designation = forms.CharField(max_length=100, required=False)
     phone = forms.CharField(max_length=20, required=False)
     
@@ -20,7 +25,7 @@ class UserRegistrationForm(UserCreationForm):
         model = User
         fields = [
             'username', 'email', 'first_name', 'last_name',
-            'role', 'organization', 'designation', 'phone',
+            'role', 'department', 'designation', 'phone',
             'password1', 'password2'
         ]
     
@@ -37,7 +42,7 @@ class UserProfileForm(forms.ModelForm):
         model = User
         fields = [
             'first_name', 'last_name', 'email',
-            'organization', 'designation', 'phone'
+            'department', 'designation', 'phone'
         ]
     
     def __init__(self, *args, **kwargs):
@@ -0,0 +1,71 @@
+# Generated by Django 5.2.18 on 2026-10-19 11:40
+
+import apps.core.tenancy
+import django.db.models.deletion
+from django.conf import settings
+from django.db import migrations, models
+
+
+def assign_default_organization(apps, schema_editor):
+    User = apps.get_model('users', 'User')
+    Organization = apps.get_model('users', 'Organization')
+    if not User.objects.exists():
+        return
+    organization, _ = Organization.objects.get_or_create(
+        slug=settings.DEFAULT_ORGANIZATION_SLUG,
+        defaults={'name': settings.DEFAULT_ORGANIZATION_NAME},
+    )
+    User.objects.filter(organization__isnull=True).update(organization=organization)
+
+
+class Migration(migrations.Migration):
+
+    dependencies = [
+        ('users', '0002_activity_indexes'),
+    ]
+
+    operations = [
+        migrations.CreateModel(
+            name='Organization',
+            fields=[
+                ('id', models.BigAutoField(auto_created=True, primary_key=True, serialize=False, verbose_name='ID')),
+                ('created_at', models.DateTimeField(auto_now_add=True)),
+                ('updated_at', models.DateTimeField(auto_now=True)),
+                ('name', models.CharField(max_length=255, unique=True)),
+                ('slug', models.SlugField(max_length=100, unique=True)),
+                ('is_active', models.BooleanField(default=True)),
+            ],
+            options={
+                'verbose_name': 'Organization',
+                'verbose_name_plural': 'Organizations',
+                'db_table': 'organizations',
+                'ordering': ['name'],
+            },
+        ),
+        migrations.RenameField(
+            model_name='user',
+            old_name='organization',
+            new_name='department',
+        ),
+        migrations.AlterField(
+            model_name='user',
+            name='department',
+            field=models.CharField(blank=True, help_text='Department or team name', max_length=255),
+        ),
+        migrations.AddField(
+            model_name='user',
+            name='organization',
+            field=models.ForeignKey(blank=True, null=True, on_delete=django.db.models.deletion.PROTECT, related_name='users', to='users.organization'),
+        ),
+        migrations.RunPython(assign_default_organization, migrations.RunPython.noop),
+        migrations.AddIndex(
+            model_name='user',
+            index=models.Index(fields=['organization', 'role'], name='user_org_role_idx'),
+        ),
+        migrations.AlterModelManagers(
+            name='user',
+            managers=[
+                ('objects', apps.core.tenancy.TenantUserManager()),
+            ],
+        ),
+    ]
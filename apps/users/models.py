@@ -2,9 +2,38 @@
 Custom User model for DP-COMPASS platform.
 Supports role-based access for Auditors, Developers, and Administrators.
 """
+from django.conf import settings
 from django.contrib.auth.models import AbstractUser
 from django.db import models
+from django.utils import timezone
 from apps.core.models import TimeStampedModel
+from apps.core.tenancy import TenantUserManager
+
+
+class Organization(TimeStampedModel):
+    """A tenant: the organization that owns users and applications."""
+    
+    name = models.CharField(max_length=255, unique=True)
+    slug = models.SlugField(max_length=100, unique=True)
+    is_active = models.BooleanField(default=True)
+
+    class Meta:
+        db_table = 'organizations'
+        ordering = ['name']
+        verbose_name = 'Organization'
+        verbose_name_plural = 'Organizations'
+
+    def __str__(self):
+        return self.name
+    
+    @classmethod
+    def get_default(cls):
+        """Return the organization that users without one are placed in."""
+        organization, _ = cls.objects.get_or_create(
+            slug=settings.DEFAULT_ORGANIZATION_SLUG,
+            defaults={'name': settings.DEFAULT_ORGANIZATION_NAME},
+        )
+        return organization
 
 
 class User(AbstractUser):
@@ -22,10 +51,17 @@ class User(AbstractUser):
         default='developer',
         help_text='User role determines access permissions'
     )
-    organization = models.CharField(
+    organization = models.ForeignKey(
+        Organization,
+        on_delete=models.PROTECT,
+        null=True,
+        blank=True,
+        related_name='users'
+    )
+    department = models.CharField(
         max_length=255, 
         blank=True,
-        help_text='Organization or department name'
+        help_text='Department or team name'
     )
     designation = models.CharField(
         max_length=100, 
@@ -38,14 +74,27 @@ class User(AbstractUser):
         help_text='Verified by administrator'
     )
 
+    objects = TenantUserManager()
+
     class Meta:
         db_table = 'users'
         verbose_name = 'User'
         verbose_name_plural = 'Users'
+        indexes = [
+            models.Index(fields=['organization', 'role'], name='user_org_role_idx'),
+        ]
 
     def __str__(self):
         return f"{self.get_full_name() or self.username} ({self.get_role_display()})"
     
+    def save(self, *args, **kwargs):
+        # Superusers operate across tenants; every verified user belongs to
+        # one. Self-registered accounts stay outside all tenants until an
+        # administrator verifies them and assigns their organization.
+        if self.organization_id is None and self.is_verified and not self.is_superuser:
+            self.organization = Organization.get_default()
+        super().save(*args, **kwargs)
+    
     @property
     def is_auditor(self):
         return self.role == 'auditor'
@@ -75,10 +124,16 @@ class UserActivity(TimeStampedModel):
     action = models.CharField(max_length=50, choices=ACTION_CHOICES)
     details = models.TextField(blank=True)
     ip_address = models.GenericIPAddressField(null=True, blank=True)
+    # Set when the activity is recorded, not when the buffered row is written.
+    created_at = models.DateTimeField(default=timezone.now)
 
     class Meta:
         db_table = 'user_activities'
         ordering = ['-created_at']
+        indexes = [
+            models.Index(fields=['user', '-created_at'], name='user_activity_user_time_idx'),
+            models.Index(fields=['action', '-created_at'], name='user_activity_action_time_idx'),
+        ]
         verbose_name = 'User Activity'
         verbose_name_plural = 'User Activities'
 
@@ -0,0 +1,49 @@
+"""
+Signal handlers feeding the user activity audit trail. Record changes are
+attributed to the user of the request that made them; changes made
+outside a request (management commands, data loads) are not recorded.
+"""
+from django.contrib.auth.signals import user_logged_in, user_logged_out
+from django.db.models.signals import post_save
+from django.dispatch import receiver
+from apps.audits.models import Audit
+from apps.compliance.models import Application
+from apps.reports.models import ComplianceReport
+from .activity import record_action, recorder
+
+
+@receiver(user_logged_in)
+def record_login(sender, request, user, **kwargs):
+    recorder.record(user.pk, 'login', ip_address=request.META.get('REMOTE_ADDR'))
+
+
+@receiver(user_logged_out)
+def record_logout(sender, request, user, **kwargs):
+    if user is not None:
+        recorder.record(user.pk, 'logout', ip_address=request.META.get('REMOTE_ADDR'))
+
+
+@receiver(post_save, sender=Audit)
+def record_audit(sender, instance, raw=False, created=False, **kwargs):
+    if raw:
+        return
+    details = f'Audit #{instance.pk}: {instance.title}'
+    if created:
+        record_action('audit_create', details)
+    # _previous_status is set by the audits app's pre_save handler.
+    if instance.status == 'completed' and getattr(instance, '_previous_status', None) != 'completed':
+        record_action('audit_complete', details)
+
+
+@receiver(post_save, sender=ComplianceReport)
+def record_report(sender, instance, raw=False, created=False, **kwargs):
+    if raw or not created:
+        return
+    record_action('report_generate', f'Report #{instance.pk}: {instance.title}')
+
+
+@receiver(post_save, sender=Application)
+def record_application(sender, instance, raw=False, created=False, **kwargs):
+    if raw or not created:
+        return
+    record_action('app_register', f'Application #{instance.pk}: {instance.name}')
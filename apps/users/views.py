@@ -83,5 +83,5 @@ def user_list(request):
         messages.error(request, 'Access denied. Administrator privileges required.')
         return redirect('dashboard')
     
-    users = User.objects.all().order_by('-date_joined')
+    users = User.objects.select_related('organization').order_by('-date_joined')
     return render(request, 'users/user_list.html', {'users': users})
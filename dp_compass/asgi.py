@@ -1,5 +1,8 @@
 """
 ASGI config for DP-COMPASS project.
+
+Serving through this entry point enables the live server-sent events feed
+at ``/events/`` (see ``apps.core.views.events``).
 """
 
 import os
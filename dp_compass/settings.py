@@ -58,12 +58,20 @@ INSTALLED_APPS = [
 ]
 
 MIDDLEWARE = [
+    'apps.core.metrics.PrometheusMiddleware',
+    'apps.core.instrumentation.RequestMetricsMiddleware',
+    'apps.core.slow_queries.SlowQueryMiddleware',
     'django.middleware.security.SecurityMiddleware',
     'whitenoise.middleware.WhiteNoiseMiddleware',  # Whitenoise for static files
     'django.contrib.sessions.middleware.SessionMiddleware',
     'django.middleware.common.CommonMiddleware',
     'django.middleware.csrf.CsrfViewMiddleware',
     'django.contrib.auth.middleware.AuthenticationMiddleware',
+    'apps.core.tenancy.TenantMiddleware',
+    'apps.users.activity.ActivityMiddleware',
+    'apps.core.inbox.InboxMiddleware',
+    'apps.compliance.rollups.RollupMiddleware',
+    'apps.core.profiling.ProfilerMiddleware',
     'django.contrib.messages.middleware.MessageMiddleware',
     'django.middleware.clickjacking.XFrameOptionsMiddleware',
 ]
@@ -81,6 +89,7 @@ TEMPLATES = [
                 'django.template.context_processors.request',
                 'django.contrib.auth.context_processors.auth',
                 'django.contrib.messages.context_processors.messages',
+                'apps.core.context_processors.inbox',
             ],
         },
     },
@@ -178,6 +187,50 @@ LOGIN_URL = 'login'
 SESSION_COOKIE_AGE = 3600  # 1 hour
 SESSION_EXPIRE_AT_BROWSER_CLOSE = True
 
+# Organization that users registered without one are placed in
+DEFAULT_ORGANIZATION_SLUG = config('DEFAULT_ORGANIZATION_SLUG', default='default')
+DEFAULT_ORGANIZATION_NAME = config('DEFAULT_ORGANIZATION_NAME', default='Default Organization')
+
+# Completed audits older than this are moved to cold storage by archive_audits
+AUDIT_ARCHIVE_AFTER_DAYS = config('AUDIT_ARCHIVE_AFTER_DAYS', default=365, cast=int)
+
+# Offline-built TF-IDF index used to suggest findings in audit_execute
+FINDINGS_INDEX_PATH = config('FINDINGS_INDEX_PATH', default=str(BASE_DIR / 'var' / 'findings_index.bin'))
+
+# Retention periods (days) and chunking for purge_retention
+RETENTION_DAYS = {
+    'user_activity': config('RETENTION_USER_ACTIVITY_DAYS', default=365, cast=int),
+    'draft_reports': config('RETENTION_DRAFT_REPORT_DAYS', default=90, cast=int),
+    'superseded_scores': config('RETENTION_SUPERSEDED_SCORE_DAYS', default=730, cast=int),
+    'slow_queries': config('RETENTION_SLOW_QUERY_DAYS', default=30, cast=int),
+}
+RETENTION_BATCH_SIZE = config('RETENTION_BATCH_SIZE', default=1000, cast=int)
+RETENTION_BATCH_SLEEP = config('RETENTION_BATCH_SLEEP', default=0.1, cast=float)
+
+# Server-Timing header and N+1 query logging per request
+REQUEST_METRICS_ENABLED = config('REQUEST_METRICS_ENABLED', default=DEBUG, cast=bool)
+REQUEST_METRICS_N_PLUS_ONE_THRESHOLD = config('REQUEST_METRICS_N_PLUS_ONE_THRESHOLD', default=5, cast=int)
+
+# Buffered user activity writer: flush after this many entries or seconds
+ACTIVITY_FLUSH_SIZE = config('ACTIVITY_FLUSH_SIZE', default=100, cast=int)
+ACTIVITY_FLUSH_INTERVAL = config('ACTIVITY_FLUSH_INTERVAL', default=5.0, cast=float)
+
+# Admin-triggered request profiling (?_profile=1 or X-Profile: 1)
+PROFILER_ENABLED = config('PROFILER_ENABLED', default=DEBUG, cast=bool)
+PROFILE_DIR = config('PROFILE_DIR', default=str(BASE_DIR / 'var' / 'profiles'))
+PROFILE_KEEP = config('PROFILE_KEEP', default=100, cast=int)
+
+# Slow-query log: statements at or above the threshold, in a sampled share of requests
+SLOW_QUERY_LOG_ENABLED = config('SLOW_QUERY_LOG_ENABLED', default=True, cast=bool)
+SLOW_QUERY_THRESHOLD_MS = config('SLOW_QUERY_THRESHOLD_MS', default=100, cast=float)
+# Raise the sample rate (up to 1.0) while hunting a specific slow page
+SLOW_QUERY_SAMPLE_RATE = config('SLOW_QUERY_SAMPLE_RATE', default=0.1, cast=float)
+
+# Prometheus metrics at /metrics; set PROMETHEUS_MULTIPROC_DIR to aggregate gunicorn workers
+METRICS_ENABLED = config('METRICS_ENABLED', default=True, cast=bool)
+# Scrapers send it as a bearer token; without one /metrics is only served when DEBUG is on
+METRICS_TOKEN = config('METRICS_TOKEN', default='')
+
 # Production security settings
 if not DEBUG:
     SECURE_BROWSER_XSS_FILTER = True
@@ -0,0 +1,23 @@
+"""
+Gunicorn server hooks; gunicorn reads this file from the working directory.
+
+With ``PROMETHEUS_MULTIPROC_DIR`` set, every worker writes its metrics to
+files in that directory (see ``apps.core.metrics``). The directory is
+emptied when the server starts, so counters do not carry over from a
+previous run, and the live-gauge files of exited workers are removed.
+"""
+import os
+import shutil
+
+
+def on_starting(server):
+    path = os.environ.get('PROMETHEUS_MULTIPROC_DIR')
+    if path:
+        shutil.rmtree(path, ignore_errors=True)
+        os.makedirs(path, exist_ok=True)
+
+
+def child_exit(server, worker):
+    if os.environ.get('PROMETHEUS_MULTIPROC_DIR'):
+        from prometheus_client import multiprocess
+        multiprocess.mark_process_dead(worker.pid)
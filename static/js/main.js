@@ -57,4 +57,100 @@ document.addEventListener('DOMContentLoaded', function() {
             }
         });
     });
+    
+    // Suggest similar past findings while typing in audit findings
+    document.querySelectorAll('textarea[data-suggest-url]').forEach(textarea => {
+        const box = document.getElementById(`suggestions_${textarea.dataset.response}`);
+        let timer = null;
+        
+        textarea.addEventListener('input', function() {
+            clearTimeout(timer);
+            timer = setTimeout(() => {
+                const text = textarea.value.trim();
+                if (text.length < 4) {
+                    box.innerHTML = '';
+                    return;
+                }
+                const params = new URLSearchParams({item: textarea.dataset.checklistItem, q: text});
+                fetch(`${textarea.dataset.suggestUrl}?${params}`)
+                    .then(response => response.ok ? response.json() : {suggestions: []})
+                    .then(data => {
+                        box.innerHTML = '';
+                        data.suggestions.forEach(suggestion => {
+                            const button = document.createElement('button');
+                            button.type = 'button';
+                            button.className = 'finding-suggestion';
+                            button.textContent = suggestion.findings;
+                            button.title = suggestion.recommendations;
+                            button.addEventListener('click', () => {
+                                textarea.value = suggestion.findings;
+                                const recommendations = document.querySelector(
+                                    `textarea[name="recommendations_${textarea.dataset.response}"]`
+                                );
+                                if (recommendations && !recommendations.value.trim()) {
+                                    recommendations.value = suggestion.recommendations;
+                                }
+                                box.innerHTML = '';
+                            });
+                            box.appendChild(button);
+                        });
+                    });
+            }, 250);
+        });
+    });
+    
+    // Lazy dashboard widgets, fetched in parallel
+    document.querySelectorAll('[data-widget-url]').forEach(container => {
+        fetch(container.dataset.widgetUrl, {credentials: 'same-origin'})
+            .then(response => {
+                if (!response.ok) throw new Error(response.statusText);
+                return response.text();
+            })
+            .then(html => {
+                container.innerHTML = html;
+            })
+            .catch(() => {
+                container.innerHTML = '<div class="card"><p style="color: var(--text-muted); text-align: center; padding: 20px;">Could not load this section</p></div>';
+            });
+    });
+    
+    // Live audit progress over server-sent events
+    const auditBadges = {completed: 'success', in_progress: 'info', pending: 'warning'};
+    const responseBadges = {compliant: 'success', non_compliant: 'danger', partially_compliant: 'warning'};
+    
+    function setBadge(element, variant, label) {
+        element.className = `badge badge-${variant}`;
+        element.textContent = label;
+    }
+    
+    document.querySelectorAll('[data-events-url]').forEach(container => {
+        if (!window.EventSource) return;
+        const source = new EventSource(container.dataset.eventsUrl);
+        
+        source.addEventListener('progress', event => {
+            const data = JSON.parse(event.data);
+            document.querySelectorAll(`[data-audit-progress="${data.audit}"]`).forEach(bar => {
+                bar.style.width = `${data.progress}%`;
+            });
+            document.querySelectorAll(`[data-audit-progress-text="${data.audit}"]`).forEach(text => {
+                text.textContent = data.progress;
+            });
+        });
+        
+        source.addEventListener('status', event => {
+            const data = JSON.parse(event.data);
+            document.querySelectorAll(`[data-audit-status="${data.audit}"]`).forEach(badge => {
+                setBadge(badge, auditBadges[data.status] || 'secondary', data.label);
+            });
+        });
+        
+        source.addEventListener('response', event => {
+            const data = JSON.parse(event.data);
+            document.querySelectorAll(`[data-response-status="${data.response}"]`).forEach(badge => {
+                setBadge(badge, responseBadges[data.status] || 'secondary', data.label);
+            });
+        });
+        
+        source.addEventListener('resync', () => window.location.reload());
+    });
 });